@@ -1,4 +1,27 @@
-from typing import Iterator as _Iterator, Optional as _Optional
+from typing import Any as _Any, Callable as _Callable, Dict as _Dict, Iterator as _Iterator
+from typing import List as _List, Optional as _Optional, Sequence as _Sequence, Type as _Type
+import time as _time
+
+from .api import CodeTable as _CodeTable, get_batches as _get_batches, new_code_tables as _new_code_tables
+from .api import get_tail as _get_tail
+from .api import column_index as _column_index, dataset_signature as _dataset_signature
+from .api import set_partitioning as _set_partitioning
+from .aggregate import AggregateSpec as _AggregateSpec, get_aggregate as _get_aggregate
+from .join import get_join as _get_join
+from .columnar import load_columns as _load_columns, to_dataframe as _to_dataframe
+from .database import get_query as _get_query
+from .cube import OsobyCube, load_cube as _load_cube
+from .dataset import Dataset
+from .geography import Geography, load_geography as _load_geography
+from .panel import Panel, load_panel as _load_panel
+from .parallel import get_parallel as _get_parallel
+from .rollup import dimensions as _dimensions, get_daily as _get_daily
+from .rolling import RollingSum, get_rolling as _get_rolling, get_rolling_arrays as _get_rolling_arrays
+from .rolling import get_weekly as _get_weekly
+from .sort import get_sorted as _get_sorted
+from .sketch import HyperLogLog, KllSketch, get_sketches as _get_sketches
+from .top import get_top as _get_top
+from .shared import SharedDataset, publish as _publish, unpublish as _unpublish
 
 from .epidemiologicke_charakteristiky.zakladni_prehled import ZakladniPrehled
 from .epidemiologicke_charakteristiky.osoby import Osoby
@@ -32,12 +55,93 @@ from .ockovani.prioritni_skupiny import PrioritniSkupiny
 
 from .ruzne.pomucky import Pomucky
 
+_datasets: _Dict[str, _Type] = { record_class.file_name: record_class for record_class in (
+    ZakladniPrehled, Osoby, Vyleceni, Umrti, Hospitalizace, NakazeniVyleceniUmrtiTesty,
+    KrajOkresNakazeniVyleceniUmrti, Orp, Obce, MestskeCasti, Incidence_7_14_CR, Incidence_7_14_Kraje,
+    Incidence_7_14_Okresy, TestyPcrAntigenni, KrajOkresTesty, PrehledOdberovychMist, Ockovani,
+    OckovaciMista, PrehledOckovacichMist, OckovaniSpotreba, OckovaniDistribuce,
+    OckovaniDistribuceSklad, OckovaniRegistrace, OckovaniRezervace, OckovaniProfese,
+    OckovaciZarizeni, PrioritniSkupiny, Pomucky
+) }
+
+def dataset_class(dataset: str) -> _Type :
+    """ Returns record class of the dataset with given name (name of the csv file in the API without
+    extension, e.g. `'ockovani-profese'`).
+    """
+    if (record_class := _datasets.get(dataset)) is None :
+        raise ValueError(f"Unknown dataset '{dataset}'")
+    return record_class
+
+
 class MzcrCovid19Api :
+    """ Wrapper for the MZCR COVID-19 API
+
+    All methods returning an iterator accept following keyword options:
+
+    Options
+    -------
+
+    columns: List[str]
+        Names of the columns to read. When given, only these fields are split out of each line and
+        converted, and rows are returned as named tuples of the requested columns instead of the
+        full record objects.
+
+    reuse: bool
+        When `True`, a single record instance is refilled in place for every row instead of
+        allocating a new record per row. Intended for pure streaming aggregations, the yielded
+        record is valid only until the iterator is advanced and must not be kept (e.g. stored in a
+        list). Cannot be combined with `columns`.
+
+    intern: Union[bool, Dict[str, CodeTable]]
+        When `True`, values of low-cardinality text columns are interned, so materialized rows
+        share a single instance of each distinct value. Code tables of the dataset (see
+        `code_tables`) can be passed instead to collect the values and their codes across reads.
+
+    since: Union[date, str]
+        First date (inclusive) of the `datum` column of returned rows.
+
+    until: Union[date, str]
+        Last date (inclusive) of the `datum` column of returned rows.
+
+    <column name>: Any
+        Any other keyword option filters rows by value of the column of the same name, e.g.
+        `kraj_nuts_kod = 'CZ010'` or `okres_lau_kod = ['CZ0201', 'CZ0202']` (a list, tuple or set
+        matches any of its values).
+
+    Filters are evaluated on raw bytes of the fields before the rows are decoded or converted, so
+    rows which don't match cost almost nothing.
+
+    """
 
     _cache_directory_path: _Optional[str]
+    _arrow_cache: bool
+    _code_tables: _Dict[_Type, _Dict[str, _CodeTable]]
     
-    def __init__(self, cache_directory_path: _Optional[str] = './.cache') :
+    def __init__(self,
+                 cache_directory_path: _Optional[str] = './.cache',
+                 arrow_cache: bool = False,
+                 partitions: _Optional[_Dict[str, str]] = None) :
+        """ `arrow_cache` enables conversion of the cached csv files into typed Arrow files (requires
+        pyarrow), which are then memory mapped by `load_columns` and `to_dataframe` instead of
+        parsing the csv files again.
+
+        `partitions` maps names of datasets (e.g. `'obce'`) to `'month'` or `'week'`, these datasets
+        are cached as monthly or weekly partitions `<dataset>/YYYY-MM.csv` (or `YYYY-Www.csv`) in
+        the cache directory. Reads with `since` or `until` open only the partitions they need and
+        refreshing the cache rewrites only partitions whose content changed. Random access handles
+        (`dataset`) are not supported for partitioned datasets. The layout is stored in the cache
+        directory, so it applies to all instances using the directory until it is changed, period
+        `None` returns the dataset to a single cached file.
+        """
         self._cache_directory_path = cache_directory_path
+        self._arrow_cache = arrow_cache
+        self._code_tables = {}
+        for dataset, period in (partitions or {}).items() :
+            if cache_directory_path is None :
+                raise ValueError('Partitioned datasets require a cache directory.')
+            record_class = dataset_class(dataset)
+            _column_index(record_class, 'datum')
+            _set_partitioning(record_class.file_name, cache_directory_path, period)
     
 
     def zakladni_prehled(self) -> ZakladniPrehled :
@@ -51,7 +155,7 @@ class MzcrCovid19Api :
         return ZakladniPrehled.get(self._cache_directory_path)
 
 
-    def osoby(self) -> _Iterator[Osoby] :
+    def osoby(self, **options) -> _Iterator[Osoby] :
         """ Přehled osob s prokázanou nákazou dle hlášení krajských hygienických stanic (v2)
 
         Datová sada obsahující základní denní incidenční přehled osob s prokázanou nákazou COVID-19
@@ -59,10 +163,40 @@ class MzcrCovid19Api :
         informace o místě a zemi nákazy). Datová sada nahrazuje předchozí verzi dostupnou na adrese
         https://onemocneni-aktualne.mzcr.cz/api/v1/covid-19/ .
         """
-        return Osoby.get(self._cache_directory_path)
+        return Osoby.get(self._cache_directory_path, **options)
+
 
+    def osoby_daily(self, by: _Sequence[str] = _dimensions, **options) -> _List[tuple] :
+        """ Returns numbers of rows of `osoby` grouped by `by` (a subset of `datum`, `kraj_nuts_kod`,
+        `okres_lau_kod`, `vekova_skupina` and `pohlavi`), summed from a daily rollup kept next to
+        the cached file and updated incrementally when rows are appended to the dataset
 
-    def vyleceni(self) -> _Iterator[Vyleceni] :
+        Accepts `since`, `until` and filters by values of the same columns (`vekova_skupina` is the
+        five year age band, e.g. `'80-84'` or `'95+'`).
+        """
+        return _get_daily(Osoby.file_name,
+                          Osoby,
+                          Osoby.api_version,
+                          self._cache_directory_path,
+                          by,
+                          **options)
+
+
+    def osoby_cube(self) -> OsobyCube :
+        """ Dense cube of numbers of infected persons by date, region (kraj and okres), five year
+        age band and sex (requires numpy)
+
+        The cube is built from the daily rollup (see `osoby_daily`) and stored in file
+        `osoby.cube.npz` next to the cached csv file, it is rebuilt when the dataset changes. Rows
+        with empty or invalid date are not in the cube. Drill-downs are slices of the array:
+        `OsobyCube.select` selects dates and labels of the dimensions, `OsobyCube.marginalize` sums
+        over dimensions, e.g.
+        `osoby_cube().select(since = '2021-03-01', kraj_nuts_kod = 'CZ010').marginalize(['datum', 'vekova_skupina'])`.
+        """
+        return _load_cube(Osoby.file_name, Osoby, Osoby.api_version, self._cache_directory_path)
+
+
+    def vyleceni(self, **options) -> _Iterator[Vyleceni] :
         """ Přehled vyléčených dle hlášení krajských hygienických stanic
 
         Datová sada obsahující záznamy o vyléčených po onemocnění COVID‑19 dle hlášení krajských
@@ -71,10 +205,10 @@ class MzcrCovid19Api :
         se mohou denní záznamy zpětně měnit právě z důvodu průběžného doplňování. Tento přehled je
         aktualizován vždy jednou týdně ve středu a obsahuje data k předchozí neděli.
         """
-        return Vyleceni.get(self._cache_directory_path)
+        return Vyleceni.get(self._cache_directory_path, **options)
 
 
-    def umrti(self) -> _Iterator[Umrti] :
+    def umrti(self, **options) -> _Iterator[Umrti] :
         """ Přehled úmrtí dle hlášení krajských hygienických stanic
 
         Datová sada obsahující záznamy o úmrtích v souvislosti s onemocněním COVID‑19 dle hlášení
@@ -85,20 +219,36 @@ class MzcrCovid19Api :
         stanic, se mohou denní záznamy zpětně měnit právě z důvodu průběžného doplňování. Tento
         přehled je aktualizován vždy jednou týdně ve středu a obsahuje data k předchozí neděli.
         """
-        return Umrti.get(self._cache_directory_path)
+        return Umrti.get(self._cache_directory_path, **options)
+
+
+    def umrti_daily(self, by: _Sequence[str] = _dimensions, **options) -> _List[tuple] :
+        """ Returns numbers of rows of `umrti` grouped by `by` (a subset of `datum`, `kraj_nuts_kod`,
+        `okres_lau_kod`, `vekova_skupina` and `pohlavi`), summed from a daily rollup kept next to
+        the cached file and updated incrementally when rows are appended to the dataset
+
+        Accepts `since`, `until` and filters by values of the same columns (`vekova_skupina` is the
+        five year age band, e.g. `'80-84'` or `'95+'`).
+        """
+        return _get_daily(Umrti.file_name,
+                          Umrti,
+                          Umrti.api_version,
+                          self._cache_directory_path,
+                          by,
+                          **options)
 
 
-    def hospitalizace(self) -> _Iterator[Hospitalizace] :
+    def hospitalizace(self, **options) -> _Iterator[Hospitalizace] :
         """ Přehled hospitalizací
 
         Datová sada obsahující data hospitalizovaných pacientů popisující průběh hospitalizace (aktuální
         a celkový počet hospitalizovaných, rozdělení podle příznaků, rozdělení podle podpůrných
         přístrojů, počet úmrtí).
         """
-        return Hospitalizace.get(self._cache_directory_path)
+        return Hospitalizace.get(self._cache_directory_path, **options)
 
 
-    def nakazeni_vyleceni_umrti_testy(self) -> _Iterator[NakazeniVyleceniUmrtiTesty] :
+    def nakazeni_vyleceni_umrti_testy(self, **options) -> _Iterator[NakazeniVyleceniUmrtiTesty] :
         """ Celkový (kumulativní) počet osob s prokázanou nákazou dle krajských hygienických stanic
         včetně laboratoří, počet vyléčených, počet úmrtí a provedených testů (v2)
 
@@ -113,10 +263,10 @@ class MzcrCovid19Api :
         nahrazuje předchozí verzi dostupnou na adrese
         https://onemocneni-aktualne.mzcr.cz/api/v1/covid-19/ .
         """
-        return NakazeniVyleceniUmrtiTesty.get(self._cache_directory_path)
+        return NakazeniVyleceniUmrtiTesty.get(self._cache_directory_path, **options)
 
 
-    def kraj_okres_nakazeni_vyleceni_umrti(self) -> _Iterator[KrajOkresNakazeniVyleceniUmrti] :
+    def kraj_okres_nakazeni_vyleceni_umrti(self, **options) -> _Iterator[KrajOkresNakazeniVyleceniUmrti] :
         """ Přehled epidemiologické situace dle hlášení krajských hygienických stanic podle okresu
 
         Datová sada podle krajů a okresů ČR obsahující kumulativní denní počty osob s prokázaným
@@ -132,10 +282,10 @@ class MzcrCovid19Api :
         Ministerstva zdravotnictví ČR budou na webu COVID-19 publikovány celkové počty aktivních
         případů COVID-19 až zpětně, a to po doplnění a po validaci dat s časovým odstupem 4 týdnů.
         """
-        return KrajOkresNakazeniVyleceniUmrti.get(self._cache_directory_path)
+        return KrajOkresNakazeniVyleceniUmrti.get(self._cache_directory_path, **options)
 
 
-    def orp(self) -> _Iterator[Orp] :
+    def orp(self, **options) -> _Iterator[Orp] :
         """ Přehled epidemiologické situace dle hlášení krajských hygienických stanic podle ORP
 
         Obsahem je komplexní přehled základních epidemiologických parametrů (počty diagnostikovaných
@@ -143,10 +293,10 @@ class MzcrCovid19Api :
         seniorní zranitelné skupiny obyvatel (kategorie věku 65+, 75+) na geografické úrovni obcí s
         rozšířenou působností (ORP).
         """
-        return Orp.get(self._cache_directory_path)
+        return Orp.get(self._cache_directory_path, **options)
 
 
-    def obce(self) -> _Iterator[Obce] :
+    def obce(self, **options) -> _Iterator[Obce] :
         """ Epidemiologická charakteristika obcí
 
         Obsah datové sady zahrnuje základní epidemiologické parametry (počty nově diagnostikovaných
@@ -168,10 +318,10 @@ class MzcrCovid19Api :
         obcí je nově připravený nový internetový dashboard, který umožní rychlou zpětnou kontrolu
         správnosti.
         """
-        return Obce.get(self._cache_directory_path)
+        return Obce.get(self._cache_directory_path, **options)
 
 
-    def mestske_casti(self) -> _Iterator[MestskeCasti] :
+    def mestske_casti(self, **options) -> _Iterator[MestskeCasti] :
         """ Epidemiologická charakteristika městských částí hlavního města Prahy
 
         Obsah datové sady na úrovni městkých části hlavního města Prahy zahrnuje základní
@@ -195,10 +345,10 @@ class MzcrCovid19Api :
         obcí je nově připravený nový internetový dashboard, který umožní rychlou zpětnou kontrolu
         správnosti.
         """
-        return MestskeCasti.get(self._cache_directory_path)
+        return MestskeCasti.get(self._cache_directory_path, **options)
 
 
-    def incidence_7_14_cr(self) -> _Iterator[Incidence_7_14_CR] :
+    def incidence_7_14_cr(self, **options) -> _Iterator[Incidence_7_14_CR] :
         """ Přehled osob s prokázanou nákazou dle krajských hygienických stanic včetně laboratoří za
         7 a 14 dní za ČR
 
@@ -207,10 +357,10 @@ class MzcrCovid19Api :
         sada Obyvatelstvo podle pětiletých věkových skupin a pohlaví v krajích a okresech
         (https://www.czso.cz/csu/czso/obyvatelstvo-podle-petiletych-vekovych-skupin-a-pohlavi-v-krajich-a-okresech).
         """
-        return Incidence_7_14_CR.get(self._cache_directory_path)
+        return Incidence_7_14_CR.get(self._cache_directory_path, **options)
 
 
-    def incidence_7_14_kraje(self) -> _Iterator[Incidence_7_14_Kraje] :
+    def incidence_7_14_kraje(self, **options) -> _Iterator[Incidence_7_14_Kraje] :
         """ Přehled osob s prokázanou nákazou dle krajských hygienických stanic včetně laboratoří za
         7 a 14 dní podle krajů
 
@@ -219,10 +369,10 @@ class MzcrCovid19Api :
         sada Obyvatelstvo podle pětiletých věkových skupin a pohlaví v krajích a okresech
         (https://www.czso.cz/csu/czso/obyvatelstvo-podle-petiletych-vekovych-skupin-a-pohlavi-v-krajich-a-okresech).
         """
-        return Incidence_7_14_Kraje.get(self._cache_directory_path)
+        return Incidence_7_14_Kraje.get(self._cache_directory_path, **options)
 
 
-    def incidence_7_14_okresy(self) -> _Iterator[Incidence_7_14_Okresy] :
+    def incidence_7_14_okresy(self, **options) -> _Iterator[Incidence_7_14_Okresy] :
         """ Přehled osob s prokázanou nákazou dle krajských hygienických stanic včetně laboratoří za
         7 a 14 dní podle okresů
 
@@ -231,10 +381,10 @@ class MzcrCovid19Api :
         datová sada Obyvatelstvo podle pětiletých věkových skupin a pohlaví v krajích a okresech
         (https://www.czso.cz/csu/czso/obyvatelstvo-podle-petiletych-vekovych-skupin-a-pohlavi-v-krajich-a-okresech).
         """
-        return Incidence_7_14_Okresy.get(self._cache_directory_path)
+        return Incidence_7_14_Okresy.get(self._cache_directory_path, **options)
 
 
-    def testy_pcr_antigenni(self) -> _Iterator[TestyPcrAntigenni] :
+    def testy_pcr_antigenni(self, **options) -> _Iterator[TestyPcrAntigenni] :
         """ Přehled provedených testů podle typu a indikace
 
         Datová sada obsahující denní počty provedených testů s rozlišením na PCR testy a antigenní
@@ -246,10 +396,10 @@ class MzcrCovid19Api :
         infekčních nemocí (ISIN). Primární data byla analyticky zpracována a následně transformována
         do podoby publikovatelné online týmem ÚZIS ČR.
         """
-        return TestyPcrAntigenni.get(self._cache_directory_path)
+        return TestyPcrAntigenni.get(self._cache_directory_path, **options)
 
 
-    def kraj_okres_testy(self) -> _Iterator[KrajOkresTesty] :
+    def kraj_okres_testy(self, **options) -> _Iterator[KrajOkresTesty] :
         """ Celkový (kumulativní) počet provedených testů podle krajů a okresů ČR
 
         Datová sada obsahující přírůstkové a kumulativní denní počty provedených PCR testů s korekcí
@@ -260,10 +410,10 @@ class MzcrCovid19Api :
         existuje riziko neúplnosti těchto individuálních dat a proto do 31. července vycházíme pouze
         z dat agregovaných, která však neumožňují složitější analytické výpočty.
         """
-        return KrajOkresTesty.get(self._cache_directory_path)
+        return KrajOkresTesty.get(self._cache_directory_path, **options)
 
 
-    def prehled_odberovych_mist(self) -> _Iterator[PrehledOdberovychMist] :
+    def prehled_odberovych_mist(self, **options) -> _Iterator[PrehledOdberovychMist] :
         """ Odběrová místa v ČR
 
         Datová sada poskytuje seznam odběrových míst v ČR, kde jsou prováděny PCR a antigenní testy
@@ -272,10 +422,10 @@ class MzcrCovid19Api :
         poskytováním neodkladné péče. Mobilní odběrové týmy mají kapacitu pevně nastavenu (na
         hodnotu 20), protože není možné přesně určit tuto kapacitu.
         """
-        return PrehledOdberovychMist.get(self._cache_directory_path)
+        return PrehledOdberovychMist.get(self._cache_directory_path, **options)
 
 
-    def ockovani(self) -> _Iterator[Ockovani] :
+    def ockovani(self, **options) -> _Iterator[Ockovani] :
         """ Přehled vykázaných očkování podle krajů ČR
 
         Datová sada poskytuje agregovaná data o vykázaných očkováních na úrovni krajů ČR. Každý
@@ -285,10 +435,10 @@ class MzcrCovid19Api :
         očkovacích látek (v okamžik publikace 4) = 840. Data jsou aktualizována k času 20.00 h
         předchozího dne a mohou se zpětně mírně měnit z důvodu průběžného doplňování.
         """
-        return Ockovani.get(self._cache_directory_path)
+        return Ockovani.get(self._cache_directory_path, **options)
 
 
-    def ockovaci_mista(self) -> _Iterator[OckovaciMista] :
+    def ockovaci_mista(self, **options) -> _Iterator[OckovaciMista] :
         """ Přehled vykázaných očkování podle očkovacích míst ČR
 
         Datová sada poskytuje řádková data o vykázaných očkováních na jednotlivých očkovacích
@@ -296,20 +446,20 @@ class MzcrCovid19Api :
         skupině, s použitím vybrané očkovací látky, na konkrétním očkovacím místu a ve vybraném
         kraji.
         """
-        return OckovaciMista.get(self._cache_directory_path)
+        return OckovaciMista.get(self._cache_directory_path, **options)
 
 
-    def prehled_ockovacich_mist(self) -> _Iterator[PrehledOckovacichMist] :
+    def prehled_ockovacich_mist(self, **options) -> _Iterator[PrehledOckovacichMist] :
         """ Očkovací místa v ČR
 
         Datová sada poskytuje seznam veřejných očkovacích míst v ČR, kde jsou podávány očkovací
         látky proti onemocnění COVID-19.
         """
 
-        return PrehledOckovacichMist.get(self._cache_directory_path)
+        return PrehledOckovacichMist.get(self._cache_directory_path, **options)
 
 
-    def ockovani_spotreba(self) -> _Iterator[OckovaniSpotreba] :
+    def ockovani_spotreba(self, **options) -> _Iterator[OckovaniSpotreba] :
         """ Přehled spotřeby podle očkovacích míst ČR
 
         Datová sada obsahuje přehled spotřeby očkovacích látek (použité a znehodnocené ampulky)
@@ -317,20 +467,20 @@ class MzcrCovid19Api :
         počet použitých a znehodnocených ampulek dané očkovací látky na daném očkovacím místě v daný
         den.
         """
-        return OckovaniSpotreba.get(self._cache_directory_path)
+        return OckovaniSpotreba.get(self._cache_directory_path, **options)
 
 
-    def ockovani_distribuce(self) -> _Iterator[OckovaniDistribuce] :
+    def ockovani_distribuce(self, **options) -> _Iterator[OckovaniDistribuce] :
         """ Přehled distribuce očkovacích látek v ČR
 
         Datová sada obsahuje přehled distribuce očkovacích látek proti onemocnění COVID-19 do
         očkovacích míst v ČR. Každý záznam (řádek) datové sady udává počet ampulek dané očkovací
         látky, která byla daným očkovacím místem v daný den přijata nebo vydána.
         """
-        return OckovaniDistribuce.get(self._cache_directory_path)
+        return OckovaniDistribuce.get(self._cache_directory_path, **options)
 
 
-    def ockovani_distribuce_sklad(self) -> _Iterator[OckovaniDistribuceSklad] :
+    def ockovani_distribuce_sklad(self, **options) -> _Iterator[OckovaniDistribuceSklad] :
         """ Přehled distribuce očkovacích látek v ČR z centrálního skladu
 
         Datová sada obsahuje přehled distribuce očkovacích látek proti onemocnění COVID-19 v rámci
@@ -338,10 +488,10 @@ class MzcrCovid19Api :
         záznam (řádek) datové sady udává počet ampulek dané očkovací látky, která byla daným
         očkovacím místem v daný den přijata nebo vydána.
         """
-        return OckovaniDistribuceSklad.get(self._cache_directory_path)
+        return OckovaniDistribuceSklad.get(self._cache_directory_path, **options)
 
 
-    def ockovani_registrace(self) -> _Iterator[OckovaniRegistrace] :
+    def ockovani_registrace(self, **options) -> _Iterator[OckovaniRegistrace] :
         """ Přehled registrací podle očkovacích míst ČR
 
         Datová sada poskytuje přehled vytvořených registrací v centrálním rezervačním systému na
@@ -372,10 +522,10 @@ class MzcrCovid19Api :
         (6) Po provedení očkování zůstává záznam v datové sadě s blokovanou registrací (zablokovano
         = ANO) a současně je uveden důvod blokace (blokace_duvod = Ztotožněn, ale již vakcinován).
         """
-        return OckovaniRegistrace.get(self._cache_directory_path)
+        return OckovaniRegistrace.get(self._cache_directory_path, **options)
 
 
-    def ockovani_rezervace(self) -> _Iterator[OckovaniRezervace] :
+    def ockovani_rezervace(self, **options) -> _Iterator[OckovaniRezervace] :
         """ Přehled rezervací podle očkovacích míst ČR
 
         Datová sada poskytuje přehled volné a maximální kapacity očkovacích míst v jednotlivých
@@ -383,10 +533,10 @@ class MzcrCovid19Api :
         COVID-19 (https://reservatic.com/ockovani). Každý záznam (řádek) datové sady udává volnou a
         maximální kapacitu daného očkovacího místa v daný den.
         """
-        return OckovaniRezervace.get(self._cache_directory_path)
+        return OckovaniRezervace.get(self._cache_directory_path, **options)
 
 
-    def ockovani_profese(self) -> _Iterator[OckovaniProfese] :
+    def ockovani_profese(self, **options) -> _Iterator[OckovaniProfese] :
         """ Přehled vykázaných očkování podle profesí (očkovací místo, bydliště očkovaného)
 
         Datová sada poskytuje řádková data o vykázaných očkováních na jednotlivých očkovacích
@@ -394,30 +544,30 @@ class MzcrCovid19Api :
         skupině profese, s použitím dané dávky očkovací látky, na konkrétním očkovacím místu a ve
         vybraném kraji.
         """
-        return OckovaniProfese.get(self._cache_directory_path)
+        return OckovaniProfese.get(self._cache_directory_path, **options)
 
 
-    def ockovaci_zarizeni(self) -> _Iterator[OckovaciZarizeni] :
+    def ockovaci_zarizeni(self, **options) -> _Iterator[OckovaciZarizeni] :
         """ Očkovací zařízení
 
         Datová sada poskytuje seznam očkovacích zařízení v ČR jako doplnění seznamu očkovacích míst,
         kde jsou podávány očkovací látky proti onemocnění COVID-19. Jedná se především o praktické
         lékaře, ale i další, kde se očkování provádí.
         """
-        return OckovaciZarizeni.get(self._cache_directory_path)
+        return OckovaciZarizeni.get(self._cache_directory_path, **options)
 
 
-    def prioritni_skupiny(self) -> _Iterator[PrioritniSkupiny] :
+    def prioritni_skupiny(self, **options) -> _Iterator[PrioritniSkupiny] :
         """ Číselník prioritních skupin očkování
 
         Seznam prioritních skupin pro rozdělení očkovaných osob na základě prioritizačního systému
         Ministerstvem zdravotnictví ČR, který je použit v datové sadě COVID-19: Přehled vykázaných
         očkování podle profesí.
         """
-        return PrioritniSkupiny.get(self._cache_directory_path)
+        return PrioritniSkupiny.get(self._cache_directory_path, **options)
 
 
-    def pomucky(self) -> _Iterator[Pomucky] :
+    def pomucky(self, **options) -> _Iterator[Pomucky] :
         """ Přehled distribuce ochranného materiálu dle krajů ČR (v2)
 
         Datová sada obsahující aktuální přehled o počtech kusů ochranného materiálu k danému dni
@@ -425,5 +575,428 @@ class MzcrCovid19Api :
         ...). Datová sada nahrazuje předchozí verzi dostupnou na adrese
         https://onemocneni-aktualne.mzcr.cz/api/v1/covid-19/ .
         """
-        return Pomucky.get(self._cache_directory_path)
+        return Pomucky.get(self._cache_directory_path, **options)
+
+
+    def batches(self, dataset: str, size: int = 65536, **options) -> _Iterator[_List] :
+        """ Reads given dataset (e.g. `'ockovani-profese'`) in batches
+
+        Yields lists of at most `size` records (or named tuples when `columns` option is given)
+        parsed in bulk, so consumers aggregating in batches pay the iteration overhead per batch
+        instead of per row. Accepts the same options as the methods of individual datasets except
+        `reuse`, batches hold distinct records.
+        """
+        record_class = dataset_class(dataset)
+        return _get_batches(record_class.file_name,
+                            record_class,
+                            record_class.api_version,
+                            self._cache_directory_path,
+                            size,
+                            **options)
+
+
+    def tail(self, dataset: str, days: int = 1, **options) -> _List :
+        """ Returns records of the last `days` dates of given dataset (e.g. `'kraj-okres-testy'`)
+
+        Records are in order of the file, the cached file is read backward from its end and only
+        until the date boundary (if the file is in date order, otherwise it is scanned whole). The
+        dates are the latest dates of the whole dataset, column filters only select records of those
+        dates. Accepts the same options as the methods of individual datasets (except `reuse`).
+        """
+        record_class = dataset_class(dataset)
+        return _get_tail(record_class.file_name,
+                         record_class,
+                         record_class.api_version,
+                         self._cache_directory_path,
+                         days,
+                         **options)
+
+
+    def latest(self, dataset: str, **options) -> _List :
+        """ Returns records of the latest date of given dataset (e.g. `'incidence-7-14-kraje'`), see
+        `tail`
+        """
+        return self.tail(dataset, 1, **options)
+
+
+    def aggregate(self,
+                  dataset: str,
+                  by: _Sequence[str] = (),
+                  agg: _Optional[_Dict[str, _AggregateSpec]] = None,
+                  **options) -> _List[tuple] :
+        """ Groups given dataset (e.g. `'ockovani-profese'`) by columns `by` and computes aggregates
+        of the groups in one streaming pass
+
+        `agg` maps names of the results to `'*'` (number of rows) or to tuples of aggregate function
+        (`'count'`, `'sum'`, `'min'`, `'max'`, `'mean'`, approximate `'distinct'` count or
+        `'quantiles'`, a `KllSketch`) and column name, e.g. `{ 'count': '*', 'vek': ('mean', 'vek') }`
+        (defaults to `{ 'count': '*' }`). Empty fields are ignored. Returns named tuples of the `by`
+        columns and the results. Accepts filter options of the methods of individual datasets.
+        """
+        record_class = dataset_class(dataset)
+        return _get_aggregate(record_class.file_name,
+                              record_class,
+                              record_class.api_version,
+                              self._cache_directory_path,
+                              by,
+                              agg,
+                              **options)
+
+
+    def sketches(self,
+                 dataset: str,
+                 by: _Sequence[str] = (),
+                 period: _Optional[str] = 'day',
+                 distinct: _Sequence[str] = (),
+                 quantiles: _Sequence[str] = ()) -> _List[tuple] :
+        """ Returns mergeable sketches of given dataset per period (`'day'`, `'week'`, `'month'` or
+        `None`) of `datum` and columns `by`: `HyperLogLog` counters of distinct values of columns
+        `distinct` and `KllSketch` quantiles of numeric columns `quantiles`
+
+        E.g. `sketches('ockovani-registrace', distinct = ['ockovaci_misto_id'])` or
+        `sketches('umrti', ['kraj_nuts_kod'], 'week', quantiles = ['vek'])`. Sketches are stored
+        next to the cached file (or next to each partition of partitioned datasets, merged when
+        read) and updated incrementally. Returns named tuples of the period (`datum`), the `by`
+        columns and the sketches named by their columns, e.g. `row.vek.quantile(0.5)` or
+        `row.ockovaci_misto_id.count()`.
+        """
+        record_class = dataset_class(dataset)
+        return _get_sketches(record_class.file_name,
+                             record_class,
+                             record_class.api_version,
+                             self._cache_directory_path,
+                             by,
+                             period,
+                             distinct,
+                             quantiles)
+
+
+    def rolling(self,
+                dataset: str,
+                by: _Sequence[str],
+                value: _Optional[str] = None,
+                windows: _Sequence[int] = (7, 14),
+                population: _Optional[_Dict[_Any, float]] = None,
+                **options) -> _Iterator[tuple] :
+        """ Yields trailing sums, means and (with `population`) rates per 100 000 inhabitants of
+        column `value` (or numbers of rows if `value` is `None`) of groups by columns `by` over
+        `windows` of days, one row per day and group, computed in one streaming pass
+
+        E.g. `rolling('osoby', ['kraj_nuts_kod'])` gives the 7 and 14 day incidence of kraje and
+        `rolling('obce', ['obec_kod'], 'nove_pripady', [7])` the 7 day sums of `nove_pripady` of
+        municipalities. Days without rows count as zero. Accepts filter options of the methods of
+        individual datasets.
+        """
+        record_class = dataset_class(dataset)
+        return _get_rolling(record_class.file_name,
+                            record_class,
+                            record_class.api_version,
+                            self._cache_directory_path,
+                            by,
+                            value,
+                            windows,
+                            population,
+                            **options)
+
+
+    def rolling_arrays(self,
+                       dataset: str,
+                       by: _Sequence[str],
+                       value: _Optional[str] = None,
+                       windows: _Sequence[int] = (7, 14),
+                       population: _Optional[_Dict[_Any, float]] = None,
+                       **options) -> _Dict[str, _Any] :
+        """ Vectorized variant of `rolling` (requires numpy), returns matrices (groups × days) of
+        the sums, means and rates
+        """
+        record_class = dataset_class(dataset)
+        return _get_rolling_arrays(record_class.file_name,
+                                   record_class,
+                                   record_class.api_version,
+                                   self._cache_directory_path,
+                                   by,
+                                   value,
+                                   windows,
+                                   population,
+                                   **options)
+
+
+    def weekly(self,
+               dataset: str,
+               by: _Sequence[str],
+               value: _Optional[str] = None,
+               population: _Optional[_Dict[_Any, float]] = None,
+               **options) -> _Dict[str, _Any] :
+        """ Returns sums (and rates with `population`) of column `value` (or numbers of rows if
+        `value` is `None`) of groups by columns `by` per ISO week, as matrices (groups × weeks)
+        (requires numpy)
+        """
+        record_class = dataset_class(dataset)
+        return _get_weekly(record_class.file_name,
+                           record_class,
+                           record_class.api_version,
+                           self._cache_directory_path,
+                           by,
+                           value,
+                           population,
+                           **options)
+
+
+    def join(self,
+             dataset: str,
+             other: str,
+             on: str,
+             other_on: _Optional[str] = None,
+             how: str = 'inner',
+             **options) -> _Iterator[tuple] :
+        """ Joins records of given dataset with records of the `other` (smaller) dataset with equal
+        value of columns `on` and `other_on` (defaults to `on`)
+
+        E.g. `join('ockovani-profese', 'ockovaci-zarizeni', 'zarizeni_kod')` or
+        `join('ockovani-profese', 'prioritni-skupiny', 'prioritni_skupina_kod', 'kod')`. The other
+        dataset is loaded into a hash index kept in memory until the dataset is refreshed, the
+        records of the dataset are streamed through it. `how` is `'inner'` or `'left'` (records
+        without a match have the other fields set to `None`). Yields named tuples of fields of both
+        datasets, fields of the other dataset with a name already used are prefixed by its name.
+        Accepts the options of the methods of individual datasets (except `reuse`), applied to
+        the first dataset.
+        """
+        record_class = dataset_class(dataset)
+        other_class = dataset_class(other)
+        return _get_join(record_class.file_name,
+                         record_class,
+                         record_class.api_version,
+                         other_class.file_name,
+                         other_class,
+                         other_class.api_version,
+                         self._cache_directory_path,
+                         on,
+                         other_on,
+                         how,
+                         **options)
+
+
+    def query(self, sql: str, params: _Any = ()) -> _Iterator[tuple] :
+        """ Yields rows of the result of an SQL query over the datasets loaded into SQLite database
+        `mzcr.sqlite` in the cache directory
+
+        Every dataset is a table named as the dataset with `_` instead of `-` (e.g.
+        `ockovani_profese`), with typed columns (empty numbers and dates are `NULL`, dates are ISO
+        formatted text) and indexes on `datum` and region codes. Tables of the datasets used in the
+        query are loaded or updated first: appended rows are inserted into the existing table,
+        otherwise the table is rebuilt. `params` are bound to the placeholders of the query, e.g.
+        `query('SELECT orp_bydliste_kod, COUNT(*) FROM ockovani_registrace WHERE datum >= ? '
+        'GROUP BY orp_bydliste_kod', ('2021-03-01',))`.
+        """
+        return _get_query(self._cache_directory_path, list(_datasets.values()), sql, params)
+
+
+    def sort(self,
+             dataset: str,
+             by: _Sequence[str],
+             descending: bool = False,
+             memory_limit: int = 256 << 20,
+             temp_dir: _Optional[str] = None,
+             **options) -> _Iterator :
+        """ Yields records of given dataset (e.g. `'ockovani-profese'`) sorted by columns `by`, e.g.
+        `sort('ockovani-profese', ['zarizeni_kod', 'datum'])`
+
+        Datasets larger than `memory_limit` (bytes, approximate) are sorted externally: sorted runs
+        are written into a temporary directory in `temp_dir` and merged while the records are
+        yielded. Records with equal keys keep the order of the dataset. Accepts the options of the
+        methods of individual datasets (except `reuse`).
+        """
+        record_class = dataset_class(dataset)
+        return _get_sorted(record_class.file_name,
+                           record_class,
+                           record_class.api_version,
+                           self._cache_directory_path,
+                           by,
+                           descending,
+                           memory_limit,
+                           temp_dir,
+                           **options)
+
+
+    def code_tables(self, dataset: str) -> _Dict[str, _CodeTable] :
+        """ Code tables of low-cardinality text columns of given dataset (e.g. `'ockovani-profese'`)
+
+        The tables belong to this instance and are filled only by reads given them as the `intern`
+        option, e.g. `api.ockovani_profese(intern = api.code_tables('ockovani-profese'))`. They map
+        the values to integer codes by order of their first occurrence in those reads, which differs
+        from the sorted categories of `load_columns`.
+        """
+        record_class = dataset_class(dataset)
+        if (tables := self._code_tables.get(record_class)) is None :
+            tables = self._code_tables[record_class] = _new_code_tables(record_class)
+        return tables
+
+
+    def parallel(self,
+                 dataset: str,
+                 workers: _Optional[int] = None,
+                 ordered: bool = True,
+                 map_batch: _Optional[_Callable[[_List], _Any]] = None,
+                 **options
+                 ) -> _Iterator :
+        """ Parses given dataset (e.g. `'obce'`) in parallel in a pool of worker processes
+
+        The cached file is split into newline aligned byte ranges parsed by `workers` processes
+        (defaults to the number of CPUs) and yielded as lists of records. With `ordered = False`
+        batches are yielded as soon as they are parsed, regardless of their position in the file,
+        which suits commutative aggregations. Accepts the same options as the methods of individual
+        datasets (except `reuse`) and requires the cache to be enabled.
+
+        Passing records back from the workers is expensive, aggregations scale much better when
+        done in the workers by `map_batch`, a picklable function (e.g. defined at module level)
+        applied to each batch, whose results are then yielded instead of the batches.
+        """
+        record_class = dataset_class(dataset)
+        return _get_parallel(record_class.file_name,
+                             record_class,
+                             record_class.api_version,
+                             self._cache_directory_path,
+                             workers,
+                             ordered,
+                             map_batch = map_batch,
+                             **options)
+
+
+    def load_columns(self, dataset: str, **options) -> _Dict[str, _Any] :
+        """ Loads given dataset (e.g. `'obce'`) into numpy arrays, one per column (requires numpy)
+
+        Integer and float columns are masked arrays with empty fields masked (instead of the `-1`
+        sentinel used by records), dates are `datetime64[D]` arrays, bools are `bool` arrays and
+        text columns are `CategoricalColumn`s (integer codes and a table of values). Arrays are
+        filled in bulk from the raw fields without creating records. Accepts `columns`, `since`,
+        `until` and column filters options.
+        """
+        record_class = dataset_class(dataset)
+        return _load_columns(record_class.file_name,
+                             record_class,
+                             record_class.api_version,
+                             self._cache_directory_path,
+                             arrow_cache = self._arrow_cache,
+                             **options)
+
+
+    def to_dataframe(self, dataset: str, **options) -> _Any :
+        """ Loads given dataset (e.g. `'ockovani'`) into a pandas DataFrame (requires pandas)
+
+        The frame is built straight from the columnar arrays of `load_columns`, without creating
+        records. Numbers use nullable dtypes (empty fields are `NA` instead of `-1`), dates are
+        `datetime64`, low-cardinality text columns are categorical. Accepts `columns`, `since`,
+        `until` and column filters options.
+        """
+        record_class = dataset_class(dataset)
+        return _to_dataframe(record_class.file_name,
+                             record_class,
+                             record_class.api_version,
+                             self._cache_directory_path,
+                             arrow_cache = self._arrow_cache,
+                             **options)
+
+
+    def publish_shared(self, dataset: str, prefix: str = 'mzcr', **options) -> str :
+        """ Publishes columns of given dataset (e.g. `'obce'`) into shared memory
+
+        Columns are loaded by `load_columns` (accepting the same options) and written into a shared
+        memory block with a schema header, which other processes attach zero-copy through
+        `attach_shared`. Publishing again after the cached file changed creates a new version,
+        which replaces the previous one for newly attaching and refreshing processes. Blocks are
+        unlinked when the publishing process exits or calls `unpublish_shared`. Returns name of
+        the shared memory block.
+        """
+        columns = self.load_columns(dataset, **options)
+        if self._cache_directory_path is None :
+            version = str(_time.time_ns())
+        else :
+            record_class = dataset_class(dataset)
+            version = _dataset_signature(record_class.file_name,
+                                         record_class.api_version,
+                                         self._cache_directory_path)
+        return _publish(prefix, dataset, f'{version}:{sorted(options.items())!r}', columns)
+
+
+    def unpublish_shared(self, dataset: str, prefix: str = 'mzcr') -> None :
+        """ Unlinks shared memory of given dataset published by this process """
+        _unpublish(prefix, dataset)
 
+
+    def attach_shared(self, dataset: str, prefix: str = 'mzcr') -> SharedDataset :
+        """ Attaches given dataset published into shared memory by `publish_shared` (possibly by
+        another process)
+
+        Columns of the returned `SharedDataset` are numpy views of the shared memory. Its `refresh`
+        method switches to a newer version when the dataset is published again.
+        """
+        return SharedDataset(prefix, dataset)
+
+
+    def panel(self, dataset: str) -> Panel :
+        """ Loads given municipality-level dataset (`'obce'`, `'mestske-casti'` or `'orp'`) as a
+        compact `Panel` (requires numpy)
+
+        The panel is stored in file `<dataset>.panel` next to the cached csv file, sorted by entity
+        and date, with names stored once per entity and counters delta and varint encoded. The file
+        is rebuilt when the cached csv file changes. `Panel.series` returns time series of one
+        entity, `Panel.cross_section` values of all entities on one day.
+        """
+        record_class = dataset_class(dataset)
+        return _load_panel(record_class.file_name,
+                           record_class,
+                           record_class.api_version,
+                           self._cache_directory_path)
+
+
+    def geography(self) -> Geography :
+        """ Returns index of the territorial hierarchy obec → ORP → okres → kraj (and městská část →
+        ORP)
+
+        The index is derived from datasets `obce` and `mestske-casti` and stored in file
+        `geography.json` in the cache directory, it is rebuilt when these datasets change. It maps
+        codes of units to names, parents and integer ids, `Geography.roll_up` sums values of units
+        into coarser levels (requires numpy), e.g.
+        `geography().roll_up('obec', columns['obec_kod'], columns['nove_pripady'], 'kraj')`.
+        """
+        return _load_geography(self._cache_directory_path)
+
+
+    def top(self, dataset: str, metric: str, date: _Any, n: int = 10) -> _List[tuple] :
+        """ Returns `n` entities of given municipality-level dataset (`'obce'`, `'mestske-casti'` or
+        `'orp'`) with the largest values of counter `metric` on given date, e.g.
+        `top('obce', 'nove_pripady_7_dni', '2021-03-01', 50)`
+
+        Values are looked up in a per-day index of the top entities of each counter, built with
+        heaps in one pass over the dataset and stored in file `<dataset>.top.json` next to the
+        cached csv file. The index is rebuilt when the dataset changes. Returns named tuples of the
+        entity code, its name (except for `'mestske-casti'`) and the value, ties ordered by entity
+        code.
+
+        The index keeps 100 entities per day, `n` over 100 rebuilds it with `n` entities per day by
+        scanning the whole dataset again.
+        """
+        record_class = dataset_class(dataset)
+        return _get_top(record_class.file_name,
+                        record_class,
+                        record_class.api_version,
+                        self._cache_directory_path,
+                        metric,
+                        date,
+                        n)
+
+
+    def dataset(self, dataset: str, columns: _Optional[_List[str]] = None) -> Dataset :
+        """ Returns random access handle of given dataset (e.g. `'osoby'`)
+
+        The handle supports `len`, indexing, slicing and repeated iteration without scanning the
+        cached file, through a row offset index stored next to it (built during download, or
+        rebuilt when missing or outdated). With `columns` rows are named tuples of the requested
+        columns.
+        """
+        record_class = dataset_class(dataset)
+        return Dataset(record_class.file_name,
+                       record_class,
+                       record_class.api_version,
+                       self._cache_directory_path,
+                       columns)
@@ -0,0 +1,239 @@
+from .api import ApiVersion, column_index, float_field, get_batches, int_field, str_field
+from .sketch import HyperLogLog, KllSketch
+from abc import ABC, abstractmethod
+from collections import Counter, namedtuple
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple, Type, Union
+
+AggregateSpec = Union[str, Tuple[str, str]]
+
+
+class Aggregator(ABC) :
+    """ Accumulates one aggregate of one column per group in a streaming pass.
+
+    Values equal to `missing` (the value of an empty field, e.g. `-1` for `int_field` columns)
+    are ignored.
+    """
+
+    def __init__(self, missing: Any) :
+        self.missing = missing
+
+
+    @abstractmethod
+    def update(self, keys: List[Hashable], values: List[Any]) -> None :
+        """ Adds values of a batch of rows, `keys` are group keys of the rows. """
+
+
+    @abstractmethod
+    def result(self, key: Hashable) -> Any :
+        """ Returns the aggregate of the group with given key, groups without any value which is not
+        missing get `0` from counts and sums and `None` from other aggregates.
+        """
+
+
+class CountAggregator(Aggregator) :
+
+    def __init__(self, missing: Any) :
+        super().__init__(missing)
+        self.counts: Counter = Counter()
+
+
+    def update(self, keys: List[Hashable], values: List[Any]) -> None :
+        missing = self.missing
+        self.counts.update(key for key, value in zip(keys, values) if value != missing)
+
+
+    def result(self, key: Hashable) -> Any :
+        return self.counts[key]
+
+
+class SumAggregator(Aggregator) :
+
+    def __init__(self, missing: Any) :
+        super().__init__(missing)
+        self.totals: Dict[Hashable, Any] = {}
+
+
+    def update(self, keys: List[Hashable], values: List[Any]) -> None :
+        totals = self.totals
+        missing = self.missing
+        for key, value in zip(keys, values) :
+            if value != missing :
+                totals[key] = totals.get(key, 0) + value
+
+
+    def result(self, key: Hashable) -> Any :
+        return self.totals.get(key, 0)
+
+
+class MinAggregator(Aggregator) :
+
+    def __init__(self, missing: Any) :
+        super().__init__(missing)
+        self.values: Dict[Hashable, Any] = {}
+
+
+    def update(self, keys: List[Hashable], values: List[Any]) -> None :
+        current = self.values
+        missing = self.missing
+        for key, value in zip(keys, values) :
+            if value != missing and (key not in current or value < current[key]) :
+                current[key] = value
+
+
+    def result(self, key: Hashable) -> Any :
+        return self.values.get(key)
+
+
+class MaxAggregator(MinAggregator) :
+
+    def update(self, keys: List[Hashable], values: List[Any]) -> None :
+        current = self.values
+        missing = self.missing
+        for key, value in zip(keys, values) :
+            if value != missing and (key not in current or value > current[key]) :
+                current[key] = value
+
+
+class MeanAggregator(Aggregator) :
+
+    def __init__(self, missing: Any) :
+        super().__init__(missing)
+        self.sums = SumAggregator(missing)
+        self.counts = CountAggregator(missing)
+
+
+    def update(self, keys: List[Hashable], values: List[Any]) -> None :
+        self.sums.update(keys, values)
+        self.counts.update(keys, values)
+
+
+    def result(self, key: Hashable) -> Any :
+        count = self.counts.result(key)
+        return self.sums.result(key) / count if count > 0 else None
+
+
+class DistinctAggregator(Aggregator) :
+    """ Approximate number of distinct values, counted by a `HyperLogLog` sketch per group. """
+
+    def __init__(self, missing: Any) :
+        super().__init__(missing)
+        self.sketches: Dict[Hashable, HyperLogLog] = {}
+
+
+    def update(self, keys: List[Hashable], values: List[Any]) -> None :
+        groups: Dict[Hashable, set] = {}
+        missing = self.missing
+        for key, value in zip(keys, values) :
+            if value != missing :
+                groups.setdefault(key, set()).add(value)
+        for key, group in groups.items() :
+            if (sketch := self.sketches.get(key)) is None :
+                sketch = self.sketches[key] = HyperLogLog()
+            sketch.update(group)
+
+
+    def result(self, key: Hashable) -> Any :
+        return round(self.sketches[key].count()) if key in self.sketches else 0
+
+
+class QuantilesAggregator(Aggregator) :
+    """ Approximate quantiles of numeric values, the result is a `KllSketch` of the group (e.g.
+    `row.vek.quantile(0.5)`), `None` if there are no values.
+    """
+
+    def __init__(self, missing: Any) :
+        super().__init__(missing)
+        self.sketches: Dict[Hashable, KllSketch] = {}
+
+
+    def update(self, keys: List[Hashable], values: List[Any]) -> None :
+        sketches = self.sketches
+        missing = self.missing
+        for key, value in zip(keys, values) :
+            if value != missing :
+                if (sketch := sketches.get(key)) is None :
+                    sketch = sketches[key] = KllSketch()
+                sketch.add(value)
+
+
+    def result(self, key: Hashable) -> Any :
+        return self.sketches.get(key)
+
+
+# aggregate functions usable in `agg` specifications, by name
+aggregators: Dict[str, Type[Aggregator]] = {
+    'count': CountAggregator,
+    'sum': SumAggregator,
+    'min': MinAggregator,
+    'max': MaxAggregator,
+    'mean': MeanAggregator,
+    'distinct': DistinctAggregator,
+    'quantiles': QuantilesAggregator,
+}
+
+
+def missing_value(record_class: Type, column: str) -> Any :
+    """ Returns value the converter of the column returns for an empty field. """
+    converter = record_class.fields[column_index(record_class, column)][1]
+    if converter is int_field or converter is float_field :
+        return converter('')
+    elif converter is str_field :
+        return ''
+    else :
+        # empty dates are None, bools have no missing value
+        return None
+
+
+def get_aggregate(file_name: str,
+                  record_class: Type,
+                  api_version: ApiVersion,
+                  cache_dir: Optional[str],
+                  by: Sequence[str] = (),
+                  agg: Optional[Dict[str, AggregateSpec]] = None,
+                  size: int = 65536,
+                  **options: Any
+                  ) -> List[tuple] :
+    """ Groups rows of the dataset by columns `by` and computes aggregates of the groups in one
+    streaming pass, memory is bounded by the number of groups.
+
+    `agg` maps names of the results to `'*'` (number of rows) or to tuples of aggregate function
+    (see `aggregators`: `'count'` of non-empty values, `'sum'`, `'min'`, `'max'`, `'mean'`,
+    approximate `'distinct'` count and `'quantiles'` sketch) and column name, defaults to
+    `{ 'count': '*' }`. Empty fields are ignored by the functions. Only
+    the needed columns are parsed (converted by the record schema), in batches of `size` rows.
+    Accepts filter options of `get_many`.
+
+    Returns named tuples of the `by` columns followed by the results, in order of the first row of
+    each group.
+    """
+    if agg is None :
+        agg = { 'count': '*' }
+
+    by = list(by)
+    columns = list(by)
+    plan: List[Tuple[Optional[int], Optional[Aggregator]]] = []
+    for name, spec in agg.items() :
+        if spec == '*' :
+            plan.append((None, None))
+            continue
+        function, column = spec
+        if function not in aggregators :
+            raise ValueError(f"Unknown aggregate function '{function}' of '{name}', "
+                             f"expected one of {', '.join(aggregators)}.")
+        if column not in columns :
+            columns.append(column)
+        plan.append((columns.index(column), aggregators[function](missing_value(record_class, column))))
+
+    result_type = namedtuple('Aggregate', [*by, *agg.keys()])
+    key_length = len(by)
+    rows: Counter = Counter()
+    for batch in get_batches(file_name, record_class, api_version, cache_dir, size, columns, **options) :
+        keys = [row[:key_length] for row in batch]
+        rows.update(keys)
+        for i, aggregator in plan :
+            if aggregator is not None :
+                aggregator.update(keys, [row[i] for row in batch])
+
+    return [result_type(*key, *(rows[key] if aggregator is None else aggregator.result(key)
+                                for _, aggregator in plan))
+            for key in rows]
@@ -1,9 +1,16 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
 from datetime import date, datetime, timezone
 from enum import Enum
-from typing import Iterator, Optional, Type, TypeVar
+from itertools import accumulate, islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Type, TypeVar, Union
+import hashlib
+import json
 import os
 import re
 import requests
+import shutil
 
 class ApiVersion(Enum) :
     V1 = 1, 'https://onemocneni-aktualne.mzcr.cz/api/v1/covid-19'
@@ -41,40 +48,701 @@ def is_expired(cache_file: str, file_name: str, api_version: ApiVersion) -> bool
 
 T = TypeVar('T')
 
-def get_csv_lines(file_name: str,
-                  constructor: Type,
-                  api_version: ApiVersion,
-                  cache_dir: Optional[str]
-                  ) -> Iterator[str] :
+Converter = Callable[[str], Any]
 
-    url = f'{api_version.url}/{file_name}.csv'
-    if cache_dir is not None :
-        os.makedirs(cache_dir, exist_ok = True)
-        cache_file = os.path.join(cache_dir, file_name + '.csv')
-        if not os.path.isfile(cache_file) or is_expired(cache_file, file_name, api_version) :
-            response = requests.get(url, stream = True)
-            with open(cache_file, 'wb') as file :
-                for line in response.iter_lines() :
-                    file.write(line)
-                    file.write(b'\n')
+_projection_types: Dict[Tuple[Type, Tuple[str, ...]], Type[tuple]] = {}
 
-        with open(cache_file, 'rb') as file :
-            while len(line := file.readline()) > 0 :
-                yield line.rstrip(b'\r\n').decode('utf-8')
+def column_index(record_class: Type, column: str) -> int :
+    for i, (name, _) in enumerate(record_class.fields) :
+        if name == column :
+            return i
+
+    raise ValueError(f"'{column}' is not a column of {record_class.__name__}")
+
+
+def projection_type(record_class: Type, columns: Sequence[str]) -> Type[tuple] :
+    key = (record_class, tuple(columns))
+    if (projection := _projection_types.get(key)) is None :
+        for column in columns :
+            column_index(record_class, column)
+        projection = namedtuple(record_class.__name__, columns)
+        # projection types are created dynamically, pickle them through the record class they were
+        # created for, so they can be passed between processes
+        projection.__reduce__ = lambda self : (make_projected, (record_class, key[1], tuple(self)))
+        _projection_types[key] = projection
+
+    return projection
+
+
+def make_projected(record_class: Type, columns: Sequence[str], values: Sequence[Any]) -> tuple :
+    return projection_type(record_class, columns)._make(values)
+
+
+class CodeTable :
+    """ Dictionary of values of a low-cardinality text column.
+
+    Values are interned, so all records read with the table share a single instance of each distinct
+    value, and coded by order of their first occurrence. The table grows as rows are read with it.
+    """
+
+    def __init__(self) -> None :
+        self._values: Dict[str, str] = {}
+        self._codes: Dict[str, int] = {}
+        # dict.setdefault(value, value) is the fastest way to intern from the parsing loops
+        self.canonical: Callable[[str, str], str] = self._values.setdefault
+
+
+    def __len__(self) -> int :
+        return len(self._values)
+
+
+    def __contains__(self, value: str) -> bool :
+        return value in self._values
+
+
+    @property
+    def values(self) -> List[str] :
+        """ Known values, index in the list is the code of the value. """
+        return list(self._values)
+
+
+    def intern(self, value: str) -> str :
+        return self._values.setdefault(value, value)
 
-        return
 
+    def code(self, value: str) -> int :
+        """ Returns code of the value, adding the value to the table if it's not known yet. """
+        self._values.setdefault(value, value)
+        if len(self._codes) < len(self._values) :
+            for known in islice(self._values, len(self._codes), None) :
+                self._codes[known] = len(self._codes)
+
+        return self._codes[value]
+
+
+CodeTables = Dict[str, CodeTable]
+
+def new_code_tables(record_class: Type) -> CodeTables :
+    """ Returns empty code tables of the categorical columns of the dataset. """
+    return { column: CodeTable() for column in record_class.categorical }
+
+
+def interned_tables(record_class: Type, intern: Union[bool, CodeTables]) -> Optional[CodeTables] :
+    """ Returns code tables for option `intern` of the readers, new tables if it is `True`. """
+    if intern is True :
+        return new_code_tables(record_class)
+    return intern or None
+
+
+def interned_fields(record_class: Type, tables: CodeTables) -> List[Tuple[int, Callable[[str, str], str]]] :
+    return [(column_index(record_class, column), table.canonical) for column, table in tables.items()]
+
+
+def raw_value(value: Any) -> bytes :
+    """ Returns the value as it would be written in the csv file. """
+    if value is None :
+        return b''
+    elif isinstance(value, datetime) :
+        return value.date().isoformat().encode('ascii')
+    elif isinstance(value, date) :
+        return value.isoformat().encode('ascii')
     else :
-        response = requests.get(url, stream = True)
+        return str(value).encode('utf-8')
+
+
+class RowFilter :
+    """ Predicate evaluated on raw (not decoded) fields of a csv line.
+
+    Attributes
+    ----------
+
+    max_index: int
+        Index of the last field the predicate needs, the line doesn't have to be split any further.
+
+    """
+
+    def __init__(self, checks: List[Tuple[int, Callable[[bytes], bool]]]) :
+        self._checks = checks
+        self.max_index: int = max(i for i, _ in checks)
+
+
+    def __call__(self, parts: List[bytes]) -> bool :
+        for i, check in self._checks :
+            if not check(parts[i]) :
+                return False
+
+        return True
+
+
+# options of `get_many` which are not supported by every reader, they are never column filters
+reader_options = ('reuse', 'intern')
+
+
+def filter_conditions(record_class: Type,
+                      since: Union[date, str, None],
+                      until: Union[date, str, None],
+                      filters: Dict[str, Any]
+                      ) -> List[Tuple[int, str, Any]] :
+    """ Translates date range and equality filters into conditions on raw fields.
+
+    `since` and `until` are inclusive bounds of the `datum` column, given as dates or iso strings.
+    ISO dates compare lexicographically, so they are checked without parsing. Rows with empty date
+    never match a date range.
+
+    Each item of `filters` maps a column name to the required value, or to a collection (list, tuple
+    or set) of allowed values. Values are compared with the raw text of the field, so `int` columns
+    can be filtered by `int` values, `date` columns by dates and `None` matches empty fields. Bool
+    columns are filtered by `True` (non-empty) or `False` (empty). Reader options (`reader_options`)
+    passed to a reader which doesn't support them are rejected.
+
+    Conditions are tuples of field index, kind and argument, kinds are `'range'` (argument is a
+    tuple of inclusive bounds), `'eq'` (argument is the required value), `'in'` (argument is a set
+    of allowed values) and `'empty'` (argument tells whether the field must be empty or non-empty).
+    """
+    conditions: List[Tuple[int, str, Any]] = []
+    if since is not None or until is not None :
+        low = b'0000-00-00' if since is None else raw_value(date_field(since) or since)
+        high = b'9999-99-99' if until is None else raw_value(date_field(until) or until)
+        conditions.append((column_index(record_class, 'datum'), 'range', (low, high)))
+
+    for column, value in filters.items() :
+        if column in reader_options :
+            raise ValueError(f"Option {column} is not supported by this reader.")
+        i = column_index(record_class, column)
+        if record_class.fields[i][1] is bool_field and isinstance(value, bool) :
+            conditions.append((i, 'empty', not value))
+        elif isinstance(value, (list, tuple, set, frozenset)) :
+            conditions.append((i, 'in', frozenset(map(raw_value, value))))
+        else :
+            conditions.append((i, 'eq', raw_value(value)))
+
+    return conditions
+
+
+def row_filter(record_class: Type,
+               since: Union[date, str, None],
+               until: Union[date, str, None],
+               filters: Dict[str, Any]
+               ) -> Optional[RowFilter] :
+    """ Builds a filter of rows from date range and equality filters (see `filter_conditions`). """
+    checks: List[Tuple[int, Callable[[bytes], bool]]] = []
+    for i, kind, argument in filter_conditions(record_class, since, until, filters) :
+        if kind == 'range' :
+            low, high = argument
+            checks.append((i, lambda f, low = low, high = high : low <= f <= high))
+        elif kind == 'eq' :
+            checks.append((i, argument.__eq__))
+        elif kind == 'in' :
+            checks.append((i, argument.__contains__))
+        else :
+            checks.append((i, (lambda f : len(f) == 0) if argument else (lambda f : len(f) > 0)))
+
+    return None if len(checks) == 0 else RowFilter(checks)
+
+
+def cache_file_path(file_name: str, cache_dir: str) -> str :
+    return os.path.join(cache_dir, file_name + '.csv')
+
+
+def update_cache(file_name: str, api_version: ApiVersion, cache_dir: str) -> str :
+    """ Downloads the csv file into the cache directory unless it is already cached and up to date
+    and returns path of the cached file.
+    """
+    os.makedirs(cache_dir, exist_ok = True)
+    cache_file = cache_file_path(file_name, cache_dir)
+    if not os.path.isfile(cache_file) or is_expired(cache_file, file_name, api_version) :
+        response = requests.get(f'{api_version.url}/{file_name}.csv', stream = True)
+        offsets = array('Q')
+        dates: Optional[DateIndexBuilder] = None
+        position = 0
+        with open(cache_file, 'wb') as file :
+            for line in response.iter_lines() :
+                # the header line is not indexed
+                if dates is None :
+                    dates = DateIndexBuilder(line)
+                elif len(line) > 0 :
+                    offsets.append(position)
+                    dates.add(position, line)
+                file.write(line)
+                file.write(b'\n')
+                position += len(line) + 1
+
+        offsets.append(position)
+        save_row_index(cache_file, offsets)
+        save_date_index(cache_file, (dates or DateIndexBuilder(b'')).finish(position))
+
+    return cache_file
+
+
+def cache_signature(cache_file: str) -> str :
+    """ Returns a string identifying current content of the cached file (its size and modification
+    time), files derived from the cached file store it to detect they are outdated.
+    """
+    stat = os.stat(cache_file)
+    return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def manifest_path(file_name: str, cache_dir: str) -> str :
+    return os.path.join(cache_dir, file_name, 'manifest.json')
+
+
+def load_manifest(file_name: str, cache_dir: str) -> Optional[Dict[str, Any]] :
+    """ Returns the manifest of the partitioned dataset in the cache directory, `None` if the
+    dataset is cached as a single file.
+    """
+    if not os.path.isfile(manifest_file := manifest_path(file_name, cache_dir)) :
+        return None
+    with open(manifest_file, 'r', encoding = 'utf-8') as file :
+        return json.load(file)
+
+
+def save_manifest(file_name: str, cache_dir: str, manifest: Dict[str, Any]) -> None :
+    manifest_file = manifest_path(file_name, cache_dir)
+    with open(manifest_file + '.tmp', 'w', encoding = 'utf-8') as file :
+        json.dump(manifest, file)
+    os.replace(manifest_file + '.tmp', manifest_file)
+
+
+def set_partitioning(file_name: str, cache_dir: str, period: Optional[str]) -> None :
+    """ Enables partitioned cache layout of the dataset in the cache directory (`period` is
+    `'month'` or `'week'`), or disables it (`period` is `None`).
+
+    Partitioned datasets are cached as files `<cache_dir>/<dataset>/<partition>.csv` (partitions
+    are named `YYYY-MM` or `YYYY-Www` by the `datum` column, rows with invalid dates are stored in
+    partition `undated`) instead of a single csv file, see `update_partitions`. The period is kept
+    in the manifest of the partitions, so the layout is a property of the cache directory, shared by
+    all readers of it and kept across processes. Changing the period re-partitions the dataset on
+    the next read, disabling the layout removes the partitions.
+    """
+    if period not in (None, 'month', 'week') :
+        raise ValueError(f"Invalid partitioning period '{period}', expected 'month' or 'week'.")
+
+    manifest = load_manifest(file_name, cache_dir)
+    if period is None :
+        if manifest is not None :
+            shutil.rmtree(os.path.join(cache_dir, file_name))
+    elif manifest is None or manifest['period'] != period :
+        os.makedirs(os.path.join(cache_dir, file_name), exist_ok = True)
+        # partitions of the new period are downloaded on the next read
+        save_manifest(file_name, cache_dir, { 'period': period, 'partitions': None })
+
+
+def partition_period(file_name: str, cache_dir: Optional[str]) -> Optional[str] :
+    """ Returns partitioning period of the dataset in the cache directory, `None` if it's cached as
+    a single file.
+    """
+    if cache_dir is None or (manifest := load_manifest(file_name, cache_dir)) is None :
+        return None
+    return manifest['period']
+
+
+def partition_key(value: bytes, period: str) -> str :
+    """ Returns name of the partition of raw date value. """
+    try :
+        day = date.fromisoformat(value.decode('ascii'))
+    except (UnicodeDecodeError, ValueError) :
+        return 'undated'
+
+    if period == 'month' :
+        return f'{day.year:04}-{day.month:02}'
+    year, week, _ = day.isocalendar()
+    return f'{year:04}-W{week:02}'
+
+
+def update_partitions(file_name: str, api_version: ApiVersion, cache_dir: str) -> Dict[str, Any] :
+    """ Downloads the dataset into partition files unless they are already cached and up to date and
+    returns the manifest of the partitions (`period` and content hashes of the `partitions`).
+
+    Rows are distributed into partitions while they are downloaded, each partition is written into a
+    temporary file. Partitions whose content hash didn't change are kept untouched (so are files
+    derived from them), only changed partitions replace the cached ones. Files of partitions which
+    are no longer in the manifest (e.g. of a previous period) are removed.
+    """
+    manifest = load_manifest(file_name, cache_dir)
+    if manifest is None :
+        raise ValueError(f"Dataset '{file_name}' is not partitioned in the cache directory.")
+    period = manifest['period']
+    previous: Dict[str, str] = manifest['partitions'] or {}
+    directory = os.path.join(cache_dir, file_name)
+    if manifest['partitions'] is not None \
+            and not is_expired(manifest_path(file_name, cache_dir), file_name, api_version) :
+        return manifest
+
+    os.makedirs(directory, exist_ok = True)
+    response = requests.get(f'{api_version.url}/{file_name}.csv', stream = True)
+    header: Optional[bytes] = None
+    column = -1
+    keys: Dict[bytes, str] = {}
+    files: Dict[str, Any] = {}
+    hashes: Dict[str, Any] = {}
+    try :
         for line in response.iter_lines() :
-            yield line.decode('utf-8')
+            if header is None :
+                header = line + b'\n'
+                columns = line.lstrip(b'\xef\xbb\xbf').split(b',')
+                if b'datum' not in columns :
+                    raise ValueError(f"Dataset '{file_name}' has no datum column, it can't be partitioned.")
+                column = columns.index(b'datum')
+                continue
+            if len(line) == 0 :
+                continue
+
+            parts = line.split(b',', column + 1)
+            value = parts[column] if len(parts) > column else b''
+            if (key := keys.get(value)) is None :
+                key = keys[value] = partition_key(value, period)
+            if (file := files.get(key)) is None :
+                file = files[key] = open(os.path.join(directory, key + '.csv.tmp'), 'wb')
+                file.write(header)
+                hashes[key] = hashlib.blake2b(header)
+            line += b'\n'
+            file.write(line)
+            hashes[key].update(line)
+    finally :
+        for file in files.values() :
+            file.close()
+
+    partitions: Dict[str, str] = {}
+    for key in sorted(files) :
+        partitions[key] = hashes[key].hexdigest()
+        partition_file = os.path.join(directory, key + '.csv')
+        if previous.get(key) == partitions[key] and os.path.isfile(partition_file) :
+            os.remove(partition_file + '.tmp')
+        else :
+            os.replace(partition_file + '.tmp', partition_file)
+
+    manifest = { 'period': period, 'partitions': partitions }
+    save_manifest(file_name, cache_dir, manifest)
+    # removes removed partitions and files derived from them (named by the partition)
+    for name in os.listdir(directory) :
+        if name.split('.', 1)[0] not in partitions and name != 'manifest.json' and not name.endswith('.tmp') :
+            os.remove(os.path.join(directory, name))
+    return manifest
+
+
+def cached_files(file_name: str,
+                 api_version: ApiVersion,
+                 cache_dir: str,
+                 since: Union[date, str, None] = None,
+                 until: Union[date, str, None] = None
+                 ) -> List[str] :
+    """ Updates the cache and returns paths of the cached csv files of the dataset, each starting
+    with the header line. That is the single cached file, or the partition files in order of their
+    names, only those which may contain dates between `since` and `until`.
+    """
+    if (period := partition_period(file_name, cache_dir)) is None :
+        return [update_cache(file_name, api_version, cache_dir)]
+
+    keys = sorted(update_partitions(file_name, api_version, cache_dir)['partitions'])
+    if since is not None or until is not None :
+        low = '' if since is None else partition_key(raw_value(date_field(since) or since), period)
+        high = '\uffff' if until is None else partition_key(raw_value(date_field(until) or until), period)
+        keys = [key for key in keys if key != 'undated' and low <= key <= high]
+    return [os.path.join(cache_dir, file_name, key + '.csv') for key in keys]
+
+
+def dataset_signature(file_name: str, api_version: ApiVersion, cache_dir: str) -> str :
+    """ Updates the cache and returns a string identifying current content of the cached dataset
+    (see `cache_signature`, partitioned datasets are identified by hashes of their partitions).
+    """
+    if partition_period(file_name, cache_dir) is None :
+        return cache_signature(update_cache(file_name, api_version, cache_dir))
+
+    partitions = update_partitions(file_name, api_version, cache_dir)['partitions']
+    digest = hashlib.blake2b(json.dumps(partitions, sort_keys = True).encode('utf-8'), digest_size = 16)
+    return f'partitions:{digest.hexdigest()}'
+
+
+def row_index_path(cache_file: str) -> str :
+    return os.path.splitext(cache_file)[0] + '.idx'
+
+
+def build_row_index(cache_file: str) -> array :
+    """ Returns byte offsets of the non-empty data rows of the cached file followed by the size of
+    the file.
+    """
+    offsets = array('Q')
+    with open(cache_file, 'rb') as file :
+        position = len(file.readline())
+        while len(lines := list(islice(file, 1 << 20))) > 0 :
+            starts = list(accumulate(map(len, lines), initial = position))
+            position = starts.pop()
+            if lines.count(b'\n') == 0 and lines.count(b'\r\n') == 0 :
+                offsets.extend(starts)
+            else :
+                offsets.extend(start for start, line in zip(starts, lines) if len(line.rstrip(b'\r\n')) > 0)
+
+    offsets.append(position)
+    return offsets
+
+
+def save_row_index(cache_file: str, offsets: array) -> None :
+    """ Stores the row offsets into `<dataset>.idx` file next to the cached file, together with the
+    signature of the cached file.
+    """
+    index_file = row_index_path(cache_file)
+    with open(index_file + '.tmp', 'wb') as file :
+        file.write(cache_signature(cache_file).encode('ascii'))
+        file.write(b'\n')
+        file.write(offsets.tobytes())
+    os.replace(index_file + '.tmp', index_file)
+
+
+def load_row_index(cache_file: str) -> array :
+    """ Returns the row offsets of the cached file (see `build_row_index`), from the index file if it
+    is up to date, otherwise the index is rebuilt and saved.
+    """
+    index_file = row_index_path(cache_file)
+    if os.path.isfile(index_file) :
+        with open(index_file, 'rb') as file :
+            signature, _, data = file.read().partition(b'\n')
+        if signature.decode('ascii') == cache_signature(cache_file) :
+            offsets = array('Q')
+            offsets.frombytes(data)
+            return offsets
+
+    offsets = build_row_index(cache_file)
+    save_row_index(cache_file, offsets)
+    return offsets
+
+
+class DateIndexBuilder :
+    """ Collects byte ranges of the dates (`datum` column) of a csv file written in date order. """
+
+    def __init__(self, header: bytes) :
+        columns = header.rstrip(b'\r\n').lstrip(b'\xef\xbb\xbf').split(b',')
+        self._column = columns.index(b'datum') if b'datum' in columns else -1
+        self._in_order = self._column >= 0
+        self._dates: List[List[Any]] = []
+
+
+    def add(self, start: int, line: bytes) -> None :
+        """ Adds non-empty data line starting at offset `start`. """
+        if not self._in_order :
+            return
+
+        parts = line.split(b',', self._column + 1)
+        value = parts[self._column] if len(parts) > self._column else b''
+        if len(self._dates) > 0 :
+            last = self._dates[-1]
+            if value == last[0] :
+                return
+            if value < last[0] :
+                self._in_order = False
+                self._dates = []
+                return
+            last[2] = start
+
+        self._dates.append([value, start, start])
+
+
+    def finish(self, end: int) -> Dict[str, Any] :
+        """ Returns the index, `end` is the size of the file. """
+        if len(self._dates) > 0 :
+            self._dates[-1][2] = end
+        return {
+            'in_order': self._in_order,
+            'dates': [[value.decode('utf-8'), start, stop] for value, start, stop in self._dates],
+        }
+
+
+def date_index_path(cache_file: str) -> str :
+    return os.path.splitext(cache_file)[0] + '.dates.json'
+
+
+def build_date_index(cache_file: str) -> Dict[str, Any] :
+    """ Scans the cached file and returns byte ranges of its dates (see `DateIndexBuilder`). """
+    with open(cache_file, 'rb') as file :
+        builder = DateIndexBuilder(file.readline())
+        position = file.tell()
+        for line in file :
+            if len(stripped := line.rstrip(b'\r\n')) > 0 :
+                builder.add(position, stripped)
+            position += len(line)
+
+    return builder.finish(position)
+
+
+def save_date_index(cache_file: str, index: Dict[str, Any]) -> None :
+    """ Stores the date index into `<dataset>.dates.json` file next to the cached file, together
+    with the signature of the cached file.
+    """
+    index_file = date_index_path(cache_file)
+    with open(index_file + '.tmp', 'w', encoding = 'utf-8') as file :
+        json.dump({ 'signature': cache_signature(cache_file), **index }, file)
+    os.replace(index_file + '.tmp', index_file)
+
+
+def load_date_index(cache_file: str) -> Dict[str, Any] :
+    """ Returns the date index of the cached file, from the index file if it is up to date,
+    otherwise the index is rebuilt and saved.
+    """
+    index_file = date_index_path(cache_file)
+    if os.path.isfile(index_file) :
+        with open(index_file, 'r', encoding = 'utf-8') as file :
+            index = json.load(file)
+        if index.get('signature') == cache_signature(cache_file) :
+            return index
+
+    index = build_date_index(cache_file)
+    save_date_index(cache_file, index)
+    return index
+
+
+def date_span(cache_file: str,
+              since: Union[date, str, None],
+              until: Union[date, str, None]
+              ) -> Optional[Tuple[int, int]] :
+    """ Returns byte range of the cached file containing all rows with `datum` between `since` and
+    `until` (inclusive), or `None` if the whole file has to be scanned (no date bounds, or the
+    file is not in date order).
+    """
+    if since is None and until is None :
+        return None
+
+    index = load_date_index(cache_file)
+    if not index['in_order'] :
+        return None
+
+    dates = index['dates']
+    if len(dates) == 0 :
+        return 0, 0
+
+    keys = [value for value, _, _ in dates]
+    low = bisect_left(keys, '0000-00-00' if since is None else raw_value(date_field(since) or since).decode('utf-8'))
+    high = bisect_right(keys, '9999-99-99' if until is None else raw_value(date_field(until) or until).decode('utf-8'))
+    if low >= high :
+        return dates[0][1], dates[0][1]
+    return dates[low][1], dates[high - 1][2]
+
+
+def span_lines(file: Any, start: int, end: int, block_size: int = 1 << 20) -> Iterator[bytes] :
+    """ Yields lines (without the line feeds) of the byte range of the file. """
+    file.seek(start)
+    rest = b''
+    while start < end and len(data := file.read(min(block_size, end - start))) > 0 :
+        start += len(data)
+        lines = (rest + data).split(b'\n')
+        rest = lines.pop()
+        yield from lines
+
+    if len(rest) > 0 :
+        yield rest
+
+
+def get_csv_raw_lines(file_name: str,
+                      api_version: ApiVersion,
+                      cache_dir: Optional[str],
+                      since: Union[date, str, None] = None,
+                      until: Union[date, str, None] = None
+                      ) -> Iterator[bytes] :
+    """ Yields raw lines of the csv file (header included). With date bounds, only the partitions and
+    the part of each cached file containing the dates are read (if the file is in date order), rows
+    still have to be filtered by the caller.
+    """
+    if cache_dir is not None :
+        first_file = True
+        for cache_file in cached_files(file_name, api_version, cache_dir, since, until) :
+            with open(cache_file, 'rb') as file :
+                header = file.readline().rstrip(b'\r\n')
+                if first_file :
+                    first_file = False
+                    yield header
+
+                if (span := date_span(cache_file, since, until)) is not None :
+                    for line in span_lines(file, *span) :
+                        yield line.rstrip(b'\r')
+                else :
+                    while len(line := file.readline()) > 0 :
+                        yield line.rstrip(b'\r\n')
+
+    else :
+        response = requests.get(f'{api_version.url}/{file_name}.csv', stream = True)
+        yield from response.iter_lines()
+
+
+def get_csv_raw_chunks(file_name: str,
+                       api_version: ApiVersion,
+                       cache_dir: Optional[str],
+                       size: int,
+                       since: Union[date, str, None] = None,
+                       until: Union[date, str, None] = None
+                       ) -> Iterator[List[bytes]] :
+    """ Yields lists of up to `size` raw lines. Lines may still end with a line break. Date bounds
+    narrow the read part of the cache as in `get_csv_raw_lines`.
+    """
+    if cache_dir is not None :
+        first_file = True
+        for cache_file in cached_files(file_name, api_version, cache_dir, since, until) :
+            with open(cache_file, 'rb') as file :
+                header = file.readline()
+                header = [header] if first_file else []
+                first_file = False
+                span = date_span(cache_file, since, until)
+                source = file if span is None else span_lines(file, *span)
+                while len(lines := list(source) if size <= 0 else list(islice(source, size))) > 0 :
+                    yield header + lines if len(header) > 0 else lines
+                    header = []
+                if len(header) > 0 :
+                    yield header
+
+    else :
+        response = requests.get(f'{api_version.url}/{file_name}.csv', stream = True)
+        source = response.iter_lines()
+        while len(lines := list(source) if size <= 0 else list(islice(source, size))) > 0 :
+            yield lines
+
+
+def get_csv_lines(file_name: str,
+                  constructor: Type,
+                  api_version: ApiVersion,
+                  cache_dir: Optional[str]
+                  ) -> Iterator[str] :
+
+    for line in get_csv_raw_lines(file_name, api_version, cache_dir) :
+        yield line.decode('utf-8')
 
 
 def get_many(file_name: str,
              constructor: Type[T],
              api_version: ApiVersion,
-             cache_dir: Optional[str]
+             cache_dir: Optional[str],
+             columns: Optional[Sequence[str]] = None,
+             since: Union[date, str, None] = None,
+             until: Union[date, str, None] = None,
+             reuse: bool = False,
+             intern: Union[bool, CodeTables] = False,
+             **filters: Any
              ) -> Iterator[T] :
+    """ Yields records of the dataset.
+
+    With `reuse` the same record instance is refilled in place for every row instead of allocating
+    a new one, which avoids garbage collector churn in pure streaming aggregations. The yielded
+    record is only valid until the iterator is advanced, it must not be kept (e.g. stored in a list
+    or used as a dict key) past one step, copy the needed attributes instead.
+
+    With `intern` values of the categorical columns are interned, so materialized rows share a
+    single instance of each distinct value. `True` interns with new code tables of this read, code
+    tables (see `new_code_tables`) can be passed instead to share them between reads.
+    """
+    if reuse and columns is not None :
+        raise ValueError('Option reuse cannot be combined with columns.')
+
+    target = constructor.__new__(constructor) if reuse else None
+    tables = interned_tables(constructor, intern)
+    if columns is not None or since is not None or until is not None or len(filters) > 0 \
+            or target is not None or tables is not None :
+        yield from get_selected(file_name,
+                                constructor,
+                                api_version,
+                                cache_dir,
+                                columns,
+                                row_filter(constructor, since, until, filters),
+                                target,
+                                since,
+                                until,
+                                tables)
+        return
 
     first_line = True
     for line in get_csv_lines(file_name, constructor, api_version, cache_dir) :
@@ -84,6 +752,237 @@ def get_many(file_name: str,
             yield constructor(line.split(','))
 
 
+def row_parser(record_class: Type,
+               columns: Optional[Sequence[str]],
+               accept: Optional[RowFilter],
+               target: Any = None,
+               tables: Optional[CodeTables] = None
+               ) -> Callable[[bytes], Any] :
+    """ Returns function parsing a raw csv line (without the line break) into a record or a named
+    tuple of the requested columns, or into `None` if the row doesn't match the filter. When
+    `target` record is given, it is refilled and returned instead of creating new records. Values of
+    the categorical columns are interned if code `tables` are given.
+
+    Filter is evaluated on the raw bytes of the fields before anything is decoded or converted.
+    Lines are split only up to the last column needed by the filter or the projection, the rest of
+    the line is never split nor decoded.
+    """
+    if columns is None :
+        interned = [] if tables is None else interned_fields(record_class, tables)
+        refill = record_class.__init__
+
+        def parse_record(line: bytes) -> Any :
+            if accept is None :
+                parts = line.decode('utf-8').split(',')
+            else :
+                raw_parts = line.split(b',')
+                if not accept(raw_parts) :
+                    return None
+                parts = [part.decode('utf-8') for part in raw_parts]
+
+            for i, canonical in interned :
+                parts[i] = canonical(parts[i], parts[i])
+
+            if target is None :
+                return record_class(parts)
+
+            refill(target, parts)
+            return target
+
+        return parse_record
+
+    make = projection_type(record_class, columns)._make
+    indexes = [column_index(record_class, column) for column in columns]
+    plan = []
+    for i in indexes :
+        name, convert = record_class.fields[i]
+        plan.append((i, tables[name].intern if tables is not None and name in tables else convert))
+    max_split = max(indexes, default = -1) + 1
+    if accept is not None :
+        max_split = max(max_split, accept.max_index + 1)
+
+    def parse_projection(line: bytes) -> Any :
+        parts = line.split(b',', max_split)
+        if accept is None or accept(parts) :
+            return make([convert(parts[i].decode('utf-8')) for i, convert in plan])
+        else :
+            return None
+
+    return parse_projection
+
+
+def get_selected(file_name: str,
+                 record_class: Type,
+                 api_version: ApiVersion,
+                 cache_dir: Optional[str],
+                 columns: Optional[Sequence[str]],
+                 accept: Optional[RowFilter],
+                 target: Any = None,
+                 since: Union[date, str, None] = None,
+                 until: Union[date, str, None] = None,
+                 tables: Optional[CodeTables] = None
+                 ) -> Iterator :
+    """ Yields rows matching the filter, either as full records (refilled `target` if given) or as
+    named tuples of the requested columns. `since` and `until` only narrow the read part of the
+    cached file, rows are checked by the filter.
+    """
+    parse = row_parser(record_class, columns, accept, target, tables)
+    first_line = True
+    for line in get_csv_raw_lines(file_name, api_version, cache_dir, since, until) :
+        if first_line :
+            first_line = False
+        elif len(line) > 0 and (row := parse(line)) is not None :
+            yield row
+
+
+def get_batches(file_name: str,
+                constructor: Type[T],
+                api_version: ApiVersion,
+                cache_dir: Optional[str],
+                size: int,
+                columns: Optional[Sequence[str]] = None,
+                since: Union[date, str, None] = None,
+                until: Union[date, str, None] = None,
+                intern: Union[bool, CodeTables] = False,
+                **filters: Any
+                ) -> Iterator[List[T]] :
+    """ Yields lists of rows parsed in bulk from chunks of `size` lines (`size <= 0` reads the
+    whole file as one chunk).
+
+    Accepts the same options as `get_many` except `reuse` (rows of a batch are kept together, so
+    they can't share one record). Batches contain at most `size` rows, filtered batches may be
+    smaller, empty batches are skipped.
+    """
+    parse = row_parser(constructor,
+                       columns,
+                       row_filter(constructor, since, until, filters),
+                       tables = interned_tables(constructor, intern))
+    first_chunk = True
+    for lines in get_csv_raw_chunks(file_name, api_version, cache_dir, size, since, until) :
+        if first_chunk :
+            first_chunk = False
+            lines = lines[1:]
+
+        batch = [row for raw in lines
+                 if len(line := raw.rstrip(b'\r\n')) > 0 and (row := parse(line)) is not None]
+        if len(batch) > 0 :
+            yield batch
+
+
+def reversed_lines(file: Any, block_size: int = 1 << 16) -> Iterator[bytes] :
+    """ Yields data lines of the file (without the header line and line feeds) from the last one,
+    reading the file backward in blocks.
+    """
+    file.seek(0)
+    header_end = len(file.readline())
+    position = file.seek(0, os.SEEK_END)
+    rest = b''
+    while position > header_end :
+        size = min(block_size, position - header_end)
+        position -= size
+        file.seek(position)
+        lines = (file.read(size) + rest).split(b'\n')
+        rest = lines[0]
+        yield from reversed(lines[1:])
+
+    yield rest
+
+
+def valid_date(value: bytes, invalid: Set[bytes]) -> bool :
+    """ Tells whether raw field is a valid date, values found invalid are remembered in `invalid`. """
+    if value in invalid :
+        return False
+    try :
+        date.fromisoformat(value.decode('ascii'))
+        return True
+    except (UnicodeDecodeError, ValueError) :
+        invalid.add(value)
+        return False
+
+
+def tail_rows(cache_files: List[str], i: int, days: int, parse: Callable[[bytes], Any]) -> Optional[List] :
+    """ Reads the cached files (consecutive parts of the dataset) backward and returns parsed rows of
+    the last `days` dates (field `i`), or `None` if the files are not in date order. Rows with empty
+    or invalid date are skipped.
+    """
+    dates: List[bytes] = []
+    invalid: Set[bytes] = set()
+    rows = []
+    for cache_file in reversed(cache_files) :
+        if not load_date_index(cache_file)['in_order'] :
+            return None
+        with open(cache_file, 'rb') as file :
+            for raw in reversed_lines(file) :
+                parts = (line := raw.rstrip(b'\r')).split(b',', i + 1)
+                if len(line) == 0 or len(parts) <= i or len(value := parts[i]) == 0 :
+                    continue
+                if len(dates) == 0 or value != dates[-1] :
+                    if not valid_date(value, invalid) :
+                        continue
+                    if len(dates) > 0 and value > dates[-1] :
+                        return None
+                    if len(dates) == days :
+                        rows.reverse()
+                        return rows
+                    dates.append(value)
+                if (row := parse(line)) is not None :
+                    rows.append(row)
+
+    rows.reverse()
+    return rows
+
+
+def get_tail(file_name: str,
+             record_class: Type,
+             api_version: ApiVersion,
+             cache_dir: Optional[str],
+             days: int,
+             columns: Optional[Sequence[str]] = None,
+             since: Union[date, str, None] = None,
+             until: Union[date, str, None] = None,
+             **filters: Any
+             ) -> List :
+    """ Returns rows of the last `days` dates (`datum` column) of the dataset, in order of the file
+    (grouped by date for files not in date order).
+
+    The dates are the latest valid dates of the whole dataset (rows with empty or invalid date are
+    never returned), the filters (same options as `get_many`, except `reuse`) only select rows of
+    those dates. Cached files in date order (see `load_date_index`) are read backward from the end
+    in blocks until the date boundary is passed, other files are scanned whole.
+    """
+    parse = row_parser(record_class, columns, row_filter(record_class, since, until, filters))
+    i = column_index(record_class, 'datum')
+    if days <= 0 :
+        return []
+
+    if cache_dir is not None :
+        files = cached_files(file_name, api_version, cache_dir)
+        if (rows := tail_rows(files, i, days, parse)) is not None :
+            return rows
+
+    # not in date order, keep rows of the latest dates seen so far
+    by_date: Dict[bytes, List] = {}
+    invalid: Set[bytes] = set()
+    first_line = True
+    for line in get_csv_raw_lines(file_name, api_version, cache_dir) :
+        parts = line.split(b',', i + 1)
+        if first_line :
+            first_line = False
+        elif len(line) > 0 and len(parts) > i and len(value := parts[i]) > 0 :
+            if value not in by_date :
+                if not valid_date(value, invalid) :
+                    continue
+                by_date[value] = []
+                if len(by_date) > 2 * days :
+                    for old in sorted(by_date)[:-days] :
+                        del by_date[old]
+            if value in by_date and (row := parse(line)) is not None :
+                by_date[value].append(row)
+
+    latest = set(sorted(by_date)[-days:])
+    return [row for value, rows in by_date.items() if value in latest for row in rows]
+
+
 def get_one(file_name: str,
             constructor: Type[T],
             api_version: ApiVersion,
@@ -100,6 +999,10 @@ def get_one(file_name: str,
     raise Exception('Unable to load data.')
 
 
+def str_field(field: str) -> str :
+    return field
+
+
 def bool_field(field: str) -> bool :
     return len(field) > 0
 
@@ -118,9 +1021,9 @@ def float_field(field: str) -> float :
         return -1.0
 
 
-def date_field(field: str) -> Optional[date] :
+def date_field(field: Union[date, str]) -> Optional[date] :
     try :
-        return date.fromisoformat(field)
+        return field if isinstance(field, date) else date.fromisoformat(field)
     except ValueError :
         return None
 
@@ -0,0 +1,389 @@
+from .api import ApiVersion, bool_field, column_index, date_field, filter_conditions, float_field
+from .api import cached_files, dataset_signature, date_span, int_field, str_field
+from .parallel import newline_ranges
+from datetime import date
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+import os
+import requests
+
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+try :
+    import pandas
+except ImportError :
+    pandas = None
+
+try :
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.ipc
+except ImportError :
+    pyarrow = None
+
+
+class CategoricalColumn(NamedTuple) :
+    """ Text column stored as integer codes into a table of distinct values.
+
+    Attributes
+    ----------
+
+    codes: numpy.ndarray
+        Array of `int32` codes, `categories[codes[i]]` is the value of i-th row.
+
+    categories: List[str]
+        Sorted distinct values of the column.
+
+    """
+
+    codes: Any
+    categories: List[str]
+
+    def values(self) -> Any :
+        """ Returns the decoded values as a numpy array of objects. """
+        return numpy.array(self.categories, dtype = object)[self.codes]
+
+
+def require_numpy() -> Any :
+    if numpy is None :
+        raise ImportError('Columnar loading requires numpy (pip install numpy).')
+    return numpy
+
+
+def split_lines(data: bytes, field_count: int, indexes: Sequence[int]) -> List[Any] :
+    """ Splits lines of the data one by one (for lines with unexpected number of fields, which are
+    padded with empty fields or cut), returns `bytes` arrays of the fields with given indexes.
+    """
+    fields = []
+    for line in data.replace(b'\r', b'').split(b'\n') :
+        if len(line) > 0 :
+            parts = line.split(b',')
+            parts.extend([b''] * (field_count - len(parts)))
+            fields.extend(parts[:field_count])
+
+    return [numpy.array(fields[i::field_count], dtype = bytes) for i in indexes]
+
+
+def split_chunk(data: bytes, field_count: int, indexes: Sequence[int]) -> List[Any] :
+    """ Splits lines of the data into `bytes` arrays of the fields with given indexes.
+
+    Positions of the separators are found in a numpy view of the data, fields of each column are
+    then copied out of the data by their start positions and lengths, so no per-field objects are
+    created. Empty lines are skipped, data with a line of unexpected number of fields is split by
+    `split_lines`.
+    """
+    if b'\r' in data :
+        data = data.replace(b'\r', b'')
+    if not data.endswith(b'\n') :
+        data += b'\n'
+    buffer = numpy.frombuffer(data, dtype = numpy.uint8)
+    # each field ends with a comma or a line feed
+    ends = numpy.flatnonzero((buffer == ord(',')) | (buffer == ord('\n')))
+    starts = numpy.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    line_ends = numpy.flatnonzero(buffer[ends] == ord('\n'))
+    counts = numpy.diff(line_ends, prepend = -1)
+    empty = (counts == 1) & (starts[line_ends] == ends[line_ends])
+    if empty.any() :
+        keep = numpy.ones(len(ends), dtype = bool)
+        keep[line_ends[empty]] = False
+        starts, ends, counts = starts[keep], ends[keep], counts[~empty]
+    if not (counts == field_count).all() :
+        return split_lines(data, field_count, indexes)
+
+    lengths = ends - starts
+    width = max(int(lengths.max()) if len(lengths) > 0 else 0, 1)
+    # windows of `width` bytes starting at each position, fields are copied as whole windows and
+    # the bytes after their ends are zeroed (trailing zeros are not part of numpy bytes values)
+    padded = numpy.append(buffer, numpy.zeros(width, dtype = numpy.uint8))
+    windows = numpy.lib.stride_tricks.sliding_window_view(padded, width)
+    columns = []
+    for i in indexes :
+        column_lengths = lengths[i::field_count]
+        column_width = max(int(column_lengths.max()) if len(column_lengths) > 0 else 0, 1)
+        fields = windows[starts[i::field_count], :column_width]
+        fields[numpy.arange(column_width) >= column_lengths[:, None]] = 0
+        columns.append(fields.view(f'S{column_width}').reshape(-1))
+
+    return columns
+
+
+def get_raw_columns(file_name: str,
+                    record_class: type,
+                    api_version: ApiVersion,
+                    cache_dir: Optional[str],
+                    indexes: Sequence[int],
+                    chunk_size: int = 64 * 1024 * 1024,
+                    since: Union[date, str, None] = None,
+                    until: Union[date, str, None] = None
+                    ) -> Iterator[List[Any]] :
+    """ Yields chunks of the csv file as lists of `bytes` arrays of the fields with given indexes.
+
+    Fields of a whole chunk are split at once by numpy (see `split_chunk`), no per-row or per-field
+    objects are created. Date bounds narrow the read part of the cached file (see `date_span`),
+    rows are not filtered.
+    """
+    field_count = len(record_class.fields)
+    if cache_dir is None :
+        data = requests.get(f'{api_version.url}/{file_name}.csv').content
+        yield split_chunk(data[data.find(b'\n') + 1:], field_count, indexes)
+        return
+
+    for cache_file in cached_files(file_name, api_version, cache_dir, since, until) :
+        with open(cache_file, 'rb') as file :
+            for start, end in newline_ranges(cache_file, chunk_size, date_span(cache_file, since, until)) :
+                file.seek(start)
+                yield split_chunk(file.read(end - start), field_count, indexes)
+
+
+def condition_mask(column: Any, kind: str, argument: Any) -> Any :
+    """ Evaluates condition created by `filter_conditions` on a `bytes` array. """
+    if kind == 'range' :
+        return (column >= argument[0]) & (column <= argument[1])
+    elif kind == 'eq' :
+        return column == argument
+    elif kind == 'in' :
+        return numpy.isin(column, list(argument))
+    else :
+        return (column == b'') if argument else (column != b'')
+
+
+def convert_column(converter: Any, raw: Any) -> Any :
+    """ Converts `bytes` array into a typed array according to the converter of the field. """
+    if converter is int_field or converter is float_field :
+        mask = raw == b''
+        raw = numpy.where(mask, b'0', raw)
+        if converter is float_field :
+            return numpy.ma.masked_array(raw.astype(numpy.float64), mask)
+        values = raw.astype(numpy.int64)
+        if len(values) > 0 and values.min() >= -2**31 and values.max() < 2**31 :
+            values = values.astype(numpy.int32)
+        return numpy.ma.masked_array(values, mask)
+    elif converter is bool_field :
+        return raw != b''
+    elif converter is date_field :
+        try :
+            return raw.astype('datetime64[D]')
+        except ValueError :
+            return numpy.array([date_field(field.decode('utf-8')) or 'NaT' for field in raw],
+                               dtype = 'datetime64[D]')
+    else :
+        categories, codes = numpy.unique(raw, return_inverse = True)
+        return CategoricalColumn(codes.astype(numpy.int32).reshape(-1),
+                                 [category.decode('utf-8') for category in categories])
+
+
+def load_columns(file_name: str,
+                 record_class: type,
+                 api_version: ApiVersion,
+                 cache_dir: Optional[str],
+                 columns: Optional[Sequence[str]] = None,
+                 since: Union[date, str, None] = None,
+                 until: Union[date, str, None] = None,
+                 arrow_cache: bool = False,
+                 **filters: Any
+                 ) -> Dict[str, Any] :
+    """ Loads the dataset into a dict of numpy arrays, one per column.
+
+    Integer and float columns are masked arrays (`int32` or `int64`, `float64`) with empty fields
+    masked instead of the `-1` sentinel, dates are `datetime64[D]` arrays (empty or invalid dates
+    are `NaT`), bools are `bool` arrays and text columns are `CategoricalColumn`s. Arrays are filled
+    in bulk from the raw fields, without creating records. Accepts the same `columns` and filter
+    options as `get_many`, filters are evaluated on the raw fields before conversion.
+
+    With `arrow_cache` (and caching enabled) the columns are read from the memory mapped Arrow file
+    kept next to the cached csv file (see `arrow_table`) instead of parsing the csv file.
+    """
+    require_numpy()
+    if arrow_cache and cache_dir is not None :
+        table = arrow_table(file_name, record_class, api_version, cache_dir)
+        return table_columns(record_class, table, columns, since, until, filters)
+
+    names = [name for name, _ in record_class.fields] if columns is None else list(columns)
+    conditions = filter_conditions(record_class, since, until, filters)
+    indexes = [column_index(record_class, name) for name in names]
+    needed = sorted(set(indexes) | { i for i, _, _ in conditions })
+    position = { index: position for position, index in enumerate(needed) }
+
+    chunks: List[List[Any]] = []
+    for raw_columns in get_raw_columns(file_name,
+                                       record_class,
+                                       api_version,
+                                       cache_dir,
+                                       needed,
+                                       since = since,
+                                       until = until) :
+        if len(conditions) > 0 :
+            mask = numpy.ones(len(raw_columns[0]), dtype = bool)
+            for i, kind, argument in conditions :
+                mask &= condition_mask(raw_columns[position[i]], kind, argument)
+            raw_columns = [column[mask] for column in raw_columns]
+        chunks.append([raw_columns[position[i]] for i in indexes])
+
+    result: Dict[str, Any] = {}
+    for n, (name, index) in enumerate(zip(names, indexes)) :
+        raw = numpy.concatenate([chunk[n] for chunk in chunks]) if len(chunks) > 0 \
+            else numpy.array([], dtype = bytes)
+        result[name] = convert_column(record_class.fields[index][1], raw)
+
+    return result
+
+
+def to_dataframe(file_name: str,
+                 record_class: type,
+                 api_version: ApiVersion,
+                 cache_dir: Optional[str],
+                 columns: Optional[Sequence[str]] = None,
+                 **options: Any
+                 ) -> Any :
+    """ Loads the dataset into a pandas DataFrame built from the arrays of `load_columns`.
+
+    Integer and float columns use nullable `Int32`/`Int64`/`Float64` dtypes (empty fields are `NA`
+    instead of `-1`), dates are `datetime64`, low-cardinality text columns (`categorical` of the
+    record class) are `category` and other text columns are `string`. Accepts the same options as
+    `load_columns`.
+    """
+    if pandas is None :
+        raise ImportError('DataFrame export requires pandas (pip install pandas).')
+
+    arrays = load_columns(file_name, record_class, api_version, cache_dir, columns, **options)
+    data: Dict[str, Any] = {}
+    for name, array in arrays.items() :
+        if isinstance(array, CategoricalColumn) :
+            categorical = pandas.Categorical.from_codes(array.codes, array.categories)
+            data[name] = categorical if name in record_class.categorical \
+                else pandas.array(categorical.astype(object), dtype = 'string')
+        elif isinstance(array, numpy.ma.MaskedArray) :
+            mask = numpy.ma.getmaskarray(array)
+            if array.dtype.kind == 'f' :
+                data[name] = pandas.arrays.FloatingArray(array.data, mask)
+            else :
+                data[name] = pandas.arrays.IntegerArray(array.data, mask)
+        else :
+            data[name] = array
+
+    return pandas.DataFrame(data, columns = list(arrays))
+
+
+def require_pyarrow() -> Any :
+    if pyarrow is None :
+        raise ImportError('Arrow cache requires pyarrow (pip install pyarrow).')
+    return pyarrow
+
+
+def arrow_table(file_name: str, record_class: type, api_version: ApiVersion, cache_dir: str) -> Any :
+    """ Returns the dataset as a memory mapped Arrow table.
+
+    The table is stored in Arrow IPC file `<dataset>.arrow` next to the cached csv file. It is
+    converted once from the csv file and converted again whenever the csv file changes (the
+    signature of the csv file is stored in the schema metadata). Numbers are nullable `int32`,
+    `int64` or `float64` columns, dates are `date32`, text columns are dictionary encoded.
+    """
+    require_pyarrow()
+    arrow_file = os.path.join(cache_dir, file_name + '.arrow')
+    signature = dataset_signature(file_name, api_version, cache_dir).encode('ascii')
+    if os.path.isfile(arrow_file) :
+        table = pyarrow.ipc.open_file(pyarrow.memory_map(arrow_file)).read_all()
+        if (table.schema.metadata or {}).get(b'csv_signature') == signature :
+            return table
+
+    arrays = load_columns(file_name, record_class, api_version, cache_dir)
+    table = pyarrow.table({ name: arrow_array(array) for name, array in arrays.items() })
+    table = table.replace_schema_metadata({ b'csv_signature': signature })
+    temporary_file = arrow_file + '.tmp'
+    with pyarrow.OSFile(temporary_file, 'wb') as sink :
+        with pyarrow.ipc.new_file(sink, table.schema) as writer :
+            writer.write_table(table)
+    os.replace(temporary_file, arrow_file)
+    return pyarrow.ipc.open_file(pyarrow.memory_map(arrow_file)).read_all()
+
+
+def arrow_array(array: Any) -> Any :
+    """ Converts an array returned by `load_columns` into an Arrow array. """
+    if isinstance(array, CategoricalColumn) :
+        return pyarrow.DictionaryArray.from_arrays(array.codes, array.categories)
+    elif isinstance(array, numpy.ma.MaskedArray) :
+        return pyarrow.array(array.data, mask = numpy.ma.getmaskarray(array))
+    elif array.dtype.kind == 'M' :
+        return pyarrow.array(array, type = pyarrow.date32())
+    else :
+        return pyarrow.array(array)
+
+
+def arrow_condition(column: Any, converter: Any, kind: str, argument: Any) -> Any :
+    """ Evaluates condition created by `filter_conditions` on a typed Arrow column. """
+    compute = pyarrow.compute
+
+    def typed(raw: bytes) -> Any :
+        return raw.decode('utf-8') if converter is str_field else converter(raw.decode('utf-8'))
+
+    if kind == 'range' :
+        low, high = (date_field(bound.decode('ascii')) for bound in argument)
+        mask = compute.is_valid(column)
+        if low is not None :
+            mask = compute.and_(mask, compute.greater_equal(column, pyarrow.scalar(low)))
+        if high is not None :
+            mask = compute.and_(mask, compute.less_equal(column, pyarrow.scalar(high)))
+        return mask
+    elif kind == 'empty' or (kind == 'eq' and argument == b'' and converter is not str_field) :
+        empty = argument if kind == 'empty' else True
+        if converter is bool_field :
+            return compute.equal(column, not empty)
+        elif converter is str_field :
+            return compute.equal(column, '') if empty else compute.not_equal(column, '')
+        else :
+            return compute.is_null(column) if empty else compute.is_valid(column)
+    elif kind == 'eq' :
+        return compute.fill_null(compute.equal(column, typed(argument)), False)
+    else :
+        values = [typed(value) for value in argument if value != b'' or converter is str_field]
+        mask = compute.is_in(column, value_set = pyarrow.array(values, type = column.type.value_type
+                             if pyarrow.types.is_dictionary(column.type) else column.type))
+        if b'' in argument and converter is not str_field :
+            mask = compute.or_(mask, compute.is_null(column))
+        return mask
+
+
+def table_columns(record_class: type,
+                  table: Any,
+                  columns: Optional[Sequence[str]],
+                  since: Union[date, str, None],
+                  until: Union[date, str, None],
+                  filters: Dict[str, Any]
+                  ) -> Dict[str, Any] :
+    """ Selects and filters columns of an Arrow table and returns them in the format of
+    `load_columns`. Unfiltered numeric columns without nulls are zero copy views of the table.
+    """
+    names = [name for name, _ in record_class.fields] if columns is None else list(columns)
+    for name in names :
+        column_index(record_class, name)
+
+    conditions = filter_conditions(record_class, since, until, filters)
+    if len(conditions) > 0 :
+        mask = None
+        for i, kind, argument in conditions :
+            name, converter = record_class.fields[i]
+            condition = arrow_condition(table.column(name), converter, kind, argument)
+            mask = condition if mask is None else pyarrow.compute.and_(mask, condition)
+        table = table.select(names).filter(mask)
+
+    result: Dict[str, Any] = {}
+    for name in names :
+        column = table.column(name).combine_chunks()
+        if pyarrow.types.is_dictionary(column.type) :
+            result[name] = CategoricalColumn(column.indices.to_numpy(zero_copy_only = False),
+                                             column.dictionary.to_pylist())
+        elif pyarrow.types.is_date32(column.type) :
+            result[name] = column.to_numpy(zero_copy_only = False).astype('datetime64[D]')
+        elif pyarrow.types.is_boolean(column.type) :
+            result[name] = column.to_numpy(zero_copy_only = False)
+        else :
+            mask = column.is_null().to_numpy(zero_copy_only = False)
+            values = column.to_numpy() if column.null_count == 0 \
+                else column.fill_null(0).to_numpy()
+            result[name] = numpy.ma.masked_array(values, mask)
+
+    return result
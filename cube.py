@@ -0,0 +1,262 @@
+from .api import ApiVersion, dataset_signature, date_field
+from .columnar import require_numpy
+from .rollup import load_rollup, measures
+from datetime import date
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Type, Union
+import os
+
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+# dimensions of the cube, `region` stands for pairs of `kraj_nuts_kod` and `okres_lau_kod`
+cube_dimensions = ('datum', 'region', 'vekova_skupina', 'pohlavi')
+
+Labels = Union[Any, Iterable[Any], None]
+
+
+def band_order(band: str) -> Tuple[int, str] :
+    """ Sort key of age bands (`'0-4'` … `'95+'`), the unknown band (empty) goes last. """
+    return (int(band.rstrip('+').split('-')[0]), band) if band != '' else (1000, band)
+
+
+class OsobyCube :
+    """ Dense cube of numbers of infected persons (dataset `osoby`) by date, region, age band and
+    sex, built from the daily rollup of the dataset. Rows without a valid date are not in the cube
+    (unlike in the rollup, where they are grouped under `datum` `None`).
+
+    `values` is an array of shape (dates × regions × age bands × sexes × measures). Every day from
+    the first to the last date of the dataset has a slice, days without cases are zeros. Okresy
+    belong to a single kraj, so instead of a sparse kraj × okres product the cube has one region
+    axis of the (kraj, okres) pairs which occur in the dataset (including pairs with unknown
+    okres), kraje are rolled up from it by `marginalize`.
+
+    Attributes
+    ----------
+
+    dates: Any
+        Dates of the first axis (`datetime64[D]` array).
+
+    regions: List[Tuple[str, str]]
+        Pairs of `kraj_nuts_kod` and `okres_lau_kod` of the second axis.
+
+    age_bands: List[str]
+        Five year age bands of the third axis (`'0-4'` … `'95+'`, empty for unknown age).
+
+    sexes: List[str]
+        Values of `pohlavi` of the fourth axis.
+
+    measures: List[str]
+        Measures of the last axis, `pocet` (number of persons) and `nakaza_v_zahranici` (number of
+        persons infected abroad).
+
+    values: Any
+        The cube, `int32` array.
+
+    signature: str
+        Signature of the cached dataset the cube was built from.
+
+    """
+
+    def __init__(self,
+                 dates: Any,
+                 regions: List[Tuple[str, str]],
+                 age_bands: List[str],
+                 sexes: List[str],
+                 measures: List[str],
+                 values: Any,
+                 signature: str = '') :
+        require_numpy()
+        self.dates = dates
+        self.regions = regions
+        self.age_bands = age_bands
+        self.sexes = sexes
+        self.measures = measures
+        self.values = values
+        self.signature = signature
+
+
+    @property
+    def kraje(self) -> List[str] :
+        """ Sorted distinct kraje of the regions. """
+        return sorted({ kraj for kraj, _ in self.regions })
+
+
+    @property
+    def okresy(self) -> List[str] :
+        """ Sorted distinct okresy of the regions. """
+        return sorted({ okres for _, okres in self.regions })
+
+
+    def labels(self, dimension: str) -> List[Any] :
+        """ Returns labels of the axis of the dimension (`'datum'`, `'region'`, `'kraj_nuts_kod'`,
+        `'okres_lau_kod'`, `'vekova_skupina'`, `'pohlavi'` or `'measure'`), `kraj_nuts_kod` and
+        `okres_lau_kod` are the axes of `marginalize`.
+        """
+        if dimension == 'datum' :
+            return list(self.dates.astype(object))
+        elif dimension == 'region' :
+            return list(self.regions)
+        elif dimension == 'kraj_nuts_kod' :
+            return self.kraje
+        elif dimension == 'okres_lau_kod' :
+            return self.okresy
+        elif dimension == 'vekova_skupina' :
+            return list(self.age_bands)
+        elif dimension == 'pohlavi' :
+            return list(self.sexes)
+        elif dimension == 'measure' :
+            return list(self.measures)
+        raise ValueError(f"Unknown dimension '{dimension}'.")
+
+
+    def select(self,
+               since: Union[date, str, None] = None,
+               until: Union[date, str, None] = None,
+               kraj_nuts_kod: Labels = None,
+               okres_lau_kod: Labels = None,
+               vekova_skupina: Labels = None,
+               pohlavi: Labels = None,
+               measure: Labels = None
+               ) -> 'OsobyCube' :
+        """ Returns sub-cube of dates from `since` to `until` (inclusive) and given labels of the
+        other dimensions (a label or a list of labels, `None` keeps all). Date ranges are views of
+        the cube, selections of other labels are copies.
+        """
+        low = 0 if since is None else int(numpy.searchsorted(self.dates, numpy.datetime64(since, 'D'), 'left'))
+        high = len(self.dates) if until is None else int(numpy.searchsorted(self.dates,
+                                                                             numpy.datetime64(until, 'D'),
+                                                                             'right'))
+        values = self.values[low:high]
+
+        def chosen(labels: List[Any], wanted: Labels, key: Any = None) -> Optional[List[int]] :
+            if wanted is None :
+                return None
+            wanted = set(wanted) if isinstance(wanted, (list, tuple, set, frozenset)) else { wanted }
+            return [i for i, label in enumerate(labels) if (label if key is None else key(label)) in wanted]
+
+        regions = list(range(len(self.regions)))
+        for wanted, part in ((kraj_nuts_kod, 0), (okres_lau_kod, 1)) :
+            if (indexes := chosen(self.regions, wanted, lambda region : region[part])) is not None :
+                regions = sorted(set(regions) & set(indexes))
+        if len(regions) != len(self.regions) :
+            values = values[:, regions]
+        bands = chosen(self.age_bands, vekova_skupina)
+        if bands is not None :
+            values = values[:, :, bands]
+        sexes = chosen(self.sexes, pohlavi)
+        if sexes is not None :
+            values = values[:, :, :, sexes]
+        selected_measures = chosen(self.measures, measure)
+        if selected_measures is not None :
+            values = values[..., selected_measures]
+
+        return OsobyCube(self.dates[low:high],
+                         [self.regions[i] for i in regions],
+                         self.age_bands if bands is None else [self.age_bands[i] for i in bands],
+                         self.sexes if sexes is None else [self.sexes[i] for i in sexes],
+                         self.measures if selected_measures is None else [self.measures[i] for i in selected_measures],
+                         values,
+                         self.signature)
+
+
+    def marginalize(self, keep: Sequence[str] = ('datum',), measure: Optional[str] = 'pocet') -> Any :
+        """ Sums the cube over all dimensions except `keep` and returns the array of sums.
+
+        Kept dimensions are `'datum'`, `'region'`, `'kraj_nuts_kod'` or `'okres_lau_kod'` (regions
+        rolled up to kraje or okresy), `'vekova_skupina'` and `'pohlavi'`, axes of the result are in
+        this order (see `labels`). The result is of given measure or, if `measure` is `None`, of all
+        measures along an additional last axis.
+        """
+        for dimension in keep :
+            if dimension not in ('datum', 'region', 'kraj_nuts_kod', 'okres_lau_kod', 'vekova_skupina', 'pohlavi') :
+                raise ValueError(f"Unknown dimension '{dimension}'.")
+        region_levels = [dimension for dimension in keep if dimension in ('region', 'kraj_nuts_kod', 'okres_lau_kod')]
+        if len(region_levels) > 1 :
+            raise ValueError('Only one of region, kraj_nuts_kod and okres_lau_kod can be kept.')
+
+        values = self.values if measure is None else self.values[..., self.measures.index(measure)]
+        axes = tuple(axis for axis, dimension in enumerate(cube_dimensions)
+                     if dimension not in keep and not (dimension == 'region' and len(region_levels) > 0))
+        result = values.sum(axis = axes, keepdims = True)
+        if len(region_levels) > 0 and region_levels[0] != 'region' :
+            part = 0 if region_levels[0] == 'kraj_nuts_kod' else 1
+            targets = self.labels(region_levels[0])
+            groups = numpy.array([targets.index(region[part]) for region in self.regions], dtype = numpy.int64)
+            shape = list(result.shape)
+            shape[1] = len(targets)
+            rolled = numpy.zeros(shape, dtype = result.dtype)
+            numpy.add.at(rolled, (slice(None), groups), result)
+            result = rolled
+
+        return result.squeeze(axis = axes)
+
+
+def build_cube(rows: List[list], signature: str) -> OsobyCube :
+    """ Builds the cube from rows of the daily rollup of `osoby` (see `load_rollup`). Rows with
+    empty or invalid date are dropped, the cube has no axis label for them.
+    """
+    dated = [row for row in rows if date_field(row[0]) is not None]
+    days = numpy.array([row[0] for row in dated], dtype = 'datetime64[D]')
+    if len(days) > 0 :
+        dates = numpy.arange(days.min(), days.max() + 1)
+    else :
+        dates = numpy.zeros(0, dtype = 'datetime64[D]')
+
+    regions = sorted({ (row[1], row[2]) for row in dated })
+    age_bands = sorted({ row[3] for row in dated }, key = band_order)
+    sexes = sorted({ row[4] for row in dated })
+    cube_measures = list(measures['osoby'])
+    values = numpy.zeros((len(dates), len(regions), len(age_bands), len(sexes), len(cube_measures)),
+                         dtype = numpy.int32)
+    if len(dated) > 0 :
+        region_ids = { region: i for i, region in enumerate(regions) }
+        band_ids = { band: i for i, band in enumerate(age_bands) }
+        sex_ids = { sex: i for i, sex in enumerate(sexes) }
+        # rows of the rollup have distinct keys, so the counts are assigned instead of added
+        values[(days - dates[0]).astype(numpy.int64),
+               [region_ids[(row[1], row[2])] for row in dated],
+               [band_ids[row[3]] for row in dated],
+               [sex_ids[row[4]] for row in dated]] = numpy.array([row[5:] for row in dated], dtype = numpy.int32)
+
+    return OsobyCube(dates, regions, age_bands, sexes, cube_measures, values, signature)
+
+
+def load_cube(file_name: str, record_class: Type, api_version: ApiVersion, cache_dir: str) -> OsobyCube :
+    """ Loads the cube of dataset `osoby` from file `osoby.cube.npz` next to the cached csv file. The
+    file is rebuilt from the daily rollup when it doesn't exist or the dataset changed.
+    """
+    require_numpy()
+    if file_name != 'osoby' :
+        raise ValueError(f"Dataset '{file_name}' has no cube, supported is osoby.")
+    if cache_dir is None :
+        raise ValueError('Cubes require a cache directory.')
+
+    signature = dataset_signature(file_name, api_version, cache_dir)
+    cube_file = os.path.join(cache_dir, file_name + '.cube.npz')
+    if os.path.isfile(cube_file) :
+        with numpy.load(cube_file) as data :
+            if str(data['signature']) == signature :
+                return OsobyCube(data['dates'],
+                                 list(zip(data['kraje'].tolist(), data['okresy'].tolist())),
+                                 data['age_bands'].tolist(),
+                                 data['sexes'].tolist(),
+                                 data['measures'].tolist(),
+                                 data['values'],
+                                 signature)
+
+    cube = build_cube(load_rollup(file_name, record_class, api_version, cache_dir), signature)
+    temporary_file = cube_file + '.tmp'
+    with open(temporary_file, 'wb') as file :
+        numpy.savez(file,
+                    signature = numpy.array(signature),
+                    dates = cube.dates,
+                    kraje = numpy.array([kraj for kraj, _ in cube.regions], dtype = str),
+                    okresy = numpy.array([okres for _, okres in cube.regions], dtype = str),
+                    age_bands = numpy.array(cube.age_bands, dtype = str),
+                    sexes = numpy.array(cube.sexes, dtype = str),
+                    measures = numpy.array(cube.measures, dtype = str),
+                    values = cube.values)
+    os.replace(temporary_file, cube_file)
+    return cube
@@ -0,0 +1,186 @@
+from .api import ApiVersion, bool_field, cache_signature, cached_files, date_field, float_field, int_field
+from .api import dataset_signature, partition_period, span_lines, str_field, update_cache
+from .rollup import appended_offset, lines_end, prefix_hash
+from typing import Any, Callable, Dict, Iterable, Iterator, Sequence, Type
+import os
+import re
+import sqlite3
+
+# SQLite types of the columns by converter of the field
+column_types: Dict[Any, str] = {
+    str_field: 'TEXT',
+    bool_field: 'INTEGER',
+    int_field: 'INTEGER',
+    float_field: 'REAL',
+    date_field: 'TEXT',
+}
+
+# columns with an index, dates and codes of regions
+indexed_columns = (
+    'datum',
+    'kraj_nuts_kod',
+    'cilovy_kraj_kod',
+    'okres_lau_kod',
+    'okres_nuts_kod',
+    'orp_kod',
+    'orp_bydliste_kod',
+    'obec_kod',
+    'mc_kod',
+)
+
+_meta_table = '_mzcr_tables'
+
+
+def database_path(cache_dir: str) -> str :
+    return os.path.join(cache_dir, 'mzcr.sqlite')
+
+
+def table_name(file_name: str) -> str :
+    """ Returns name of the table of the dataset (name of the dataset with `_` instead of `-`). """
+    return file_name.replace('-', '_')
+
+
+def sql_value(converter: Any) -> Callable[[bytes], Any] :
+    """ Returns function converting a raw field into its SQLite value, empty fields (except text)
+    are `NULL`, dates are ISO formatted text and bools are `0` or `1`.
+    """
+    if converter is int_field :
+        return lambda raw : int(raw) if len(raw) > 0 else None
+    elif converter is float_field :
+        return lambda raw : float(raw) if len(raw) > 0 else None
+    elif converter is bool_field :
+        return lambda raw : 1 if len(raw) > 0 else 0
+    elif converter is date_field :
+        return lambda raw : value if date_field(value := raw.decode('utf-8')) is not None else None
+    else :
+        return lambda raw : raw.decode('utf-8')
+
+
+def table_rows(record_class: Type, lines: Iterable[bytes]) -> Iterator[tuple] :
+    """ Yields raw data lines converted into rows of the table. """
+    converters = [sql_value(converter) for _, converter in record_class.fields]
+    width = len(converters)
+    for line in lines :
+        if len(line := line.rstrip(b'\r')) == 0 :
+            continue
+        parts = line.split(b',')
+        if len(parts) < width :
+            parts.extend([b''] * (width - len(parts)))
+        yield tuple([convert(part) for convert, part in zip(converters, parts)])
+
+
+def create_table(connection: sqlite3.Connection, record_class: Type) -> None :
+    table = table_name(record_class.file_name)
+    connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+    connection.execute(f'CREATE TABLE "{table}" ('
+                       + ', '.join(f'"{name}" {column_types[converter]}' for name, converter in record_class.fields)
+                       + ')')
+
+
+def create_indexes(connection: sqlite3.Connection, record_class: Type) -> None :
+    table = table_name(record_class.file_name)
+    for name, _ in record_class.fields :
+        if name in indexed_columns :
+            connection.execute(f'CREATE INDEX IF NOT EXISTS "{table}_{name}" ON "{table}" ("{name}")')
+
+
+def insert_rows(connection: sqlite3.Connection, record_class: Type, lines: Iterable[bytes]) -> None :
+    placeholders = ', '.join('?' * len(record_class.fields))
+    connection.executemany(f'INSERT INTO "{table_name(record_class.file_name)}" VALUES ({placeholders})',
+                           table_rows(record_class, lines))
+
+
+def materialize(connection: sqlite3.Connection,
+                file_name: str,
+                record_class: Type,
+                api_version: ApiVersion,
+                cache_dir: str
+                ) -> None :
+    """ Updates the table of the dataset in the database to the current cached dataset.
+
+    The signature of the cached file, the size of the loaded part of it and hash of that part are
+    kept in table `_mzcr_tables`. When the cached file changed and the loaded part still has the
+    same hash, the file was only appended to and only the new rows are inserted, otherwise the
+    table is rebuilt. Tables of partitioned datasets are always rebuilt.
+    """
+    columns = [row[1] for row in connection.execute(f'PRAGMA table_info("{_meta_table}")')]
+    if len(columns) > 0 and 'prefix_hash' not in columns :
+        # state of an older layout, the tables are rebuilt
+        connection.execute(f'DROP TABLE "{_meta_table}"')
+    connection.execute(f'CREATE TABLE IF NOT EXISTS "{_meta_table}" ('
+                       'name TEXT PRIMARY KEY, signature TEXT, offset INTEGER, prefix_hash TEXT)')
+    partitioned = partition_period(file_name, cache_dir) is not None
+    if partitioned :
+        signature = dataset_signature(file_name, api_version, cache_dir)
+    else :
+        cache_file = update_cache(file_name, api_version, cache_dir)
+        signature = cache_signature(cache_file)
+
+    table = table_name(file_name)
+    state = connection.execute(f'SELECT signature, offset, prefix_hash FROM "{_meta_table}" WHERE name = ?',
+                               (table,)).fetchone()
+    if state is not None and state[0] == signature :
+        return
+
+    # the table and its state are replaced in one transaction, so an interrupted load leaves both
+    # in the previous state
+    connection.execute('BEGIN')
+    try :
+        offset = 0
+        digest = None
+        if partitioned :
+            create_table(connection, record_class)
+            for partition_file in cached_files(file_name, api_version, cache_dir) :
+                with open(partition_file, 'rb') as file :
+                    file.readline()
+                    insert_rows(connection, record_class, (line.rstrip(b'\n') for line in file))
+        else :
+            size = os.path.getsize(cache_file)
+            if state is None or (offset := appended_offset(cache_file, state[1], state[2])) == 0 :
+                create_table(connection, record_class)
+
+            with open(cache_file, 'rb') as file :
+                if offset == 0 :
+                    offset = len(file.readline())
+                # only complete lines are inserted, a partially written last line is inserted next time
+                end = lines_end(file, offset, size)
+                insert_rows(connection, record_class, span_lines(file, offset, end))
+            offset = end
+            digest = prefix_hash(cache_file, offset)
+
+        create_indexes(connection, record_class)
+        connection.execute(f'INSERT OR REPLACE INTO "{_meta_table}" VALUES (?, ?, ?, ?)',
+                           (table, signature, offset, digest))
+        connection.execute('COMMIT')
+    except BaseException :
+        connection.execute('ROLLBACK')
+        raise
+
+
+def get_query(cache_dir: str,
+              record_classes: Sequence[Type],
+              sql: str,
+              params: Any = (),
+              size: int = 1024
+              ) -> Iterator[tuple] :
+    """ Yields rows of the result of the SQL query over the database `mzcr.sqlite` in the cache
+    directory, fetched in batches of `size` rows.
+
+    Tables of the datasets (of `record_classes`) whose names occur in the query are updated first
+    (see `materialize`), other tables are used as they are.
+    """
+    if cache_dir is None :
+        raise ValueError('SQL queries require a cache directory.')
+
+    words = set(re.findall(r'[A-Za-z_][A-Za-z0-9_]*', sql))
+    connection = sqlite3.connect(database_path(cache_dir), isolation_level = None)
+    try :
+        for record_class in record_classes :
+            if table_name(record_class.file_name) in words :
+                materialize(connection, record_class.file_name, record_class, record_class.api_version, cache_dir)
+
+        cursor = connection.execute(sql, params)
+        while len(rows := cursor.fetchmany(size)) > 0 :
+            yield from rows
+    finally :
+        connection.close()
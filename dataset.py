@@ -0,0 +1,97 @@
+from .api import ApiVersion, cache_signature, load_row_index, partition_period, row_parser, update_cache
+from typing import Any, Iterator, List, Optional, Sequence, Type, Union
+
+class Dataset :
+    """ Random access handle of a cached dataset.
+
+    Rows are located through the row offset index stored next to the cached csv file (`.idx`), so
+    `len` doesn't read the file, indexing and slicing read only the requested rows and iteration
+    can be repeated. The index is reloaded when the cached file changes (e.g. after it was
+    refreshed by another call).
+
+    Attributes
+    ----------
+
+    record_class: Type
+        Class of the records of the dataset.
+
+    columns: Optional[Sequence[str]]
+        Columns rows are projected to (named tuples instead of records), `None` for full records.
+
+    """
+
+    def __init__(self,
+                 file_name: str,
+                 record_class: Type,
+                 api_version: ApiVersion,
+                 cache_dir: Optional[str],
+                 columns: Optional[Sequence[str]] = None) :
+        if cache_dir is None :
+            raise ValueError('Dataset handles require a cache directory.')
+        if partition_period(file_name, cache_dir) is not None :
+            raise ValueError('Dataset handles are not supported for partitioned datasets.')
+
+        self.record_class = record_class
+        self.columns = columns
+        self._file_name = file_name
+        self._api_version = api_version
+        self._cache_dir = cache_dir
+        self._cache_file = update_cache(file_name, api_version, cache_dir)
+        self._parse = row_parser(record_class, columns, None)
+        self._signature = ''
+        self._offsets: Any = None
+        self._check_index()
+
+
+    def _check_index(self) -> Any :
+        """ Returns current row offsets, reloads them if the cached file changed. """
+        if (signature := cache_signature(self._cache_file)) != self._signature :
+            self._offsets = load_row_index(self._cache_file)
+            self._signature = signature
+        return self._offsets
+
+
+    def refresh(self) -> None :
+        """ Downloads newer version of the dataset if there is one. """
+        update_cache(self._file_name, self._api_version, self._cache_dir)
+        self._check_index()
+
+
+    def __len__(self) -> int :
+        return len(self._check_index()) - 1
+
+
+    def _read_rows(self, offsets: Any, start: int, stop: int) -> List :
+        """ Parses rows in range [start, stop) (already clamped). """
+        if start >= stop :
+            return []
+
+        with open(self._cache_file, 'rb') as file :
+            file.seek(offsets[start])
+            data = file.read(offsets[stop] - offsets[start])
+
+        parse = self._parse
+        return [parse(line) for raw in data.split(b'\n') if len(line := raw.rstrip(b'\r')) > 0]
+
+
+    def __getitem__(self, key: Union[int, slice]) -> Any :
+        offsets = self._check_index()
+        count = len(offsets) - 1
+        if isinstance(key, slice) :
+            start, stop, step = key.indices(count)
+            if step == 1 :
+                return self._read_rows(offsets, start, stop)
+            return [self._read_rows(offsets, i, i + 1)[0] for i in range(start, stop, step)]
+
+        if key < 0 :
+            key += count
+        if not 0 <= key < count :
+            raise IndexError('Dataset index out of range.')
+        return self._read_rows(offsets, key, key + 1)[0]
+
+
+    def __iter__(self) -> Iterator :
+        offsets = self._check_index()
+        count = len(offsets) - 1
+        for start in range(0, count, 65536) :
+            yield from self._read_rows(offsets, start, min(start + 65536, count))
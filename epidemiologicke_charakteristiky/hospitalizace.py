@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -62,6 +62,30 @@ class Hospitalizace:
 
     """
 
+    file_name = 'hospitalizace'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('pacient_prvni_zaznam', int_field),
+        ('kum_pacient_prvni_zaznam', int_field),
+        ('pocet_hosp', int_field),
+        ('stav_bez_priznaku', int_field),
+        ('stav_lehky', int_field),
+        ('stav_stredni', int_field),
+        ('stav_tezky', int_field),
+        ('jip', int_field),
+        ('kyslik', int_field),
+        ('hfno', int_field),
+        ('upv', int_field),
+        ('ecmo', int_field),
+        ('tezky_upv_ecmo', int_field),
+        ('umrti', int_field),
+        ('kum_umrti', int_field),
+    )
+
+    categorical = ()
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.pacient_prvni_zaznam: int = int_field(line[1])
@@ -82,6 +106,10 @@ class Hospitalizace:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['Hospitalizace'] :
-        return get_many('hospitalizace', Hospitalizace, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['Hospitalizace'] :
+        return get_many(Hospitalizace.file_name,
+                        Hospitalizace,
+                        Hospitalizace.api_version,
+                        cache_dir,
+                        **options)
 
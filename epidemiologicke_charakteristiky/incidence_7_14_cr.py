@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, float_field, date_field
+from ..api import get_many, ApiVersion, int_field, float_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -34,6 +34,19 @@ class Incidence_7_14_CR:
 
     """
 
+    file_name = 'incidence-7-14-cr'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('incidence_7', int_field),
+        ('incidence_14', int_field),
+        ('incidence_7_100000', float_field),
+        ('incidence_14_100000', float_field),
+    )
+
+    categorical = ()
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.incidence_7: int = int_field(line[1])
@@ -43,6 +56,10 @@ class Incidence_7_14_CR:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['Incidence_7_14_CR'] :
-        return get_many('incidence-7-14-cr', Incidence_7_14_CR, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['Incidence_7_14_CR'] :
+        return get_many(Incidence_7_14_CR.file_name,
+                        Incidence_7_14_CR,
+                        Incidence_7_14_CR.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, float_field, date_field
+from ..api import get_many, ApiVersion, int_field, float_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -40,6 +40,24 @@ class Incidence_7_14_Kraje:
 
     """
 
+    file_name = 'incidence-7-14-kraje'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('kraj_nuts_kod', str_field),
+        ('kraj_nazev', str_field),
+        ('incidence_7', int_field),
+        ('incidence_14', int_field),
+        ('incidence_7_100000', float_field),
+        ('incidence_14_100000', float_field),
+    )
+
+    categorical = (
+        'kraj_nuts_kod',
+        'kraj_nazev',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.kraj_nuts_kod: str = line[1]
@@ -51,6 +69,10 @@ class Incidence_7_14_Kraje:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['Incidence_7_14_Kraje'] :
-        return get_many('incidence-7-14-kraje', Incidence_7_14_Kraje, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['Incidence_7_14_Kraje'] :
+        return get_many(Incidence_7_14_Kraje.file_name,
+                        Incidence_7_14_Kraje,
+                        Incidence_7_14_Kraje.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, float_field, date_field
+from ..api import get_many, ApiVersion, int_field, float_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -40,6 +40,24 @@ class Incidence_7_14_Okresy:
 
     """
 
+    file_name = 'incidence-7-14-okresy'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('okres_lau_kod', str_field),
+        ('okres_nazev', str_field),
+        ('incidence_7', int_field),
+        ('incidence_14', int_field),
+        ('incidence_7_100000', float_field),
+        ('incidence_14_100000', float_field),
+    )
+
+    categorical = (
+        'okres_lau_kod',
+        'okres_nazev',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.okres_lau_kod: str = line[1]
@@ -51,6 +69,10 @@ class Incidence_7_14_Okresy:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['Incidence_7_14_Okresy'] :
-        return get_many('incidence-7-14-okresy', Incidence_7_14_Okresy, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['Incidence_7_14_Okresy'] :
+        return get_many(Incidence_7_14_Okresy.file_name,
+                        Incidence_7_14_Okresy,
+                        Incidence_7_14_Okresy.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -48,6 +48,23 @@ class KrajOkresNakazeniVyleceniUmrti:
 
     """
 
+    file_name = 'kraj-okres-nakazeni-vyleceni-umrti'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('kraj_nuts_kod', str_field),
+        ('okres_lau_kod', str_field),
+        ('kumulativni_pocet_nakazenych', int_field),
+        ('kumulativni_pocet_vylecenych', int_field),
+        ('kumulativni_pocet_umrti', int_field),
+    )
+
+    categorical = (
+        'kraj_nuts_kod',
+        'okres_lau_kod',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.kraj_nuts_kod: str = line[1]
@@ -58,9 +75,10 @@ class KrajOkresNakazeniVyleceniUmrti:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['KrajOkresNakazeniVyleceniUmrti'] :
-        return get_many('kraj-okres-nakazeni-vyleceni-umrti',
+    def get(cache_dir: Optional[str], **options) -> Iterator['KrajOkresNakazeniVyleceniUmrti'] :
+        return get_many(KrajOkresNakazeniVyleceniUmrti.file_name,
                         KrajOkresNakazeniVyleceniUmrti,
-                        ApiVersion.V2,
-                        cache_dir)
+                        KrajOkresNakazeniVyleceniUmrti.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -68,6 +68,31 @@ class MestskeCasti:
 
     """
 
+    file_name = 'mestske-casti'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('den', str_field),
+        ('datum', date_field),
+        ('okres_nuts_kod', str_field),
+        ('orp_kod', int_field),
+        ('orp_nazev', str_field),
+        ('mc_kod', int_field),
+        ('nove_pripady', int_field),
+        ('aktivni_pripady', int_field),
+        ('nove_pripady_65', int_field),
+        ('nove_pripady_7_dni', int_field),
+        ('nove_pripady_14_dni', int_field),
+        ('zemreli', int_field),
+        ('vyleceni', int_field),
+    )
+
+    categorical = (
+        'den',
+        'okres_nuts_kod',
+        'orp_nazev',
+    )
+
     def __init__(self, line: List[str]) :
         self.den: str = line[0]
         self.datum: Optional[date] = date_field(line[1])
@@ -85,6 +110,10 @@ class MestskeCasti:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['MestskeCasti'] :
-        return get_many('mestske-casti', MestskeCasti, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['MestskeCasti'] :
+        return get_many(MestskeCasti.file_name,
+                        MestskeCasti,
+                        MestskeCasti.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -53,6 +53,25 @@ class NakazeniVyleceniUmrtiTesty:
 
     """
 
+    file_name = 'nakazeni-vyleceni-umrti-testy'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('kumulativni_pocet_nakazenych', int_field),
+        ('kumulativni_pocet_vylecenych', int_field),
+        ('kumulativni_pocet_umrti', int_field),
+        ('kumulativni_pocet_testu', int_field),
+        ('kumulativni_pocet_ag_testu', int_field),
+        ('prirustkovy_pocet_nakazenych', int_field),
+        ('prirustkovy_pocet_vylecenych', int_field),
+        ('prirustkovy_pocet_umrti', int_field),
+        ('prirustkovy_pocet_provedenych_testu', int_field),
+        ('prirustkovy_pocet_provedenych_ag_testu', int_field),
+    )
+
+    categorical = ()
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.kumulativni_pocet_nakazenych: int = int_field(line[1])
@@ -68,9 +87,10 @@ class NakazeniVyleceniUmrtiTesty:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['NakazeniVyleceniUmrtiTesty'] :
-        return get_many('nakazeni-vyleceni-umrti-testy',
+    def get(cache_dir: Optional[str], **options) -> Iterator['NakazeniVyleceniUmrtiTesty'] :
+        return get_many(NakazeniVyleceniUmrtiTesty.file_name,
                         NakazeniVyleceniUmrtiTesty,
-                        ApiVersion.V2,
-                        cache_dir)
+                        NakazeniVyleceniUmrtiTesty.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -71,6 +71,37 @@ class Obce:
 
     """
 
+    file_name = 'obce'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('den', str_field),
+        ('datum', date_field),
+        ('kraj_nuts_kod', str_field),
+        ('kraj_nazev', str_field),
+        ('okres_lau_kod', str_field),
+        ('okres_nazev', str_field),
+        ('orp_kod', int_field),
+        ('orp_nazev', str_field),
+        ('obec_kod', int_field),
+        ('obec_nazev', str_field),
+        ('nove_pripady', int_field),
+        ('aktivni_pripady', int_field),
+        ('nove_pripady_65', int_field),
+        ('nove_pripady_7_dni', int_field),
+        ('nove_pripady_14_dni', int_field),
+    )
+
+    categorical = (
+        'den',
+        'kraj_nuts_kod',
+        'kraj_nazev',
+        'okres_lau_kod',
+        'okres_nazev',
+        'orp_nazev',
+        'obec_nazev',
+    )
+
     def __init__(self, line: List[str]) :
         self.den: str = line[0]
         self.datum: Optional[date] = date_field(line[1])
@@ -90,6 +121,10 @@ class Obce:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['Obce'] :
-        return get_many('obce', Obce, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['Obce'] :
+        return get_many(Obce.file_name,
+                        Obce,
+                        Obce.api_version,
+                        cache_dir,
+                        **options)
 
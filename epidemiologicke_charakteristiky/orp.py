@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -58,6 +58,31 @@ class Orp:
 
     """
 
+    file_name = 'orp'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('den', str_field),
+        ('datum', date_field),
+        ('orp_kod', str_field),
+        ('orp_nazev', str_field),
+        ('incidence_7', int_field),
+        ('incidence_65_7', int_field),
+        ('incidence_75_7', int_field),
+        ('prevalence', int_field),
+        ('prevalence_65', int_field),
+        ('prevalence_75', int_field),
+        ('aktualni_pocet_hospitalizovanych_osob', int_field),
+        ('nove_hosp_7', int_field),
+        ('testy_7', int_field),
+    )
+
+    categorical = (
+        'den',
+        'orp_kod',
+        'orp_nazev',
+    )
+
     def __init__(self, line: List[str]) :
         self.den: str = line[0]
         self.datum: Optional[date] = date_field(line[1])
@@ -75,6 +100,10 @@ class Orp:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['Orp'] :
-        return get_many('orp', Orp, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['Orp'] :
+        return get_many(Orp.file_name,
+                        Orp,
+                        Orp.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, bool_field, date_field
+from ..api import get_many, ApiVersion, int_field, bool_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -42,6 +42,26 @@ class Osoby :
 
     """
 
+    file_name = 'osoby'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('vek', int_field),
+        ('pohlavi', str_field),
+        ('kraj_nuts_kod', str_field),
+        ('okres_lau_kod', str_field),
+        ('nakaza_v_zahranici', bool_field),
+        ('nakaza_zeme_csu_kod', str_field),
+    )
+
+    categorical = (
+        'pohlavi',
+        'kraj_nuts_kod',
+        'okres_lau_kod',
+        'nakaza_zeme_csu_kod',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.vek: int = int_field(line[1])
@@ -53,6 +73,10 @@ class Osoby :
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['Osoby'] :
-        return get_many('osoby', Osoby, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['Osoby'] :
+        return get_many(Osoby.file_name,
+                        Osoby,
+                        Osoby.api_version,
+                        cache_dir,
+                        **options)
 
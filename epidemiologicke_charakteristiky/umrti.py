@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -38,6 +38,23 @@ class Umrti :
 
     """
 
+    file_name = 'umrti'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('vek', int_field),
+        ('pohlavi', str_field),
+        ('kraj_nuts_kod', str_field),
+        ('okres_lau_kod', str_field),
+    )
+
+    categorical = (
+        'pohlavi',
+        'kraj_nuts_kod',
+        'okres_lau_kod',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.vek: int = int_field(line[1])
@@ -47,6 +64,10 @@ class Umrti :
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['Umrti'] :
-        return get_many('umrti', Umrti, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['Umrti'] :
+        return get_many(Umrti.file_name,
+                        Umrti,
+                        Umrti.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -36,6 +36,23 @@ class Vyleceni :
 
     """
 
+    file_name = 'vyleceni'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('vek', int_field),
+        ('pohlavi', str_field),
+        ('kraj_nuts_kod', str_field),
+        ('okres_lau_kod', str_field),
+    )
+
+    categorical = (
+        'pohlavi',
+        'kraj_nuts_kod',
+        'okres_lau_kod',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.vek: int = int_field(line[1])
@@ -45,6 +62,10 @@ class Vyleceni :
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['Vyleceni'] :
-        return get_many('vyleceni', Vyleceni, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['Vyleceni'] :
+        return get_many(Vyleceni.file_name,
+                        Vyleceni,
+                        Vyleceni.api_version,
+                        cache_dir,
+                        **options)
 
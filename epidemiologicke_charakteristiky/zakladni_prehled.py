@@ -1,4 +1,4 @@
-from ..api import get_one, ApiVersion, int_field, date_field
+from ..api import get_one, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import List, Optional
 
@@ -120,6 +120,39 @@ class ZakladniPrehled :
 
     """
 
+    file_name = 'zakladni-prehled'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('provedene_testy_celkem', int_field),
+        ('potvrzene_pripady_celkem', int_field),
+        ('aktivni_pripady', int_field),
+        ('vyleceni', int_field),
+        ('umrti', int_field),
+        ('aktualne_hospitalizovani', int_field),
+        ('provedene_testy_vcerejsi_den', int_field),
+        ('potvrzene_pripady_vcerejsi_den', int_field),
+        ('potvrzene_pripady_dnesni_den', int_field),
+        ('provedene_testy_vcerejsi_den_datum', date_field),
+        ('potvrzene_pripady_vcerejsi_den_datum', date_field),
+        ('potvrzene_pripady_dnesni_den_datum', date_field),
+        ('provedene_antigenni_testy_celkem', int_field),
+        ('provedene_antigenni_testy_vcerejsi_den', int_field),
+        ('provedene_antigenni_testy_vcerejsi_den_datum', date_field),
+        ('vykazana_ockovani_celkem', int_field),
+        ('vykazana_ockovani_vcerejsi_den', int_field),
+        ('vykazana_ockovani_vcerejsi_den_datum', date_field),
+        ('potvrzene_pripady_65_celkem', int_field),
+        ('potvrzene_pripady_65_vcerejsi_den', int_field),
+        ('potvrzene_pripady_65_vcerejsi_den_datum', date_field),
+        ('ockovane_osoby_celkem', int_field),
+        ('ockovane_osoby_vcerejsi_den', int_field),
+        ('ockovane_osoby_vcerejsi_den_datum', date_field),
+    )
+
+    categorical = ()
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.provedene_testy_celkem: int = int_field(line[1])
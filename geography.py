@@ -0,0 +1,290 @@
+from .api import dataset_signature, get_batches
+from .columnar import CategoricalColumn, require_numpy
+from .epidemiologicke_charakteristiky.mestske_casti import MestskeCasti
+from .epidemiologicke_charakteristiky.obce import Obce
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple, Union
+import json
+import os
+
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+# code columns of the levels of the hierarchy
+levels: Dict[str, str] = {
+    'kraj': 'kraj_nuts_kod',
+    'okres': 'okres_lau_kod',
+    'orp': 'orp_kod',
+    'obec': 'obec_kod',
+    'mc': 'mc_kod',
+}
+
+# parent level of each level, city districts (`mc`) belong to ORP Praha
+parents: Dict[str, str] = {
+    'okres': 'kraj',
+    'orp': 'okres',
+    'obec': 'orp',
+    'mc': 'orp',
+}
+
+Code = Union[int, str]
+
+
+class GeographyLevel :
+    """ Units of one level of the hierarchy.
+
+    Attributes
+    ----------
+
+    codes: List[Union[int, str]]
+        Sorted codes of the units, index in the list is the integer id of the unit.
+
+    names: List[str]
+        Names of the units (empty if unknown), in the order of `codes`.
+
+    parents: List[int]
+        Ids of the parent units (`-1` if unknown), in the order of `codes`.
+
+    """
+
+    def __init__(self, codes: List[Code], names: List[str], parents: List[int]) :
+        self.codes = codes
+        self.names = names
+        self.parents = parents
+        self.ids: Dict[Code, int] = { code: i for i, code in enumerate(codes) }
+
+
+    def __len__(self) -> int :
+        return len(self.codes)
+
+
+class Geography :
+    """ Index of the territorial hierarchy obec → ORP → okres → kraj (and městská část → ORP),
+    derived from datasets `obce` and `mestske-casti`.
+
+    Units of every level have integer ids (indexes of their sorted codes), which are used by the
+    vectorized roll-ups (`roll_up`) from finer to coarser levels. Codes are the values of the code
+    columns of the datasets (see `levels`), e.g. `obec_kod` or `kraj_nuts_kod`.
+
+    Attributes
+    ----------
+
+    signature: str
+        Signatures of the datasets the index was derived from.
+
+    levels: Dict[str, GeographyLevel]
+        Units by level (`'kraj'`, `'okres'`, `'orp'`, `'obec'` and `'mc'`).
+
+    """
+
+    def __init__(self, signature: str, levels: Dict[str, GeographyLevel]) :
+        self.signature = signature
+        self.levels = levels
+        self._ancestors: Dict[Tuple[str, str], Any] = {}
+
+
+    def _level(self, level: str) -> GeographyLevel :
+        if (units := self.levels.get(level)) is None :
+            raise ValueError(f"Unknown level '{level}', expected one of {', '.join(self.levels)}.")
+        return units
+
+
+    def id(self, level: str, code: Code) -> int :
+        """ Returns id of the unit with given code, `-1` if there is no such unit. """
+        return self._level(level).ids.get(code, -1)
+
+
+    def code(self, level: str, unit_id: int) -> Code :
+        """ Returns code of the unit with given id. """
+        return self._level(level).codes[unit_id]
+
+
+    def name(self, level: str, code: Code) -> str :
+        """ Returns name of the unit with given code (e.g. `name('okres', 'CZ0201')`). """
+        units = self._level(level)
+        if (i := units.ids.get(code)) is None :
+            raise KeyError(code)
+        return units.names[i]
+
+
+    def parent(self, level: str, code: Code, to_level: Optional[str] = None) -> Optional[Code] :
+        """ Returns code of the unit of level `to_level` (defaults to the parent level) the unit with
+        given code belongs to, `None` if it's not known.
+        """
+        if (i := self.id(level, code)) < 0 :
+            raise KeyError(code)
+        target = level
+        for current, target in self._path(level, to_level) :
+            if (i := self.levels[current].parents[i]) < 0 :
+                return None
+        return self.levels[target].codes[i]
+
+
+    def children(self, level: str, code: Code, from_level: str) -> List[Code] :
+        """ Returns codes of the units of (finer) level `from_level` belonging to the unit with given
+        code, e.g. `children('kraj', 'CZ010', 'obec')`.
+        """
+        if (i := self.id(level, code)) < 0 :
+            raise KeyError(code)
+        codes = self._level(from_level).codes
+        return [codes[n] for n in numpy.flatnonzero(self.ancestors(from_level, level) == i)]
+
+
+    def _path(self, level: str, to_level: Optional[str]) -> List[Tuple[str, str]] :
+        """ Returns steps (level, parent level) from level `level` up to level `to_level`. """
+        self._level(level)
+        to_level = parents.get(level) if to_level is None else to_level
+        steps = []
+        current = level
+        while current != to_level :
+            if (parent := parents.get(current)) is None :
+                raise ValueError(f"Level '{level}' has no parent level." if to_level is None
+                                 else f"Level '{to_level}' is not above level '{level}'.")
+            steps.append((current, parent))
+            current = parent
+        return steps
+
+
+    def ancestors(self, level: str, to_level: str) -> Any :
+        """ Returns array of ids of the units of level `to_level` for ids of the units of level
+        `level` (`-1` if not known), requires numpy.
+        """
+        require_numpy()
+        if (result := self._ancestors.get((level, to_level))) is not None :
+            return result
+
+        result = numpy.arange(len(self._level(level)), dtype = numpy.int64)
+        for current, _ in self._path(level, to_level) :
+            step = numpy.append(numpy.array(self.levels[current].parents, dtype = numpy.int64), -1)
+            result = step[result]
+        self._ancestors[(level, to_level)] = result
+        return result
+
+
+    def ids_of(self, level: str, codes: Any) -> Any :
+        """ Returns array of ids of the units with given codes (a sequence, an array or a
+        `CategoricalColumn` of codes), `-1` for unknown codes. Requires numpy.
+        """
+        require_numpy()
+        ids = self._level(level).ids
+        if isinstance(codes, CategoricalColumn) :
+            table = numpy.array([ids.get(code, -1) for code in codes.categories] + [-1], dtype = numpy.int64)
+            return table[codes.codes]
+
+        codes = numpy.ma.filled(codes, -1) if numpy.ma.isMaskedArray(codes) else numpy.asarray(codes)
+        unique, inverse = numpy.unique(codes, return_inverse = True)
+        table = numpy.array([ids.get(code.item() if hasattr(code, 'item') else code, -1) for code in unique],
+                            dtype = numpy.int64)
+        return table[inverse.reshape(-1)]
+
+
+    def roll_up(self, level: str, codes: Any, values: Any = None, to_level: Optional[str] = None) -> Any :
+        """ Sums values of units of level `level` (with given codes, see `ids_of`) into units of
+        level `to_level` (defaults to the parent level), e.g. daily new cases of municipalities into
+        okresy. `values` is an array with one value (or a row of values, e.g. a time series) per
+        code, numbers of codes are counted when not given. Returns array of the sums (or a matrix
+        of rows of sums) indexed by ids of `to_level`, values of unknown units are left out.
+        Requires numpy.
+        """
+        require_numpy()
+        to_level = parents.get(level, level) if to_level is None else to_level
+        # unknown codes have id -1, which selects the appended unknown ancestor
+        targets = numpy.append(self.ancestors(level, to_level), -1)[self.ids_of(level, codes)]
+        known = targets >= 0
+        size = len(self._level(to_level))
+        if values is None :
+            return numpy.bincount(targets[known], minlength = size)
+
+        values = numpy.ma.filled(values, 0) if numpy.ma.isMaskedArray(values) else numpy.asarray(values)
+        if values.ndim == 1 :
+            sums = numpy.bincount(targets[known], weights = values[known], minlength = size)
+            return sums.astype(values.dtype) if values.dtype.kind in 'iub' else sums
+        result = numpy.zeros((size, *values.shape[1:]), dtype = numpy.result_type(values.dtype, numpy.int64))
+        numpy.add.at(result, targets[known], values[known])
+        return result
+
+
+def geography_path(cache_dir: str) -> str :
+    return os.path.join(cache_dir, 'geography.json')
+
+
+def build_geography(cache_dir: str, signature: str) -> Geography :
+    """ Derives the hierarchy from distinct units of datasets `obce` and `mestske-casti`, names and
+    parents of units are taken from their latest rows. ORPs which span several okresy are assigned
+    to the okres of most of their municipalities.
+    """
+    obce: Dict[Tuple, None] = {}
+    for batch in get_batches(Obce.file_name, Obce, Obce.api_version, cache_dir, 65536,
+                             ['kraj_nuts_kod', 'kraj_nazev', 'okres_lau_kod', 'okres_nazev',
+                              'orp_kod', 'orp_nazev', 'obec_kod', 'obec_nazev']) :
+        obce.update(dict.fromkeys(map(tuple, batch)))
+    mestske_casti: Dict[Tuple, None] = {}
+    for batch in get_batches(MestskeCasti.file_name, MestskeCasti, MestskeCasti.api_version, cache_dir, 65536,
+                             ['okres_nuts_kod', 'orp_kod', 'orp_nazev', 'mc_kod']) :
+        mestske_casti.update(dict.fromkeys(map(tuple, batch)))
+
+    # code -> (name, parent code), later rows overwrite earlier ones
+    units: Dict[str, Dict[Code, Tuple[str, Optional[Code]]]] = { level: {} for level in levels }
+    orp_okresy: Dict[Code, Counter] = {}
+    for kraj, kraj_nazev, okres, okres_nazev, orp, orp_nazev, obec, obec_nazev in obce :
+        if kraj != '' :
+            units['kraj'][kraj] = (kraj_nazev, None)
+        if okres != '' :
+            units['okres'][okres] = (okres_nazev, kraj or None)
+        if orp >= 0 :
+            units['orp'][orp] = (orp_nazev, None)
+            if okres != '' and obec >= 0 :
+                orp_okresy.setdefault(orp, Counter())[okres] += 1
+        if obec >= 0 :
+            units['obec'][obec] = (obec_nazev, orp if orp >= 0 else None)
+    for okres, orp, orp_nazev, mc in mestske_casti :
+        if orp >= 0 :
+            if orp not in units['orp'] :
+                units['orp'][orp] = (orp_nazev, None)
+                if okres != '' :
+                    orp_okresy.setdefault(orp, Counter())[okres] += 1
+        if mc >= 0 :
+            units['mc'][mc] = ('', orp if orp >= 0 else None)
+    for orp, okresy in orp_okresy.items() :
+        units['orp'][orp] = (units['orp'][orp][0], okresy.most_common(1)[0][0])
+
+    codes = { level: sorted(level_units) for level, level_units in units.items() }
+    ids = { level: { code: i for i, code in enumerate(level_codes) } for level, level_codes in codes.items() }
+    result = {}
+    for level, level_codes in codes.items() :
+        parent_ids = ids.get(parents.get(level, ''), {})
+        result[level] = GeographyLevel(level_codes,
+                                       [units[level][code][0] for code in level_codes],
+                                       [parent_ids.get(units[level][code][1], -1) for code in level_codes])
+    return Geography(signature, result)
+
+
+def load_geography(cache_dir: str) -> Geography :
+    """ Loads the `Geography` index from file `geography.json` in the cache directory. The file is
+    rebuilt when it doesn't exist or the cached datasets `obce` or `mestske-casti` changed.
+    """
+    if cache_dir is None :
+        raise ValueError('Geography index requires a cache directory.')
+
+    signature = ';'.join(dataset_signature(record_class.file_name, record_class.api_version, cache_dir)
+                         for record_class in (Obce, MestskeCasti))
+    index_file = geography_path(cache_dir)
+    if os.path.isfile(index_file) :
+        with open(index_file, 'r', encoding = 'utf-8') as file :
+            state = json.load(file)
+        if state['signature'] == signature :
+            return Geography(signature, { level: GeographyLevel(units['codes'], units['names'], units['parents'])
+                                          for level, units in state['levels'].items() })
+
+    geography = build_geography(cache_dir, signature)
+    state = {
+        'signature': signature,
+        'levels': { level: { 'codes': units.codes, 'names': units.names, 'parents': units.parents }
+                    for level, units in geography.levels.items() },
+    }
+    with open(index_file + '.tmp', 'w', encoding = 'utf-8') as file :
+        file.write(json.dumps(state, ensure_ascii = False))
+    os.replace(index_file + '.tmp', index_file)
+    return geography
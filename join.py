@@ -0,0 +1,123 @@
+from .aggregate import missing_value
+from .api import ApiVersion, column_index, dataset_signature, get_many, raw_value
+from collections import namedtuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+import os
+
+# hash indexes of datasets by (cache directory, dataset, column), with signature of the dataset
+# they were built from
+_indexes: Dict[Tuple[str, str, str], Tuple[str, Dict[bytes, List[tuple]]]] = {}
+
+
+def hash_index(file_name: str,
+               record_class: Type,
+               api_version: ApiVersion,
+               cache_dir: Optional[str],
+               column: str
+               ) -> Dict[bytes, List[tuple]] :
+    """ Returns index of the dataset by raw values of the column, mapping each value to the list of
+    rows (tuples of all fields) with that value. Rows with empty value are not indexed.
+
+    The index is kept in memory until the cached dataset changes.
+    """
+    column_index(record_class, column)
+    key = None
+    signature = ''
+    if cache_dir is not None :
+        key = (os.path.abspath(cache_dir), file_name, column)
+        signature = dataset_signature(file_name, api_version, cache_dir)
+        if (cached := _indexes.get(key)) is not None and cached[0] == signature :
+            return cached[1]
+
+    names = [name for name, _ in record_class.fields]
+    missing = missing_value(record_class, column)
+    index: Dict[bytes, List[tuple]] = {}
+    for row in get_many(file_name, record_class, api_version, cache_dir, columns = names) :
+        if (value := getattr(row, column)) != missing :
+            index.setdefault(raw_value(value), []).append(tuple(row))
+
+    if key is not None :
+        _indexes[key] = (signature, index)
+    return index
+
+
+def joined_type(left_class: Type,
+                left_names: List[str],
+                right_class: Type,
+                left_on: str,
+                right_on: str
+                ) -> Tuple[Type[tuple], List[int]] :
+    """ Returns type of the joined rows and indexes of the right fields included in them. Right
+    fields with the same name as a left field are prefixed by name of the right dataset, the right
+    join column is left out if it has the same name as the left one.
+    """
+    names = list(left_names)
+    prefix = right_class.file_name.replace('-', '_')
+    included = []
+    for i, (name, _) in enumerate(right_class.fields) :
+        if name == right_on and name == left_on and name in left_names :
+            continue
+        included.append(i)
+        names.append(f'{prefix}_{name}' if name in left_names else name)
+    return namedtuple(f'{left_class.__name__}{right_class.__name__}', names), included
+
+
+def get_join(left_file_name: str,
+             left_class: Type,
+             left_api_version: ApiVersion,
+             right_file_name: str,
+             right_class: Type,
+             right_api_version: ApiVersion,
+             cache_dir: Optional[str],
+             left_on: str,
+             right_on: Optional[str] = None,
+             how: str = 'inner',
+             columns: Optional[List[str]] = None,
+             **options: Any
+             ) -> Iterator[tuple] :
+    """ Joins rows of the left dataset with rows of the right dataset with equal value of columns
+    `left_on` and `right_on` (defaults to `left_on`).
+
+    The right dataset (the smaller side, e.g. a list of vaccination sites) is loaded into a hash
+    index (see `hash_index`), the left dataset is streamed through it, so the joined rows are in
+    order of the left dataset. Values are compared as raw text, so e.g. `int` columns can be joined
+    with `str` columns. With `how = 'inner'` only left rows with a match are yielded, with
+    `how = 'left'` left rows without a match are yielded too, with the right fields set to `None`.
+
+    Yields named tuples of the left fields (or only `columns` of the left dataset) followed by the
+    right fields (see `joined_type`). `options` filter the left dataset as in `get_many`.
+    """
+    if how not in ('inner', 'left') :
+        raise ValueError(f"Invalid join type '{how}', expected 'inner' or 'left'.")
+
+    right_on = left_on if right_on is None else right_on
+    left_names = [name for name, _ in left_class.fields] if columns is None else list(columns)
+    if left_on not in left_names :
+        left_names.append(left_on)
+        column_index(left_class, left_on)
+    result_type, included = joined_type(left_class,
+                                        left_names if columns is None else list(columns),
+                                        right_class,
+                                        left_on,
+                                        right_on)
+    make = result_type._make
+    index = hash_index(right_file_name, right_class, right_api_version, cache_dir, right_on)
+    empty = (None,) * len(included)
+    key_position = left_names.index(left_on)
+    output_length = len(left_names) if columns is None else len(columns)
+    missing = missing_value(left_class, left_on)
+    # right fields of the matching rows by raw value, selected on first use
+    selected: Dict[bytes, List[tuple]] = {}
+
+    for row in get_many(left_file_name, left_class, left_api_version, cache_dir, columns = left_names, **options) :
+        if (value := row[key_position]) == missing :
+            matches = None
+        elif (matches := selected.get(raw := raw_value(value))) is None and raw in index :
+            matches = selected[raw] = [tuple(match[i] for i in included) for match in index[raw]]
+
+        if matches is None :
+            if how == 'left' :
+                yield make(row[:output_length] + empty)
+            continue
+        for match in matches :
+            yield make(row[:output_length] + match)
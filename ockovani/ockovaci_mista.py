@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -41,6 +41,29 @@ class OckovaciMista:
 
     """
 
+    file_name = 'ockovaci-mista'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('vakcina', str_field),
+        ('kraj_nuts_kod', str_field),
+        ('kraj_nazev', str_field),
+        ('zarizeni_kod', str_field),
+        ('zarizeni_nazev', str_field),
+        ('poradi_davky', int_field),
+        ('vekova_skupina', str_field),
+    )
+
+    categorical = (
+        'vakcina',
+        'kraj_nuts_kod',
+        'kraj_nazev',
+        'zarizeni_kod',
+        'zarizeni_nazev',
+        'vekova_skupina',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.vakcina: str = line[1]
@@ -53,6 +76,10 @@ class OckovaciMista:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['OckovaciMista'] :
-        return get_many('ockovaci-mista', OckovaciMista, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['OckovaciMista'] :
+        return get_many(OckovaciMista.file_name,
+                        OckovaciMista,
+                        OckovaciMista.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, bool_field, date_field
+from ..api import get_many, ApiVersion, int_field, bool_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -48,6 +48,31 @@ class OckovaciZarizeni:
 
     """
 
+    file_name = 'ockovaci-zarizeni'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('zarizeni_kod', str_field),
+        ('zarizeni_nazev', str_field),
+        ('provoz_zahajen', bool_field),
+        ('kraj_nuts_kod', str_field),
+        ('kraj_nazev', str_field),
+        ('okres_lau_kod', str_field),
+        ('okres_nazev', str_field),
+        ('zrizovatel_kod', int_field),
+        ('zrizovatel_nazev', str_field),
+        ('provoz_ukoncen', date_field),
+        ('prakticky_lekar', bool_field),
+    )
+
+    categorical = (
+        'kraj_nuts_kod',
+        'kraj_nazev',
+        'okres_lau_kod',
+        'okres_nazev',
+        'zrizovatel_nazev',
+    )
+
     def __init__(self, line: List[str]) :
         self.zarizeni_kod: str = line[0]
         self.zarizeni_nazev: str = line[1]
@@ -63,6 +88,10 @@ class OckovaciZarizeni:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['OckovaciZarizeni'] :
-        return get_many('ockovaci-zarizeni', OckovaciZarizeni, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['OckovaciZarizeni'] :
+        return get_many(OckovaciZarizeni.file_name,
+                        OckovaciZarizeni,
+                        OckovaciZarizeni.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -44,6 +44,27 @@ class Ockovani:
 
     """
 
+    file_name = 'ockovani'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('vakcina', str_field),
+        ('kraj_nuts_kod', str_field),
+        ('kraj_nazev', str_field),
+        ('vekova_skupina', str_field),
+        ('prvnich_davek', int_field),
+        ('druhych_davek', int_field),
+        ('celkem_davek', int_field),
+    )
+
+    categorical = (
+        'vakcina',
+        'kraj_nuts_kod',
+        'kraj_nazev',
+        'vekova_skupina',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.vakcina: str = line[1]
@@ -56,6 +77,10 @@ class Ockovani:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['Ockovani'] :
-        return get_many('ockovani', Ockovani, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['Ockovani'] :
+        return get_many(Ockovani.file_name,
+                        Ockovani,
+                        Ockovani.api_version,
+                        cache_dir,
+                        **options)
 
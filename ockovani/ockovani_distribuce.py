@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -73,6 +73,41 @@ class OckovaniDistribuce:
 
     """
 
+    file_name = 'ockovani-distribuce'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('ockovaci_misto_id', str_field),
+        ('ockovaci_misto_nazev', str_field),
+        ('kraj_nuts_kod', str_field),
+        ('kraj_nazev', str_field),
+        ('cilove_ockovaci_misto_id', str_field),
+        ('cilove_ockovaci_misto_nazev', str_field),
+        ('cilovy_kraj_kod', str_field),
+        ('cilovy_kraj_nazev', str_field),
+        ('ockovaci_latka', str_field),
+        ('vyrobce', str_field),
+        ('akce', str_field),
+        ('pocet_ampulek', int_field),
+        ('pocet_davek', int_field),
+        ('distribuce_id', str_field),
+    )
+
+    categorical = (
+        'ockovaci_misto_id',
+        'ockovaci_misto_nazev',
+        'kraj_nuts_kod',
+        'kraj_nazev',
+        'cilove_ockovaci_misto_id',
+        'cilove_ockovaci_misto_nazev',
+        'cilovy_kraj_kod',
+        'cilovy_kraj_nazev',
+        'ockovaci_latka',
+        'vyrobce',
+        'akce',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.ockovaci_misto_id: str = line[1]
@@ -92,6 +127,10 @@ class OckovaniDistribuce:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['OckovaniDistribuce'] :
-        return get_many('ockovani-distribuce', OckovaniDistribuce, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['OckovaniDistribuce'] :
+        return get_many(OckovaniDistribuce.file_name,
+                        OckovaniDistribuce,
+                        OckovaniDistribuce.api_version,
+                        cache_dir,
+                        **options)
 
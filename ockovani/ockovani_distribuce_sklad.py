@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -54,6 +54,32 @@ class OckovaniDistribuceSklad:
 
     """
 
+    file_name = 'ockovani-distribuce-sklad'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('akce', str_field),
+        ('vyrobce', str_field),
+        ('pocet_ampulek', int_field),
+        ('nrpzs_kod', str_field),
+        ('nrpzs_nazev', str_field),
+        ('nrpzs_kraj_nazev', str_field),
+        ('ockovaci_misto_id', str_field),
+        ('ockovaci_misto_nazev', str_field),
+        ('distribuce_id', str_field),
+    )
+
+    categorical = (
+        'akce',
+        'vyrobce',
+        'nrpzs_kod',
+        'nrpzs_nazev',
+        'nrpzs_kraj_nazev',
+        'ockovaci_misto_id',
+        'ockovaci_misto_nazev',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.akce: str = line[1]
@@ -68,9 +94,10 @@ class OckovaniDistribuceSklad:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['OckovaniDistribuceSklad'] :
-        return get_many('ockovani-distribuce-sklad',
+    def get(cache_dir: Optional[str], **options) -> Iterator['OckovaniDistribuceSklad'] :
+        return get_many(OckovaniDistribuceSklad.file_name,
                         OckovaniDistribuceSklad,
-                        ApiVersion.V2,
-                        cache_dir)
+                        OckovaniDistribuceSklad.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, bool_field, date_field
+from ..api import get_many, ApiVersion, int_field, bool_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -99,6 +99,47 @@ class OckovaniProfese:
 
     """
 
+    file_name = 'ockovani-profese'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('vakcina', str_field),
+        ('kraj_nuts_kod', str_field),
+        ('kraj_nazev', str_field),
+        ('zarizeni_kod', str_field),
+        ('zarizeni_nazev', str_field),
+        ('poradi_davky', int_field),
+        ('indikace_zdravotnik', bool_field),
+        ('indikace_socialni_sluzby', bool_field),
+        ('indikace_ostatni', bool_field),
+        ('indikace_pedagog', bool_field),
+        ('indikace_skolstvi_ostatni', bool_field),
+        ('indikace_bezpecnostni_infrastruktura', bool_field),
+        ('indikace_chronicke_onemocneni', bool_field),
+        ('vekova_skupina', str_field),
+        ('orp_bydliste', str_field),
+        ('orp_bydliste_kod', int_field),
+        ('prioritni_skupina_kod', int_field),
+        ('pohlavi', str_field),
+        ('zrizovatel_kod', int_field),
+        ('zrizovatel_nazev', str_field),
+        ('vakcina_kod', str_field),
+    )
+
+    categorical = (
+        'vakcina',
+        'kraj_nuts_kod',
+        'kraj_nazev',
+        'zarizeni_kod',
+        'zarizeni_nazev',
+        'vekova_skupina',
+        'orp_bydliste',
+        'pohlavi',
+        'zrizovatel_nazev',
+        'vakcina_kod',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.vakcina: str = line[1]
@@ -125,6 +166,10 @@ class OckovaniProfese:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['OckovaniProfese'] :
-        return get_many('ockovani-profese', OckovaniProfese, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['OckovaniProfese'] :
+        return get_many(OckovaniProfese.file_name,
+                        OckovaniProfese,
+                        OckovaniProfese.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, bool_field, date_field
+from ..api import get_many, ApiVersion, bool_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -125,6 +125,39 @@ class OckovaniRegistrace:
 
     """
 
+    file_name = 'ockovani-registrace'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('ockovaci_misto_id', str_field),
+        ('ockovaci_misto_nazev', str_field),
+        ('kraj_nuts_kod', str_field),
+        ('kraj_nazev', str_field),
+        ('vekova_skupina', str_field),
+        ('povolani', str_field),
+        ('stat', str_field),
+        ('rezervace', bool_field),
+        ('datum_rezervace', date_field),
+        ('zavora_status', str_field),
+        ('prioritni_skupina', str_field),
+        ('zablokovano', bool_field),
+        ('duvod_blokace', str_field),
+    )
+
+    categorical = (
+        'ockovaci_misto_id',
+        'ockovaci_misto_nazev',
+        'kraj_nuts_kod',
+        'kraj_nazev',
+        'vekova_skupina',
+        'povolani',
+        'stat',
+        'zavora_status',
+        'prioritni_skupina',
+        'duvod_blokace',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.ockovaci_misto_id: str = line[1]
@@ -143,6 +176,10 @@ class OckovaniRegistrace:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['OckovaniRegistrace'] :
-        return get_many('ockovani-registrace', OckovaniRegistrace, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['OckovaniRegistrace'] :
+        return get_many(OckovaniRegistrace.file_name,
+                        OckovaniRegistrace,
+                        OckovaniRegistrace.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -41,6 +41,28 @@ class OckovaniRezervace:
 
     """
 
+    file_name = 'ockovani-rezervace'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('ockovaci_misto_id', str_field),
+        ('ockovaci_misto_nazev', str_field),
+        ('kraj_nuts_kod', str_field),
+        ('kraj_nazev', str_field),
+        ('volna_kapacita', int_field),
+        ('maximalni_kapacita', int_field),
+        ('kalendar_ockovani', str_field),
+    )
+
+    categorical = (
+        'ockovaci_misto_id',
+        'ockovaci_misto_nazev',
+        'kraj_nuts_kod',
+        'kraj_nazev',
+        'kalendar_ockovani',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.ockovaci_misto_id: str = line[1]
@@ -53,6 +75,10 @@ class OckovaniRezervace:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['OckovaniRezervace'] :
-        return get_many('ockovani-rezervace', OckovaniRezervace, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['OckovaniRezervace'] :
+        return get_many(OckovaniRezervace.file_name,
+                        OckovaniRezervace,
+                        OckovaniRezervace.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -51,6 +51,32 @@ class OckovaniSpotreba:
 
     """
 
+    file_name = 'ockovani-spotreba'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('ockovaci_misto_id', str_field),
+        ('ockovaci_misto_nazev', str_field),
+        ('kraj_nuts_kod', str_field),
+        ('kraj_nazev', str_field),
+        ('ockovaci_latka', str_field),
+        ('vyrobce', str_field),
+        ('pouzite_ampulky', int_field),
+        ('znehodnocene_ampulky', int_field),
+        ('pouzite_davky', int_field),
+        ('znehodnocene_davky', int_field),
+    )
+
+    categorical = (
+        'ockovaci_misto_id',
+        'ockovaci_misto_nazev',
+        'kraj_nuts_kod',
+        'kraj_nazev',
+        'ockovaci_latka',
+        'vyrobce',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.ockovaci_misto_id: str = line[1]
@@ -66,6 +92,10 @@ class OckovaniSpotreba:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['OckovaniSpotreba'] :
-        return get_many('ockovani-spotreba', OckovaniSpotreba, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['OckovaniSpotreba'] :
+        return get_many(OckovaniSpotreba.file_name,
+                        OckovaniSpotreba,
+                        OckovaniSpotreba.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, bool_field
+from ..api import get_many, ApiVersion, int_field, bool_field, str_field
 from typing import Iterator, List, Optional
 
 class PrehledOckovacichMist:
@@ -48,6 +48,28 @@ class PrehledOckovacichMist:
 
     """
 
+    file_name = 'prehled-ockovacich-mist'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('ockovaci_misto_id', str_field),
+        ('ockovaci_misto_nazev', str_field),
+        ('okres_nuts_kod', str_field),
+        ('operacni_status', bool_field),
+        ('ockovaci_misto_adresa', str_field),
+        ('latitude', str_field),
+        ('longitude', str_field),
+        ('ockovaci_misto_typ', str_field),
+        ('nrpzs_kod', int_field),
+        ('minimalni_kapacita', int_field),
+        ('bezbarierovy_pristup', bool_field),
+    )
+
+    categorical = (
+        'okres_nuts_kod',
+        'ockovaci_misto_typ',
+    )
+
     def __init__(self, line: List[str]) :
         self.ockovaci_misto_id: str = line[0]
         self.ockovaci_misto_nazev: str = line[1]
@@ -63,6 +85,10 @@ class PrehledOckovacichMist:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['PrehledOckovacichMist'] :
-        return get_many('prehled-ockovacich-mist', PrehledOckovacichMist, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['PrehledOckovacichMist'] :
+        return get_many(PrehledOckovacichMist.file_name,
+                        PrehledOckovacichMist,
+                        PrehledOckovacichMist.api_version,
+                        cache_dir,
+                        **options)
 
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field
+from ..api import get_many, ApiVersion, int_field, str_field
 from typing import Iterator, List, Optional
 
 class PrioritniSkupiny:
@@ -19,12 +19,26 @@ class PrioritniSkupiny:
 
     """
 
+    file_name = 'prioritni-skupiny'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('kod', int_field),
+        ('hodnota', str_field),
+    )
+
+    categorical = ()
+
     def __init__(self, line: List[str]) :
         self.kod: int = int_field(line[0])
         self.hodnota: str = line[1]
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['PrioritniSkupiny'] :
-        return get_many('prioritni-skupiny', PrioritniSkupiny, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['PrioritniSkupiny'] :
+        return get_many(PrioritniSkupiny.file_name,
+                        PrioritniSkupiny,
+                        PrioritniSkupiny.api_version,
+                        cache_dir,
+                        **options)
 
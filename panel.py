@@ -0,0 +1,294 @@
+from .api import ApiVersion, dataset_signature
+from .columnar import CategoricalColumn, load_columns, require_numpy
+from datetime import date
+from typing import Any, Dict, List, NamedTuple, Tuple, Union
+import json
+import os
+import struct
+
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+
+class PanelLayout(NamedTuple) :
+    """ Describes a dataset of daily values of a set of entities (e.g. municipalities).
+
+    Attributes
+    ----------
+
+    entity: str
+        Column identifying the entity.
+
+    attributes: Tuple[str, ...]
+        Columns describing the entity, which don't change in time (stored once per entity).
+
+    counters: Tuple[str, ...]
+        Integer columns with the daily values.
+
+    """
+
+    entity: str
+    attributes: Tuple[str, ...]
+    counters: Tuple[str, ...]
+
+
+layouts: Dict[str, PanelLayout] = {
+    'obce': PanelLayout(
+        'obec_kod',
+        ('kraj_nuts_kod', 'kraj_nazev', 'okres_lau_kod', 'okres_nazev', 'orp_kod', 'orp_nazev',
+         'obec_nazev'),
+        ('nove_pripady', 'aktivni_pripady', 'nove_pripady_65', 'nove_pripady_7_dni',
+         'nove_pripady_14_dni')
+    ),
+    'mestske-casti': PanelLayout(
+        'mc_kod',
+        ('okres_nuts_kod', 'orp_kod', 'orp_nazev'),
+        ('nove_pripady', 'aktivni_pripady', 'nove_pripady_65', 'nove_pripady_7_dni',
+         'nove_pripady_14_dni', 'zemreli', 'vyleceni')
+    ),
+    'orp': PanelLayout(
+        'orp_kod',
+        ('orp_nazev',),
+        ('incidence_7', 'incidence_65_7', 'incidence_75_7', 'prevalence', 'prevalence_65',
+         'prevalence_75', 'aktualni_pocet_hospitalizovanych_osob', 'nove_hosp_7', 'testy_7')
+    ),
+}
+
+_magic = b'MZCRPNL1'
+
+
+def encode_varints(values: Any) -> bytes :
+    """ Encodes array of non-negative integers as LEB128 varints (vectorized). """
+    values = numpy.asarray(values, dtype = numpy.uint64)
+    lengths = numpy.ones(len(values), dtype = numpy.int64)
+    for bits in range(7, 64, 7) :
+        lengths += values >= numpy.uint64(1 << bits)
+    starts = numpy.cumsum(lengths) - lengths
+    result = numpy.zeros(int(lengths.sum()), dtype = numpy.uint8)
+    for k in range(int(lengths.max(initial = 0))) :
+        selected = lengths > k
+        byte = (values[selected] >> numpy.uint64(7 * k)) & numpy.uint64(0x7f)
+        byte |= numpy.where(lengths[selected] > k + 1, 0x80, 0).astype(numpy.uint64)
+        result[starts[selected] + k] = byte.astype(numpy.uint8)
+    return result.tobytes()
+
+
+def decode_varints(data: bytes) -> Any :
+    """ Decodes LEB128 varints into an array of `uint64` (vectorized). """
+    raw = numpy.frombuffer(data, dtype = numpy.uint8)
+    if len(raw) == 0 :
+        return numpy.zeros(0, dtype = numpy.uint64)
+    ends = numpy.flatnonzero(raw < 0x80)
+    starts = numpy.concatenate(([0], ends[:-1] + 1))
+    positions = numpy.arange(len(raw)) - numpy.repeat(starts, ends - starts + 1)
+    parts = (raw & 0x7f).astype(numpy.uint64) << (numpy.uint64(7) * positions.astype(numpy.uint64))
+    return numpy.add.reduceat(parts, starts)
+
+
+def zigzag(values: Any) -> Any :
+    values = values.astype(numpy.int64)
+    return ((values << 1) ^ (values >> 63)).astype(numpy.uint64)
+
+
+def unzigzag(values: Any) -> Any :
+    return (values >> numpy.uint64(1)).astype(numpy.int64) ^ -(values & numpy.uint64(1)).astype(numpy.int64)
+
+
+def segment_deltas(values: Any, starts: Any) -> Any :
+    """ Differences of consecutive values, the first value of each segment is kept as is. """
+    deltas = numpy.diff(values, prepend = 0)
+    deltas[starts] = values[starts]
+    return deltas
+
+
+def segment_cumsum(deltas: Any, starts: Any, counts: Any) -> Any :
+    """ Inverse of `segment_deltas`. """
+    totals = numpy.cumsum(deltas)
+    offsets = totals[starts] - deltas[starts] if len(starts) > 0 else totals[:0]
+    return totals - numpy.repeat(offsets, counts)
+
+
+def encode_panel(dataset: str, signature: str, columns: Dict[str, Any]) -> bytes :
+    """ Encodes the panel (columns in the format of `load_columns`) into the compact format.
+
+    Rows are sorted by entity and date. Names and other attributes are stored once per entity in
+    the JSON header, dates as deltas of day numbers within each entity and counters as zigzag
+    encoded deltas within each entity, all as LEB128 varints.
+    """
+    layout = layouts[dataset]
+
+    def values(name: str) -> Any :
+        column = columns[name]
+        if isinstance(column, CategoricalColumn) :
+            return numpy.array(column.categories + [''], dtype = object)[column.codes]
+        return numpy.ma.filled(column, -1)
+
+    keys = values(layout.entity)
+    days = columns['datum']
+    valid = ~numpy.isnat(days)
+    first_day = days[valid].min() if valid.any() else numpy.datetime64('2020-01-01', 'D')
+    day_numbers = numpy.where(valid, (days - first_day).astype(numpy.int64), -1)
+    order = numpy.lexsort((day_numbers, keys))
+
+    entities, starts, counts = numpy.unique(keys[order], return_index = True, return_counts = True)
+    attributes = { name: values(name)[order][starts] for name in layout.attributes }
+    den = values('den')[order] if 'den' in columns else None
+    day_names: Dict[int, str] = {}
+    if den is not None :
+        unique_days, first_rows = numpy.unique(day_numbers[order], return_index = True)
+        day_names = { int(day): str(den[row]) for day, row in zip(unique_days, first_rows) }
+
+    header = {
+        'dataset': dataset,
+        'signature': signature,
+        'first_day': str(first_day),
+        'entities': [entity.item() if hasattr(entity, 'item') else entity for entity in entities],
+        'attributes': { name: [value.item() if hasattr(value, 'item') else value for value in column]
+                        for name, column in attributes.items() },
+        'counters': list(layout.counters),
+        'day_names': day_names,
+    }
+    streams = [encode_varints(counts),
+               encode_varints(zigzag(segment_deltas(day_numbers[order], starts)))]
+    for name in layout.counters :
+        streams.append(encode_varints(zigzag(segment_deltas(values(name)[order].astype(numpy.int64),
+                                                             starts))))
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    chunks = [_magic, struct.pack('<Q', len(header_bytes)), header_bytes]
+    for stream in streams :
+        chunks.append(struct.pack('<Q', len(stream)))
+        chunks.append(stream)
+    return b''.join(chunks)
+
+
+class Panel :
+    """ Decoded panel of daily values of a set of entities (municipalities, city districts or ORP).
+
+    Attributes
+    ----------
+
+    dataset: str
+        Name of the dataset.
+
+    layout: PanelLayout
+
+    entities: List[Union[int, str]]
+        Sorted keys of the entities.
+
+    attributes: Dict[str, List[str]]
+        Attributes of the entities (e.g. names), in the order of `entities`.
+
+    """
+
+    def __init__(self, data: bytes) :
+        require_numpy()
+        if not data.startswith(_magic) :
+            raise ValueError('Invalid panel file.')
+
+        position = len(_magic)
+
+        def read_chunk() -> bytes :
+            nonlocal position
+            length = struct.unpack_from('<Q', data, position)[0]
+            position += 8 + length
+            return data[position - length:position]
+
+        header = json.loads(read_chunk().decode('utf-8'))
+        self.dataset: str = header['dataset']
+        self.signature: str = header['signature']
+        self.layout: PanelLayout = layouts[self.dataset]
+        self.entities: List[Union[int, str]] = header['entities']
+        self.attributes: Dict[str, List[Any]] = header['attributes']
+        self._first_day = numpy.datetime64(header['first_day'], 'D')
+        self._day_names = { int(day): name for day, name in header['day_names'].items() }
+        self._entity_index = { entity: i for i, entity in enumerate(self.entities) }
+
+        self._counts = decode_varints(read_chunk()).astype(numpy.int64)
+        self._starts = numpy.cumsum(self._counts) - self._counts
+        self._days = segment_cumsum(unzigzag(decode_varints(read_chunk())),
+                                    self._starts,
+                                    self._counts)
+        self._counters: Dict[str, Any] = {}
+        for name in header['counters'] :
+            self._counters[name] = segment_cumsum(unzigzag(decode_varints(read_chunk())),
+                                                  self._starts,
+                                                  self._counts)
+        self._by_day: Any = None
+
+
+    def __len__(self) -> int :
+        return len(self._days)
+
+
+    def dates(self) -> Any :
+        """ Returns sorted distinct dates of the panel as `datetime64[D]` array. """
+        return self._first_day + numpy.unique(self._days[self._days >= 0])
+
+
+    def series(self, entity: Union[int, str]) -> Dict[str, Any] :
+        """ Returns time series of the entity as a dict of arrays `datum` (`datetime64[D]`) and one
+        array per counter (empty values are `-1`, as in the records).
+        """
+        if (i := self._entity_index.get(entity)) is None :
+            raise KeyError(entity)
+        rows = slice(self._starts[i], self._starts[i] + self._counts[i])
+        result = { 'datum': self._first_day + self._days[rows] }
+        for name, values in self._counters.items() :
+            result[name] = values[rows]
+        return result
+
+
+    def cross_section(self, day: Union[date, str]) -> Dict[str, Any] :
+        """ Returns values of all entities on given day as a dict of arrays: `entity` (indexes into
+        `entities`) and one array per counter.
+        """
+        if self._by_day is None :
+            order = numpy.argsort(self._days, kind = 'stable')
+            self._by_day = (order, self._days[order])
+        order, sorted_days = self._by_day
+        number = int((numpy.datetime64(day, 'D') - self._first_day).astype(numpy.int64))
+        rows = order[numpy.searchsorted(sorted_days, number, 'left'):
+                     numpy.searchsorted(sorted_days, number, 'right')]
+        result = { 'entity': numpy.searchsorted(self._starts, rows, 'right') - 1 }
+        for name, values in self._counters.items() :
+            result[name] = values[rows]
+        return result
+
+
+    def day_name(self, day: Union[date, str]) -> str :
+        """ Returns value of the `den` column for given day. """
+        number = int((numpy.datetime64(day, 'D') - self._first_day).astype(numpy.int64))
+        return self._day_names.get(number, '')
+
+
+def load_panel(file_name: str, record_class: type, api_version: ApiVersion, cache_dir: str) -> Panel :
+    """ Loads the dataset as a `Panel` from file `<dataset>.panel` next to the cached csv file. The
+    panel file is encoded from the csv file when it doesn't exist or the csv file changed.
+    """
+    require_numpy()
+    if file_name not in layouts :
+        raise ValueError(f"Dataset '{file_name}' is not a panel, supported are {', '.join(layouts)}.")
+    if cache_dir is None :
+        raise ValueError('Panels require a cache directory.')
+
+    signature = dataset_signature(file_name, api_version, cache_dir)
+    panel_file = os.path.join(cache_dir, file_name + '.panel')
+    if os.path.isfile(panel_file) :
+        with open(panel_file, 'rb') as file :
+            panel = Panel(file.read())
+        if panel.signature == signature :
+            return panel
+
+    layout = layouts[file_name]
+    names = ['datum', layout.entity, *layout.attributes, *layout.counters]
+    if any(name == 'den' for name, _ in record_class.fields) :
+        names.append('den')
+    data = encode_panel(file_name, signature, load_columns(file_name, record_class, api_version, cache_dir, names))
+    temporary_file = panel_file + '.tmp'
+    with open(temporary_file, 'wb') as file :
+        file.write(data)
+    os.replace(temporary_file, panel_file)
+    return Panel(data)
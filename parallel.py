@@ -0,0 +1,125 @@
+from .api import ApiVersion, cached_files, date_span, row_filter, row_parser
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import date
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Type, Union
+import os
+
+def newline_ranges(cache_file: str,
+                   chunk_size: int,
+                   span: Optional[Tuple[int, int]] = None
+                   ) -> List[Tuple[int, int]] :
+    """ Splits the csv file (without the header line) into byte ranges of roughly `chunk_size`
+    bytes, each starting at the beginning of a line and ending after a line break (or at the end of
+    the file). If `span` (a line aligned byte range, see `date_span`) is given, only that part of
+    the file is split.
+    """
+    with open(cache_file, 'rb') as file :
+        if span is None :
+            file.readline()
+            start, end = file.tell(), os.path.getsize(cache_file)
+        else :
+            start, end = span
+        if start >= end :
+            return []
+
+        starts = [start]
+        while starts[-1] + chunk_size < end :
+            file.seek(starts[-1] + chunk_size - 1)
+            file.readline()
+            if file.tell() >= end :
+                break
+            starts.append(file.tell())
+
+    return list(zip(starts, starts[1:] + [end]))
+
+
+def parse_range(record_class: Type,
+                cache_file: str,
+                start: int,
+                end: int,
+                columns: Optional[Sequence[str]],
+                since: Union[date, str, None],
+                until: Union[date, str, None],
+                filters: Dict[str, Any],
+                map_batch: Optional[Callable[[List], Any]] = None
+                ) -> Any :
+    """ Parses rows of the byte range of the cached csv file (runs in worker processes). """
+    parse = row_parser(record_class, columns, row_filter(record_class, since, until, filters))
+    with open(cache_file, 'rb') as file :
+        file.seek(start)
+        data = file.read(end - start)
+
+    batch = [row for raw in data.split(b'\n')
+             if len(line := raw.rstrip(b'\r')) > 0 and (row := parse(line)) is not None]
+    return batch if map_batch is None else map_batch(batch)
+
+
+def get_parallel(file_name: str,
+                 record_class: Type,
+                 api_version: ApiVersion,
+                 cache_dir: Optional[str],
+                 workers: Optional[int] = None,
+                 ordered: bool = True,
+                 chunk_size: int = 8 * 1024 * 1024,
+                 map_batch: Optional[Callable[[List], Any]] = None,
+                 columns: Optional[Sequence[str]] = None,
+                 since: Union[date, str, None] = None,
+                 until: Union[date, str, None] = None,
+                 **filters: Any
+                 ) -> Iterator :
+    """ Parses the cached csv file in a pool of `workers` processes (defaults to number of CPUs).
+
+    The file is split into newline aligned byte ranges of about `chunk_size` bytes, which are parsed
+    independently and yielded as lists of rows. With `ordered` the batches are yielded in order of
+    the file, otherwise as soon as they are parsed, which suits commutative aggregations. Accepts the
+    same options as `get_many` (except `reuse`). Ranges are submitted as the previous ones are
+    yielded, at most two per worker are in flight, so memory is bounded by a few batches.
+
+    Records are passed from the workers pickled, which is often more expensive than the parsing
+    itself. If `map_batch` (a picklable function, e.g. defined at module level) is given, it is
+    applied to each batch in the worker and its results are yielded instead of the batches, so
+    aggregations can run in the workers and only their (small) results are passed back. Empty
+    batches are skipped only when `map_batch` is not given.
+    """
+    if cache_dir is None :
+        raise ValueError('Parallel parsing requires a cache directory.')
+
+    row_filter(record_class, since, until, filters)  # validates options before starting workers
+    files = cached_files(file_name, api_version, cache_dir, since, until)
+    ranges = ((cache_file, start, end)
+              for cache_file in files
+              for start, end in newline_ranges(cache_file, chunk_size, date_span(cache_file, since, until)))
+    with ProcessPoolExecutor(workers) as executor :
+        # at most two ranges per worker are parsed or waiting to be yielded at once, so only a few
+        # batches are held in memory and a slow consumer holds off the workers
+        window = 2 * (workers or os.cpu_count() or 1)
+
+        def submit() -> Optional[Future] :
+            if (item := next(ranges, None)) is None :
+                return None
+            return executor.submit(parse_range, record_class, *item, columns, since, until, filters, map_batch)
+
+        if ordered :
+            queue: Deque[Future] = deque()
+            while len(queue) < window and (future := submit()) is not None :
+                queue.append(future)
+            while len(queue) > 0 :
+                result = queue.popleft().result()
+                if (future := submit()) is not None :
+                    queue.append(future)
+                if map_batch is not None or len(result) > 0 :
+                    yield result
+        else :
+            pending: Set[Future] = set()
+            while len(pending) < window and (future := submit()) is not None :
+                pending.add(future)
+            while len(pending) > 0 :
+                done, pending = wait(pending, return_when = FIRST_COMPLETED)
+                for _ in done :
+                    if (future := submit()) is not None :
+                        pending.add(future)
+                while len(done) > 0 :
+                    result = done.pop().result()
+                    if map_batch is not None or len(result) > 0 :
+                        yield result
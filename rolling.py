@@ -0,0 +1,265 @@
+from .api import ApiVersion, column_index, get_many
+from .columnar import CategoricalColumn, load_columns, require_numpy
+from collections import namedtuple
+from datetime import date, timedelta
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple, Type
+
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+
+class RollingSum :
+    """ Trailing sum of a daily series over a window of days, kept in a ring buffer with one slot
+    per day of the window. Adding a value and moving the window are O(1) per day, days without
+    values count as zero.
+
+    Attributes
+    ----------
+
+    window: int
+        Number of days of the window (the current day included).
+
+    total: Any
+        Sum of the values of the window ending on the current day.
+
+    """
+
+    def __init__(self, window: int) :
+        if window <= 0 :
+            raise ValueError('Window must be at least one day.')
+        self.window = window
+        self.total: Any = 0
+        self._values: List[Any] = [0] * window
+        self._day: Optional[int] = None
+
+
+    def advance(self, day: date) -> Any :
+        """ Moves the window to end on given day (days must not decrease) and returns the sum. """
+        ordinal = day.toordinal()
+        if self._day is None :
+            self._day = ordinal
+        elif ordinal != self._day :
+            if ordinal < self._day :
+                raise ValueError(f'Rows are not in date order ({day} follows {date.fromordinal(self._day)}).')
+            values = self._values
+            for current in range(self._day + 1, self._day + 1 + min(ordinal - self._day, self.window)) :
+                slot = current % self.window
+                self.total -= values[slot]
+                values[slot] = 0
+            self._day = ordinal
+
+        return self.total
+
+
+    def add(self, day: date, value: Any = 1) -> Any :
+        """ Adds value of given day (days must not decrease) and returns the sum of the window ending
+        on that day.
+        """
+        self.advance(day)
+        self._values[self._day % self.window] += value
+        self.total += value
+        return self.total
+
+
+def rolling_type(by: Sequence[str], windows: Sequence[int], rates: bool) -> Type[tuple] :
+    names = ['datum', *by, *(f'sum_{window}' for window in windows),
+             *(f'mean_{window}' for window in windows)]
+    if rates :
+        names.extend(f'rate_{window}' for window in windows)
+    return namedtuple('Rolling', names)
+
+
+def get_rolling(file_name: str,
+                record_class: Type,
+                api_version: ApiVersion,
+                cache_dir: Optional[str],
+                by: Sequence[str],
+                value: Optional[str] = None,
+                windows: Sequence[int] = (7, 14),
+                population: Optional[Dict[Hashable, float]] = None,
+                **options: Any
+                ) -> Iterator[tuple] :
+    """ Yields trailing sums of column `value` (or numbers of rows if `value` is `None`) of groups by
+    columns `by` over windows of days, one row per day and group, in one streaming pass.
+
+    The dataset must be in date order (as the datasets are published). Every group gets a row for
+    every day from its first row to the last day of the dataset, days without rows (or days missing
+    in the dataset) count as zero. Rows are named tuples of `datum`, the `by` columns, `sum_<w>`
+    and `mean_<w>` (the sum divided by the window) for each window `w`, and `rate_<w>` (the sum per
+    100 000 inhabitants) if `population` of the groups is given (keyed by the value of the single
+    `by` column, or by tuples of the values). Empty `value` fields count as zero. Accepts filter
+    options of `get_many`.
+    """
+    by = list(by)
+    for column in ['datum', *by] + ([] if value is None else [value]) :
+        column_index(record_class, column)
+
+    make = rolling_type(by, windows, population is not None)._make
+    key_length = len(by)
+    columns = list(dict.fromkeys(['datum', *by] + ([] if value is None else [value])))
+    value_index = None if value is None else columns.index(value)
+    sums: Dict[tuple, List[RollingSum]] = {}
+    current: Optional[date] = None
+
+    def rows_of(day: date) -> Iterator[tuple] :
+        for key, key_sums in sums.items() :
+            totals = [rolling.advance(day) for rolling in key_sums]
+            row = [day, *key, *totals, *(total / window for total, window in zip(totals, windows))]
+            if population is not None :
+                size = population.get(key[0] if key_length == 1 else key)
+                row.extend(total * 100000 / size if size else None for total in totals)
+            yield make(row)
+
+    for row in get_many(file_name, record_class, api_version, cache_dir, columns = columns, **options) :
+        if (day := row[0]) is None :
+            continue
+        if current is not None and day != current :
+            if day < current :
+                raise ValueError(f'Rows are not in date order ({day} follows {current}).')
+            # days missing in the dataset are filled too
+            while current < day :
+                yield from rows_of(current)
+                current += timedelta(days = 1)
+        current = day
+
+        key = row[1:1 + key_length]
+        if (key_sums := sums.get(key)) is None :
+            key_sums = sums[key] = [RollingSum(window) for window in windows]
+        amount = 1 if value_index is None else max(row[value_index], 0)
+        for rolling in key_sums :
+            rolling.add(day, amount)
+
+    if current is not None :
+        yield from rows_of(current)
+
+
+def daily_matrix(file_name: str,
+                 record_class: Type,
+                 api_version: ApiVersion,
+                 cache_dir: Optional[str],
+                 by: Sequence[str],
+                 value: Optional[str] = None,
+                 **options: Any
+                 ) -> Tuple[List[tuple], Any, Any] :
+    """ Returns keys of the groups by columns `by`, array of days (`datetime64[D]`, every day from
+    the first to the last date of the dataset) and a dense matrix (groups × days) of daily sums of
+    column `value` (or numbers of rows if `value` is `None`), loaded by `load_columns`.
+    """
+    require_numpy()
+    names = list(dict.fromkeys(['datum', *by] + ([] if value is None else [value])))
+    columns = load_columns(file_name, record_class, api_version, cache_dir, names, **options)
+    days = columns['datum']
+    valid = ~numpy.isnat(days)
+    if not valid.any() :
+        return [], numpy.zeros(0, dtype = 'datetime64[D]'), numpy.zeros((0, 0))
+
+    first = days[valid].min()
+    day_indexes = (days[valid] - first).astype(numpy.int64)
+    day_count = int(day_indexes.max()) + 1
+
+    codes = []
+    tables = []
+    for name in by :
+        column = columns[name]
+        if isinstance(column, CategoricalColumn) :
+            codes.append(column.codes[valid])
+            tables.append(numpy.array(column.categories, dtype = object))
+        else :
+            table, inverse = numpy.unique(numpy.ma.filled(column, -1)[valid], return_inverse = True)
+            codes.append(inverse)
+            tables.append(table)
+
+    if len(by) > 0 :
+        unique_codes, key_indexes = numpy.unique(numpy.stack(codes, axis = 1), axis = 0, return_inverse = True)
+        key_indexes = key_indexes.reshape(-1)
+        keys = [tuple(table[code].item() if hasattr(table[code], 'item') else table[code]
+                      for table, code in zip(tables, row))
+                for row in unique_codes]
+    else :
+        key_indexes = numpy.zeros(len(day_indexes), dtype = numpy.int64)
+        keys = [()]
+
+    if value is None :
+        weights = None
+    else :
+        weights = numpy.ma.filled(columns[value], 0)[valid].astype(numpy.float64)
+        weights[weights < 0] = 0
+    matrix = numpy.bincount(key_indexes * day_count + day_indexes,
+                            weights = weights,
+                            minlength = len(keys) * day_count).reshape(len(keys), day_count)
+    return keys, first + numpy.arange(day_count), matrix
+
+
+def rolling_sums(matrix: Any, window: int) -> Any :
+    """ Returns trailing sums over `window` days of a matrix of daily values (groups × days). """
+    totals = numpy.cumsum(matrix, axis = 1)
+    totals[:, window:] -= totals[:, :-window].copy()
+    return totals
+
+
+def iso_week_sums(days: Any, matrix: Any) -> Tuple[List[str], Any] :
+    """ Resamples a matrix of daily values (groups × days) into ISO weeks, returns names of the
+    weeks (`YYYY-Www`) and the matrix of weekly sums (groups × weeks).
+    """
+    weeks = [f'{year:04}-W{week:02}'
+             for year, week, _ in (day.isocalendar() for day in days.astype(object))]
+    names, indexes = numpy.unique(numpy.array(weeks), return_inverse = True)
+    result = numpy.zeros((matrix.shape[0], len(names)), dtype = matrix.dtype)
+    numpy.add.at(result, (slice(None), indexes), matrix)
+    return [str(name) for name in names], result
+
+
+def population_sizes(keys: List[tuple], population: Dict[Hashable, float]) -> Any :
+    """ Returns array of population sizes of the groups (`nan` for unknown groups). """
+    return numpy.array([population.get(key[0] if len(key) == 1 else key) or numpy.nan for key in keys],
+                       dtype = numpy.float64)
+
+
+def get_rolling_arrays(file_name: str,
+                       record_class: Type,
+                       api_version: ApiVersion,
+                       cache_dir: Optional[str],
+                       by: Sequence[str],
+                       value: Optional[str] = None,
+                       windows: Sequence[int] = (7, 14),
+                       population: Optional[Dict[Hashable, float]] = None,
+                       **options: Any
+                       ) -> Dict[str, Any] :
+    """ Vectorized variant of `get_rolling`, returns a dict of `keys` (list of tuples of values of
+    the `by` columns), `datum` (every day from the first to the last date of the dataset) and
+    matrices (groups × days) `sum_<w>`, `mean_<w>` and `rate_<w>` (if `population` is given) for
+    each window `w`.
+    """
+    keys, days, matrix = daily_matrix(file_name, record_class, api_version, cache_dir, by, value, **options)
+    result: Dict[str, Any] = { 'keys': keys, 'datum': days }
+    sizes = None if population is None else population_sizes(keys, population)[:, numpy.newaxis]
+    for window in windows :
+        sums = rolling_sums(matrix, window)
+        result[f'sum_{window}'] = sums
+        result[f'mean_{window}'] = sums / window
+        if sizes is not None :
+            result[f'rate_{window}'] = sums * 100000 / sizes
+    return result
+
+
+def get_weekly(file_name: str,
+               record_class: Type,
+               api_version: ApiVersion,
+               cache_dir: Optional[str],
+               by: Sequence[str],
+               value: Optional[str] = None,
+               population: Optional[Dict[Hashable, float]] = None,
+               **options: Any
+               ) -> Dict[str, Any] :
+    """ Returns a dict of `keys` (list of tuples of values of the `by` columns), `weeks` (ISO weeks
+    `YYYY-Www`) and matrices (groups × weeks) `sum` of weekly sums of column `value` (or numbers
+    of rows if `value` is `None`) and `rate` (if `population` is given).
+    """
+    keys, days, matrix = daily_matrix(file_name, record_class, api_version, cache_dir, by, value, **options)
+    weeks, sums = iso_week_sums(days, matrix)
+    result: Dict[str, Any] = { 'keys': keys, 'weeks': weeks, 'sum': sums }
+    if population is not None :
+        result['rate'] = sums * 100000 / population_sizes(keys, population)[:, numpy.newaxis]
+    return result
@@ -0,0 +1,214 @@
+from .api import ApiVersion, cache_signature, cached_files, column_index, dataset_signature, date_field
+from .api import partition_period, span_lines, update_cache
+from collections import namedtuple
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+import hashlib
+import json
+import os
+
+# dimensions of the rollups, `vekova_skupina` is the five year age band of `vek`
+dimensions = ('datum', 'kraj_nuts_kod', 'okres_lau_kod', 'vekova_skupina', 'pohlavi')
+
+# measures of the rollups by dataset, `pocet` is the number of rows, other measures are numbers of
+# rows with non-empty bool column of the same name
+measures: Dict[str, Tuple[str, ...]] = {
+    'osoby': ('pocet', 'nakaza_v_zahranici'),
+    'umrti': ('pocet',),
+}
+
+# size of the blocks of the cached file read when looking for line breaks and hashing it
+_check_size = 64 * 1024
+
+_loaded: Dict[str, Tuple[str, List[list]]] = {}
+
+
+def age_band(vek: bytes) -> str :
+    """ Returns five year age band (`'0-4'`, `'5-9'`, …, `'95+'`) of raw age, empty if unknown. """
+    try :
+        age = int(vek)
+    except ValueError :
+        return ''
+
+    if age < 0 :
+        return ''
+    elif age >= 95 :
+        return '95+'
+    return f'{age // 5 * 5}-{age // 5 * 5 + 4}'
+
+
+def count_lines(record_class: Type,
+                dataset: str,
+                lines: Iterable[bytes],
+                counts: Dict[Tuple[str, ...], List[int]]
+                ) -> None :
+    """ Adds counts of raw data lines into the rollup (keyed by values of `dimensions`). """
+    datum, kraj, okres, vek, pohlavi = (column_index(record_class, column)
+                                        for column in ('datum', 'kraj_nuts_kod', 'okres_lau_kod', 'vek', 'pohlavi'))
+    flags = [column_index(record_class, column) for column in measures[dataset][1:]]
+    max_split = max(datum, kraj, okres, vek, pohlavi, *flags) + 1
+    bands: Dict[bytes, str] = {}
+    for line in lines :
+        if len(line := line.rstrip(b'\r')) == 0 :
+            continue
+        parts = line.split(b',', max_split)
+        if len(parts) < max_split :
+            parts.extend([b''] * (max_split - len(parts)))
+        if (band := bands.get(parts[vek])) is None :
+            band = bands[parts[vek]] = age_band(parts[vek])
+        key = (parts[datum].decode('utf-8'),
+               parts[kraj].decode('utf-8'),
+               parts[okres].decode('utf-8'),
+               band,
+               parts[pohlavi].decode('utf-8'))
+        if (values := counts.get(key)) is None :
+            values = counts[key] = [0] * (1 + len(flags))
+        values[0] += 1
+        for n, i in enumerate(flags, 1) :
+            if len(parts[i]) > 0 :
+                values[n] += 1
+
+
+def prefix_hash(cache_file: str, offset: int) -> str :
+    """ Returns hash of the first `offset` bytes of the file. """
+    digest = hashlib.blake2b()
+    with open(cache_file, 'rb') as file :
+        remaining = offset
+        while remaining > 0 and len(block := file.read(min(16 * _check_size, remaining))) > 0 :
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def appended_offset(cache_file: str, offset: int, digest: Optional[str]) -> int :
+    """ Returns `offset` if the first `offset` bytes of the file still have hash `digest`, i.e. the
+    file was only appended to since they were processed, otherwise 0. The whole prefix is hashed, a
+    change of any already processed row is detected.
+    """
+    if digest is None or not 0 < offset <= os.path.getsize(cache_file) :
+        return 0
+    return offset if prefix_hash(cache_file, offset) == digest else 0
+
+
+def lines_end(file: Any, offset: int, size: int) -> int :
+    """ Returns offset just after the last line feed of the file (not less than `offset`). """
+    position = size
+    while position > offset :
+        start = max(position - _check_size, offset)
+        file.seek(start)
+        if (i := file.read(position - start).rfind(b'\n')) >= 0 :
+            return start + i + 1
+        position = start
+    return offset
+
+
+def load_rollup(file_name: str, record_class: Type, api_version: ApiVersion, cache_dir: str) -> List[list] :
+    """ Returns rows of the daily rollup of the dataset (values of `dimensions` followed by the
+    `measures`), kept in file `<dataset>.daily.json` next to the cached file.
+
+    When the cached file changed, the already counted part of it is hashed again and compared with
+    its stored hash (see `appended_offset`). If they match, the file was only appended to and only
+    the new rows are counted into the stored rollup, otherwise the rollup is rebuilt. Partitioned
+    datasets are always rebuilt.
+    """
+    if file_name not in measures :
+        raise ValueError(f"Dataset '{file_name}' has no daily rollup, supported are {', '.join(measures)}.")
+    if cache_dir is None :
+        raise ValueError('Daily rollups require a cache directory.')
+
+    partitioned = partition_period(file_name, cache_dir) is not None
+    if partitioned :
+        signature = dataset_signature(file_name, api_version, cache_dir)
+    else :
+        cache_file = update_cache(file_name, api_version, cache_dir)
+        signature = cache_signature(cache_file)
+    rollup_file = os.path.join(cache_dir, file_name + '.daily.json')
+    if (loaded := _loaded.get(rollup_file)) is not None and loaded[0] == signature :
+        return loaded[1]
+
+    state: Optional[Dict[str, Any]] = None
+    if os.path.isfile(rollup_file) :
+        with open(rollup_file, 'r', encoding = 'utf-8') as file :
+            state = json.load(file)
+        if state['signature'] == signature :
+            _loaded[rollup_file] = (signature, state['rows'])
+            return state['rows']
+
+    counts: Dict[Tuple[str, ...], List[int]] = {}
+    offset = 0
+    if partitioned :
+        for partition_file in cached_files(file_name, api_version, cache_dir) :
+            with open(partition_file, 'rb') as file :
+                file.readline()
+                count_lines(record_class, file_name, (line.rstrip(b'\n') for line in file), counts)
+    else :
+        size = os.path.getsize(cache_file)
+        if state is not None and (offset := appended_offset(cache_file, state['offset'], state.get('prefix_hash'))) > 0 :
+            counts = { tuple(row[:len(dimensions)]): row[len(dimensions):] for row in state['rows'] }
+
+        with open(cache_file, 'rb') as file :
+            if offset == 0 :
+                offset = len(file.readline())
+            # only complete lines are counted, a partially written last line is counted next time
+            end = lines_end(file, offset, size)
+            count_lines(record_class, file_name, span_lines(file, offset, end), counts)
+        offset = end
+
+    rows = [[*key, *values] for key, values in sorted(counts.items())]
+    state = { 'signature': signature, 'offset': offset, 'rows': rows }
+    if not partitioned :
+        state['prefix_hash'] = prefix_hash(cache_file, offset)
+    with open(rollup_file + '.tmp', 'w', encoding = 'utf-8') as file :
+        file.write(json.dumps(state))
+    os.replace(rollup_file + '.tmp', rollup_file)
+    _loaded[rollup_file] = (signature, rows)
+    return rows
+
+
+def get_daily(file_name: str,
+              record_class: Type,
+              api_version: ApiVersion,
+              cache_dir: str,
+              by: Sequence[str] = dimensions,
+              since: Union[date, str, None] = None,
+              until: Union[date, str, None] = None,
+              **filters: Any
+              ) -> List[tuple] :
+    """ Returns counts of rows of the dataset grouped by `by` (a subset of `dimensions`), summed
+    from its daily rollup (see `load_rollup`).
+
+    Rows of the rollup can be filtered by `since` and `until` (inclusive bounds of `datum`, rows
+    with empty or invalid date are then excluded) and by values of the dimensions (a value or a
+    list, tuple or set of allowed values, e.g. `vekova_skupina = ['80-84', '85-89', '90-94', '95+']`). Returns named tuples of the `by`
+    dimensions (`datum` as date) followed by the `measures`, in order of the dimensions.
+    """
+    for name in [*by, *filters] :
+        if name not in dimensions :
+            raise ValueError(f"'{name}' is not a dimension of the rollup, expected one of {', '.join(dimensions)}.")
+
+    checks = []
+    for name, value in filters.items() :
+        allowed = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+        checks.append((dimensions.index(name), { '' if item is None else str(item) for item in allowed }))
+    low = '' if since is None else str(date_field(since) or since)
+    high = '\uffff' if until is None else str(date_field(until) or until)
+    # rows with empty or invalid date match no date range, as in `row_filter`
+    dated_only = since is not None or until is not None
+
+    indexes = [dimensions.index(name) for name in by]
+    width = len(dimensions)
+    groups: Dict[tuple, List[int]] = {}
+    for row in load_rollup(file_name, record_class, api_version, cache_dir) :
+        if not low <= row[0] <= high or not all(row[i] in allowed for i, allowed in checks) \
+                or (dated_only and date_field(row[0]) is None) :
+            continue
+        key = tuple(row[i] for i in indexes)
+        if (values := groups.get(key)) is None :
+            groups[key] = row[width:]
+        else :
+            groups[key] = [total + value for total, value in zip(values, row[width:])]
+
+    result_type = namedtuple('Daily', [*by, *measures[file_name]])
+    datum = by.index('datum') if 'datum' in by else -1
+    return [result_type(*(date_field(value) if n == datum else value for n, value in enumerate(key)), *values)
+            for key, values in sorted(groups.items())]
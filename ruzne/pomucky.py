@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field
+from ..api import get_many, ApiVersion, int_field, str_field
 from typing import Iterator, List, Optional
 
 class Pomucky:
@@ -23,6 +23,20 @@ class Pomucky:
 
     """
 
+    file_name = 'pomucky'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('pomucka', str_field),
+        ('kraj_nuts_kod', str_field),
+        ('mnozstvi', int_field),
+    )
+
+    categorical = (
+        'pomucka',
+        'kraj_nuts_kod',
+    )
+
     def __init__(self, line: List[str]) :
         self.pomucka: str = line[0]
         self.kraj_nuts_kod: str = line[1]
@@ -30,6 +44,10 @@ class Pomucky:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['Pomucky'] :
-        return get_many('pomucky', Pomucky, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['Pomucky'] :
+        return get_many(Pomucky.file_name,
+                        Pomucky,
+                        Pomucky.api_version,
+                        cache_dir,
+                        **options)
 
@@ -0,0 +1,229 @@
+from .columnar import CategoricalColumn, require_numpy
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import struct
+import sys
+import threading
+
+try :
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError :
+    shared_memory = None
+
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+# size of the directory block holding name of the current version of a dataset
+_directory_size = 256
+_alignment = 64
+_register_lock = threading.Lock()
+
+# directory blocks and current data blocks of datasets published by this process (by directory
+# name), data blocks are unlinked when they are replaced by a newer version
+_directories: Dict[str, Any] = {}
+_blocks: Dict[str, Any] = {}
+
+
+def short_name(prefix: str, key: str) -> str :
+    """ Shared memory names are limited to 31 characters on some systems, keys are hashed. """
+    return f'{prefix}_{hashlib.blake2b(key.encode("utf-8"), digest_size = 8).hexdigest()}'
+
+
+def attach_block(name: str) -> Any :
+    """ Attaches existing shared memory block without registering it in the resource tracker (which
+    would unlink the block when the attaching process exits).
+    """
+    if sys.version_info >= (3, 13) :
+        return shared_memory.SharedMemory(name, track = False)
+
+    # older versions always register the block, unregistering it afterwards is not an option since
+    # forked processes share the resource tracker with the publishing process
+    with _register_lock :
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype : None
+        try :
+            return shared_memory.SharedMemory(name)
+        finally :
+            resource_tracker.register = register
+
+
+def array_layout(arrays: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Any], int] :
+    """ Returns schema of the columns, the buffers to write and the total size of the buffers. """
+    schema: List[Dict[str, Any]] = []
+    buffers: List[Any] = []
+    offset = 0
+
+    def add(array: Any) -> Dict[str, Any] :
+        nonlocal offset
+        array = numpy.ascontiguousarray(array)
+        buffers.append((offset, array))
+        description = { 'offset': offset, 'dtype': array.dtype.str, 'length': len(array) }
+        offset += (array.nbytes + _alignment - 1) // _alignment * _alignment
+        return description
+
+    for name, array in arrays.items() :
+        if isinstance(array, CategoricalColumn) :
+            schema.append({ 'name': name, 'kind': 'categorical', 'data': add(array.codes),
+                            'categories': array.categories })
+        elif isinstance(array, numpy.ma.MaskedArray) :
+            schema.append({ 'name': name, 'kind': 'masked', 'data': add(array.data),
+                            'mask': add(numpy.ma.getmaskarray(array)) })
+        else :
+            schema.append({ 'name': name, 'kind': 'array', 'data': add(array) })
+
+    return schema, buffers, offset
+
+
+def publish(prefix: str, dataset: str, version: str, arrays: Dict[str, Any]) -> str :
+    """ Publishes columns (in the format of `load_columns`) into a shared memory block and makes it
+    the current version of the dataset. Returns name of the block.
+
+    The block starts with the length of the JSON schema header (8 bytes), the header and the column
+    buffers aligned to 64 bytes follow. The name of the current block is stored in a small
+    directory block named after the dataset. Previously published version of the dataset is
+    unlinked, processes which still have it attached keep their mapping until they detach.
+    Published blocks are unlinked when this process exits.
+    """
+    require_shared_memory()
+    name = short_name(prefix, f'{dataset}:{version}')
+    directory_name = short_name(prefix, dataset)
+    if directory_name in _blocks and _blocks[directory_name].name == name :
+        return name
+
+    schema, buffers, size = array_layout(arrays)
+    header = json.dumps({ 'dataset': dataset, 'version': version, 'columns': schema }).encode('utf-8')
+    start = (8 + len(header) + _alignment - 1) // _alignment * _alignment
+    block = shared_memory.SharedMemory(name, create = True, size = max(start + size, 1))
+    block.buf[:8] = struct.pack('<Q', len(header))
+    block.buf[8:8 + len(header)] = header
+    for offset, array in buffers :
+        block.buf[start + offset:start + offset + array.nbytes] = array.view(numpy.uint8).reshape(-1)
+
+    if (directory := _directories.get(directory_name)) is None :
+        try :
+            directory = shared_memory.SharedMemory(directory_name, create = True, size = _directory_size)
+        except FileExistsError :
+            directory = attach_block(directory_name)
+        _directories[directory_name] = directory
+
+    directory.buf[:_directory_size] = name.encode('ascii').ljust(_directory_size, b'\0')
+    if (previous := _blocks.get(directory_name)) is not None :
+        previous.close()
+        previous.unlink()
+    _blocks[directory_name] = block
+    return name
+
+
+def unpublish(prefix: str, dataset: str) -> None :
+    """ Unlinks the blocks of the dataset published by this process. """
+    directory_name = short_name(prefix, dataset)
+    for blocks in (_blocks, _directories) :
+        if (block := blocks.pop(directory_name, None)) is not None :
+            block.close()
+            block.unlink()
+
+
+def current_name(prefix: str, dataset: str) -> Optional[str] :
+    """ Returns name of the block with the current version of the dataset (`None` if the dataset is
+    not published).
+    """
+    require_shared_memory()
+    try :
+        directory = attach_block(short_name(prefix, dataset))
+    except FileNotFoundError :
+        return None
+
+    name = bytes(directory.buf[:_directory_size]).rstrip(b'\0').decode('ascii')
+    directory.close()
+    return name or None
+
+
+class SharedDataset :
+    """ Dataset published into shared memory, attached zero-copy.
+
+    Attributes
+    ----------
+
+    dataset: str
+        Name of the dataset.
+
+    version: str
+        Version of the attached data (signature of the cached csv file it was loaded from and the
+        options it was loaded with).
+
+    columns: Dict[str, Any]
+        Columns in the format of `load_columns`, numpy arrays are views of the shared memory.
+
+    """
+
+    def __init__(self, prefix: str, dataset: str) :
+        require_numpy()
+        self._prefix = prefix
+        self.dataset = dataset
+        self.version = ''
+        self.columns: Dict[str, Any] = {}
+        self._block: Any = None
+        self.refresh()
+
+
+    def is_current(self) -> bool :
+        """ Checks whether the attached version is still the current version of the dataset. """
+        return self._block is not None and current_name(self._prefix, self.dataset) == self._block.name
+
+
+    def refresh(self) -> bool :
+        """ Attaches the current version of the dataset if it was replaced, returns whether the
+        columns changed. Columns obtained before the refresh must not be used anymore.
+        """
+        if (name := current_name(self._prefix, self.dataset)) is None :
+            raise ValueError(f"Dataset '{self.dataset}' is not published in shared memory.")
+        if self._block is not None and self._block.name == name :
+            return False
+
+        block = attach_block(name)
+        header_length = struct.unpack('<Q', bytes(block.buf[:8]))[0]
+        header = json.loads(bytes(block.buf[8:8 + header_length]).decode('utf-8'))
+        start = (8 + header_length + _alignment - 1) // _alignment * _alignment
+
+        def view(description: Dict[str, Any]) -> Any :
+            return numpy.ndarray((description['length'],),
+                                 dtype = numpy.dtype(description['dtype']),
+                                 buffer = block.buf,
+                                 offset = start + description['offset'])
+
+        columns: Dict[str, Any] = {}
+        for column in header['columns'] :
+            if column['kind'] == 'categorical' :
+                columns[column['name']] = CategoricalColumn(view(column['data']), column['categories'])
+            elif column['kind'] == 'masked' :
+                columns[column['name']] = numpy.ma.masked_array(view(column['data']),
+                                                                view(column['mask']),
+                                                                copy = False)
+            else :
+                columns[column['name']] = view(column['data'])
+
+        self.close()
+        self._block = block
+        self.columns = columns
+        self.version = header['version']
+        return True
+
+
+    def close(self) -> None :
+        """ Detaches the shared memory, columns can't be used after that. """
+        self.columns = {}
+        if self._block is not None :
+            try :
+                self._block.close()
+            except BufferError :
+                # columns are still referenced elsewhere, the mapping is released with them
+                pass
+            self._block = None
+
+
+def require_shared_memory() -> None :
+    if shared_memory is None :
+        raise ImportError('Shared memory datasets require Python 3.8 or newer.')
@@ -0,0 +1,371 @@
+from .api import ApiVersion, cache_signature, cached_files, column_index, date_field, partition_key
+from .api import partition_period, raw_value, span_lines
+from .rollup import appended_offset, lines_end, prefix_hash
+from array import array
+from collections import namedtuple
+from math import ceil, log
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+import base64
+import hashlib
+import json
+import os
+import random
+import struct
+
+
+class HyperLogLog :
+    """ Approximate counter of distinct values (HyperLogLog with 64-bit hashes).
+
+    Memory is `2 ** precision` bytes regardless of the number of values, the relative standard
+    error of the count is about `1.04 / sqrt(2 ** precision)` (1.6 % for the default precision).
+    Sketches of the same precision can be merged, e.g. sketches of partitions of a dataset.
+
+    Attributes
+    ----------
+
+    precision: int
+        Number of bits of the hash selecting the register (4 to 18).
+
+    """
+
+    def __init__(self, precision: int = 12) :
+        if not 4 <= precision <= 18 :
+            raise ValueError('Precision must be between 4 and 18.')
+        self.precision = precision
+        self._registers = bytearray(1 << precision)
+
+
+    def add(self, value: Any) -> None :
+        """ Adds a value (bytes, or any value compared by its raw text, see `raw_value`). """
+        digest = hashlib.blake2b(value if isinstance(value, bytes) else raw_value(value), digest_size = 8).digest()
+        hashed = int.from_bytes(digest, 'little')
+        rest_bits = 64 - self.precision
+        register = hashed >> rest_bits
+        rank = rest_bits - (hashed & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self._registers[register] :
+            self._registers[register] = rank
+
+
+    def update(self, values: Iterable[Any]) -> None :
+        """ Adds values, each distinct value is hashed once. """
+        for value in set(values) :
+            self.add(value)
+
+
+    def merge(self, other: 'HyperLogLog') -> None :
+        """ Merges the other sketch into this one (the count becomes the count of the union). """
+        if other.precision != self.precision :
+            raise ValueError('Sketches of different precision cannot be merged.')
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+
+    def count(self) -> float :
+        """ Returns the estimated number of distinct values. """
+        m = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self._registers)
+        if estimate <= 2.5 * m and (zeros := self._registers.count(0)) > 0 :
+            # small range correction (linear counting)
+            return m * log(m / zeros)
+        return estimate
+
+
+    def to_bytes(self) -> bytes :
+        return bytes([self.precision]) + bytes(self._registers)
+
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'HyperLogLog' :
+        sketch = HyperLogLog(data[0])
+        sketch._registers = bytearray(data[1:])
+        return sketch
+
+
+class KllSketch :
+    """ Approximate quantiles of a stream of numbers (KLL sketch).
+
+    Values are kept in a hierarchy of compactors, a full compactor sorts its values and passes every
+    other one (randomly the odd or the even ones) to the next compactor, where each value stands for
+    twice as many values. Memory is about `3 * k` values regardless of the number of values, the
+    rank error is about `1.7 / k` of the number of values. Sketches of the same `k` can be merged.
+
+    Attributes
+    ----------
+
+    k: int
+        Size of the largest compactor.
+
+    n: int
+        Number of added values.
+
+    """
+
+    def __init__(self, k: int = 200) :
+        if k < 8 :
+            raise ValueError('Parameter k must be at least 8.')
+        self.k = k
+        self.n = 0
+        self._compactors: List[List[float]] = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+
+    def _capacity(self, level: int) -> int :
+        height = len(self._compactors)
+        return max(int(ceil(self.k * (2 / 3) ** (height - level - 1))), 2)
+
+
+    def _compress(self) -> None :
+        while self._size >= self._max_size :
+            for level, compactor in enumerate(self._compactors) :
+                if len(compactor) >= self._capacity(level) :
+                    if level + 1 == len(self._compactors) :
+                        self._compactors.append([])
+                    compactor.sort()
+                    self._compactors[level + 1].extend(compactor[random.getrandbits(1)::2])
+                    self._compactors[level] = []
+                    break
+            self._size = sum(map(len, self._compactors))
+            self._max_size = sum(self._capacity(level) for level in range(len(self._compactors)))
+
+
+    def add(self, value: float) -> None :
+        self._compactors[0].append(value)
+        self.n += 1
+        self._size += 1
+        if self._size >= self._max_size :
+            self._compress()
+
+
+    def update(self, values: Iterable[float]) -> None :
+        for value in values :
+            self.add(value)
+
+
+    def merge(self, other: 'KllSketch') -> None :
+        """ Merges the other sketch into this one (as if its values were added). """
+        if other.k != self.k :
+            raise ValueError('Sketches of different k cannot be merged.')
+        while len(self._compactors) < len(other._compactors) :
+            self._compactors.append([])
+        for compactor, values in zip(self._compactors, other._compactors) :
+            compactor.extend(values)
+        self.n += other.n
+        self._size = sum(map(len, self._compactors))
+        self._max_size = sum(self._capacity(level) for level in range(len(self._compactors)))
+        self._compress()
+
+
+    def _weighted(self) -> Tuple[List[float], List[int]] :
+        items = sorted((value, 1 << level) for level, compactor in enumerate(self._compactors) for value in compactor)
+        return [value for value, _ in items], [weight for _, weight in items]
+
+
+    def quantile(self, q: float) -> Optional[float] :
+        """ Returns the approximate `q`-quantile (0 ≤ q ≤ 1) of the values, `None` if there are none. """
+        return self.quantiles([q])[0]
+
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]] :
+        values, weights = self._weighted()
+        if len(values) == 0 :
+            return [None] * len(qs)
+
+        total = sum(weights)
+        result = []
+        for q in qs :
+            target = q * total
+            cumulative = 0
+            for value, weight in zip(values, weights) :
+                cumulative += weight
+                if cumulative >= target :
+                    result.append(value)
+                    break
+            else :
+                result.append(values[-1])
+        return result
+
+
+    def to_bytes(self) -> bytes :
+        chunks = [struct.pack('<IQI', self.k, self.n, len(self._compactors))]
+        for compactor in self._compactors :
+            chunks.append(struct.pack('<I', len(compactor)))
+            chunks.append(array('d', compactor).tobytes())
+        return b''.join(chunks)
+
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'KllSketch' :
+        k, n, levels = struct.unpack_from('<IQI', data)
+        sketch = KllSketch(k)
+        sketch.n = n
+        sketch._compactors = []
+        position = struct.calcsize('<IQI')
+        for _ in range(levels) :
+            length = struct.unpack_from('<I', data, position)[0]
+            position += 4
+            values = array('d')
+            values.frombytes(data[position:position + 8 * length])
+            position += 8 * length
+            sketch._compactors.append(values.tolist())
+        sketch._size = sum(map(len, sketch._compactors))
+        sketch._max_size = sum(sketch._capacity(level) for level in range(levels))
+        return sketch
+
+
+def period_key(value: bytes, period: Optional[str]) -> str :
+    """ Returns the day (`YYYY-MM-DD`), ISO week (`YYYY-Www`) or month (`YYYY-MM`) of raw date. """
+    if period is None :
+        return ''
+    elif period == 'day' :
+        return value.decode('ascii') if date_field(value.decode('ascii')) is not None else 'undated'
+    return partition_key(value, period)
+
+
+def sketch_lines(record_class: Type,
+                 lines: Iterable[bytes],
+                 by: Sequence[str],
+                 period: Optional[str],
+                 distinct: Sequence[str],
+                 quantiles: Sequence[str],
+                 groups: Dict[Tuple[str, ...], List[Any]]
+                 ) -> None :
+    """ Adds raw data lines into the sketches of their groups (keyed by the period and values of
+    `by`), the sketches of a group are HyperLogLogs of `distinct` columns followed by KLL sketches
+    of `quantiles` columns.
+    """
+    indexes = [column_index(record_class, column) for column in by]
+    datum = column_index(record_class, 'datum') if period is not None else 0
+    distinct_indexes = [column_index(record_class, column) for column in distinct]
+    quantile_indexes = [column_index(record_class, column) for column in quantiles]
+    max_split = max([datum, *indexes, *distinct_indexes, *quantile_indexes]) + 1
+    periods: Dict[bytes, str] = {}
+    for line in lines :
+        if len(line := line.rstrip(b'\r')) == 0 :
+            continue
+        parts = line.split(b',', max_split)
+        if len(parts) < max_split :
+            parts.extend([b''] * (max_split - len(parts)))
+        if (key_period := periods.get(parts[datum])) is None :
+            key_period = periods[parts[datum]] = period_key(parts[datum], period)
+        key = (key_period, *(parts[i].decode('utf-8') for i in indexes))
+        if (sketches := groups.get(key)) is None :
+            sketches = groups[key] = [HyperLogLog() for _ in distinct] + [KllSketch() for _ in quantiles]
+        for sketch, i in zip(sketches, distinct_indexes) :
+            if len(parts[i]) > 0 :
+                sketch.add(parts[i])
+        for sketch, i in zip(sketches[len(distinct):], quantile_indexes) :
+            if len(parts[i]) > 0 :
+                sketch.add(float(parts[i]))
+
+
+def encode_groups(groups: Dict[Tuple[str, ...], List[Any]]) -> List[list] :
+    return [[list(key), [base64.b64encode(sketch.to_bytes()).decode('ascii') for sketch in sketches]]
+            for key, sketches in groups.items()]
+
+
+def decode_groups(rows: List[list], distinct_count: int) -> Dict[Tuple[str, ...], List[Any]] :
+    return { tuple(key): [(HyperLogLog if i < distinct_count else KllSketch).from_bytes(base64.b64decode(sketch))
+                          for i, sketch in enumerate(sketches)]
+             for key, sketches in rows }
+
+
+def load_sketches(cache_file: str,
+                  record_class: Type,
+                  by: Sequence[str],
+                  period: Optional[str],
+                  distinct: Sequence[str],
+                  quantiles: Sequence[str],
+                  incremental: bool
+                  ) -> Dict[Tuple[str, ...], List[Any]] :
+    """ Returns sketches of the groups of the cached file (a single cached file or a partition),
+    kept in file `<cached file>.<specification hash>.sketches` next to it.
+
+    Sketches of an unchanged file are loaded. With `incremental`, when the file changed and the
+    already sketched part of it still has its stored hash (see `appended_offset`), the file was only
+    appended to and only the new rows are added into the stored sketches, otherwise the file is
+    sketched again.
+    """
+    specification = json.dumps([list(by), period, list(distinct), list(quantiles)])
+    digest = hashlib.blake2b(specification.encode('utf-8'), digest_size = 8).hexdigest()
+    sketch_file = f'{os.path.splitext(cache_file)[0]}.{digest}.sketches'
+    signature = cache_signature(cache_file)
+    state: Optional[Dict[str, Any]] = None
+    if os.path.isfile(sketch_file) :
+        with open(sketch_file, 'r', encoding = 'utf-8') as file :
+            state = json.load(file)
+        if state['signature'] == signature :
+            return decode_groups(state['groups'], len(distinct))
+
+    groups: Dict[Tuple[str, ...], List[Any]] = {}
+    offset = 0
+    size = os.path.getsize(cache_file)
+    if incremental and state is not None \
+            and (offset := appended_offset(cache_file, state['offset'], state.get('prefix_hash'))) > 0 :
+        groups = decode_groups(state['groups'], len(distinct))
+
+    with open(cache_file, 'rb') as file :
+        if offset == 0 :
+            offset = len(file.readline())
+        # only complete lines are sketched, a partially written last line is sketched next time
+        end = lines_end(file, offset, size)
+        sketch_lines(record_class, span_lines(file, offset, end), by, period, distinct, quantiles, groups)
+
+    state = {
+        'signature': signature,
+        'offset': end,
+        'prefix_hash': prefix_hash(cache_file, end),
+        'groups': encode_groups(groups),
+    }
+    with open(sketch_file + '.tmp', 'w', encoding = 'utf-8') as file :
+        file.write(json.dumps(state))
+    os.replace(sketch_file + '.tmp', sketch_file)
+    return groups
+
+
+def get_sketches(file_name: str,
+                 record_class: Type,
+                 api_version: ApiVersion,
+                 cache_dir: str,
+                 by: Sequence[str] = (),
+                 period: Optional[str] = 'day',
+                 distinct: Sequence[str] = (),
+                 quantiles: Sequence[str] = ()
+                 ) -> List[tuple] :
+    """ Returns sketches of distinct values of columns `distinct` (`HyperLogLog`) and of quantiles of
+    numeric columns `quantiles` (`KllSketch`) per group of rows by period of `datum` (`'day'`,
+    `'week'`, `'month'` or `None` for the whole dataset) and columns `by`.
+
+    Sketches are computed in one pass over each cached file and stored next to it (see
+    `load_sketches`). Partitions of partitioned datasets are sketched separately, only changed
+    partitions are sketched again, and their sketches are merged. Sketches of a single cached
+    file are updated incrementally when rows are appended to it.
+
+    Returns named tuples of `datum` (the period, if `period` is not `None`), the `by` columns (raw
+    text) and the sketches named by their columns, e.g. `row.vek.quantile(0.5)` or
+    `row.ockovaci_misto_id.count()`, sorted by the group keys.
+    """
+    if cache_dir is None :
+        raise ValueError('Sketches require a cache directory.')
+    if period not in (None, 'day', 'week', 'month') :
+        raise ValueError(f"Invalid period '{period}', expected 'day', 'week', 'month' or None.")
+    if len(distinct) + len(quantiles) == 0 :
+        raise ValueError('No columns to sketch.')
+    names = ([] if period is None else ['datum']) + [*by, *distinct, *quantiles]
+    if len(set(names)) != len(names) :
+        raise ValueError('Columns of the groups and of the sketches must differ.')
+
+    partitioned = partition_period(file_name, cache_dir) is not None
+    groups: Dict[Tuple[str, ...], List[Any]] = {}
+    for cache_file in cached_files(file_name, api_version, cache_dir) :
+        for key, sketches in load_sketches(cache_file, record_class, by, period, distinct, quantiles,
+                                           not partitioned).items() :
+            if (current := groups.get(key)) is None :
+                groups[key] = sketches
+            else :
+                for sketch, other in zip(current, sketches) :
+                    sketch.merge(other)
+
+    result_type = namedtuple('Sketches', names)
+    return [result_type(*(key if period is not None else key[1:]), *sketches)
+            for key, sketches in sorted(groups.items())]
@@ -0,0 +1,144 @@
+from .api import ApiVersion, bool_field, column_index, date_field, get_csv_raw_chunks, row_filter, row_parser
+from .api import str_field
+from datetime import date
+from heapq import merge
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Optional, Sequence, Type, Union
+import os
+import tempfile
+
+# estimated memory taken by a buffered row besides the bytes of its line (the bytes object, the
+# key tuple and the list slot)
+_row_overhead = 160
+
+
+def sort_key(record_class: Type, by: Sequence[str]) -> Callable[[bytes], tuple] :
+    """ Returns function computing the sort key of a raw csv line. Numbers are compared as numbers
+    (empty fields as `-1`), text and dates as raw text, bools as `False` < `True`.
+    """
+    indexes = [column_index(record_class, column) for column in by]
+    plan = []
+    for i in indexes :
+        converter = record_class.fields[i][1]
+        if converter is str_field or converter is date_field :
+            plan.append((i, None))
+        elif converter is bool_field :
+            plan.append((i, bool))
+        else :
+            plan.append((i, lambda raw, converter = converter : converter(raw.decode('ascii'))))
+    max_split = max(indexes) + 1
+
+    def key(line: bytes) -> tuple :
+        parts = line.split(b',', max_split)
+        if len(parts) < max_split :
+            parts.extend([b''] * (max_split - len(parts)))
+        return tuple([parts[i] if convert is None else convert(parts[i]) for i, convert in plan])
+
+    return key
+
+
+def write_run(directory: str, lines: Iterable[bytes]) -> str :
+    descriptor, path = tempfile.mkstemp(suffix = '.run', dir = directory)
+    with os.fdopen(descriptor, 'wb') as file :
+        for line in lines :
+            file.write(line)
+            file.write(b'\n')
+    return path
+
+
+def run_lines(file: BinaryIO) -> Iterator[bytes] :
+    for line in file :
+        yield line[:-1]
+
+
+def merge_runs(directory: str, runs: List[str], key: Callable[[bytes], tuple], descending: bool) -> str :
+    """ Merges sorted run files into one run file and removes them. """
+    files = [open(run, 'rb') for run in runs]
+    try :
+        lines = merge(*(run_lines(file) for file in files), key = key, reverse = descending)
+        path = write_run(directory, lines)
+    finally :
+        for file in files :
+            file.close()
+    for run in runs :
+        os.remove(run)
+    return path
+
+
+def get_sorted(file_name: str,
+               record_class: Type,
+               api_version: ApiVersion,
+               cache_dir: Optional[str],
+               by: Sequence[str],
+               descending: bool = False,
+               memory_limit: int = 256 << 20,
+               temp_dir: Optional[str] = None,
+               fan_in: int = 64,
+               columns: Optional[Sequence[str]] = None,
+               since: Union[date, str, None] = None,
+               until: Union[date, str, None] = None,
+               **filters: Any
+               ) -> Iterator :
+    """ Yields rows of the dataset sorted by columns `by` (as records, or named tuples of `columns`),
+    using external merge sort for datasets larger than memory.
+
+    Raw lines are buffered until they take `memory_limit` bytes, then sorted and written as a
+    sorted run into a temporary directory (in `temp_dir`, defaults to the system temporary
+    directory). The runs are merged (at most `fan_in` files at once, in more passes if needed)
+    while the rows are yielded, rows are parsed only when yielded. The sort is stable, rows with
+    equal keys keep the order of the dataset. A dataset which fits into the memory limit is sorted
+    in memory without temporary files. Accepts filter options of `get_many`.
+    """
+    if len(by) == 0 :
+        raise ValueError('No columns to sort by.')
+    if fan_in < 2 :
+        raise ValueError('At least two runs have to be merged at once.')
+
+    key = sort_key(record_class, by)
+    parse = row_parser(record_class, columns, None)
+    accept = row_filter(record_class, since, until, filters)
+    max_split = -1 if accept is None else accept.max_index + 1
+
+    with tempfile.TemporaryDirectory(prefix = f'{file_name}-sort-', dir = temp_dir) as directory :
+        runs: List[str] = []
+        buffer: List[bytes] = []
+        buffered = 0
+        first_chunk = True
+        # chunks are sized by the memory limit too, so the chunk being read doesn't exceed it much
+        chunk_lines = max(min(65536, memory_limit // (64 + _row_overhead)), 1)
+        for lines in get_csv_raw_chunks(file_name, api_version, cache_dir, chunk_lines, since, until) :
+            if first_chunk :
+                first_chunk = False
+                lines = lines[1:]
+
+            for raw in lines :
+                if len(line := raw.rstrip(b'\r\n')) > 0 and (accept is None or accept(line.split(b',', max_split))) :
+                    buffer.append(line)
+                    buffered += len(line) + _row_overhead
+                    if buffered >= memory_limit :
+                        buffer.sort(key = key, reverse = descending)
+                        runs.append(write_run(directory, buffer))
+                        buffer = []
+                        buffered = 0
+
+        buffer.sort(key = key, reverse = descending)
+        if len(runs) == 0 :
+            for line in buffer :
+                yield parse(line)
+            return
+
+        if len(buffer) > 0 :
+            runs.append(write_run(directory, buffer))
+        del buffer
+        # runs are merged in order, so equal keys keep the order of the dataset
+        while len(runs) > fan_in :
+            runs = [merge_runs(directory, runs[i:i + fan_in], key, descending) if len(runs[i:i + fan_in]) > 1
+                    else runs[i]
+                    for i in range(0, len(runs), fan_in)]
+
+        files = [open(run, 'rb') for run in runs]
+        try :
+            for line in merge(*(run_lines(file) for file in files), key = key, reverse = descending) :
+                yield parse(line)
+        finally :
+            for file in files :
+                file.close()
@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -53,6 +53,28 @@ class KrajOkresTesty:
         daném kraji.
     """
 
+    file_name = 'kraj-okres-testy'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('kraj_nuts_kod', str_field),
+        ('okres_lau_kod', str_field),
+        ('prirustkovy_pocet_testu_okres', int_field),
+        ('kumulativni_pocet_testu_okres', int_field),
+        ('prirustkovy_pocet_testu_kraj', int_field),
+        ('kumulativni_pocet_testu_kraj', int_field),
+        ('prirustkovy_pocet_prvnich_testu_okres', int_field),
+        ('kumulativni_pocet_prvnich_testu_okres', int_field),
+        ('prirustkovy_pocet_prvnich_testu_kraj', int_field),
+        ('kumulativni_pocet_prvnich_testu_kraj', int_field),
+    )
+
+    categorical = (
+        'kraj_nuts_kod',
+        'okres_lau_kod',
+    )
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.kraj_nuts_kod: str = line[1]
@@ -68,6 +90,10 @@ class KrajOkresTesty:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['KrajOkresTesty'] :
-        return get_many('kraj-okres-testy', KrajOkresTesty, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['KrajOkresTesty'] :
+        return get_many(KrajOkresTesty.file_name,
+                        KrajOkresTesty,
+                        KrajOkresTesty.api_version,
+                        cache_dir,
+                        **options)
 
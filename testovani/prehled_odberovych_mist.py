@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, bool_field
+from ..api import get_many, ApiVersion, int_field, bool_field, str_field
 from typing import Iterator, List, Optional
 
 class PrehledOdberovychMist:
@@ -53,6 +53,28 @@ class PrehledOdberovychMist:
 
     """
 
+    file_name = 'prehled-odberovych-mist'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('odberove_misto_id', str_field),
+        ('odberove_misto_nazev', str_field),
+        ('okres_nuts_kod', str_field),
+        ('operacni_status', bool_field),
+        ('odberove_misto_adresa', str_field),
+        ('latitude', str_field),
+        ('longitude', str_field),
+        ('testovaci_kapacita', int_field),
+        ('nasofaryngealni_odber', bool_field),
+        ('orofaryngealni_odber', bool_field),
+        ('antigenni_odber', bool_field),
+        ('drive_in', bool_field),
+    )
+
+    categorical = (
+        'okres_nuts_kod',
+    )
+
     def __init__(self, line: List[str]) :
         self.odberove_misto_id: str = line[0]
         self.odberove_misto_nazev: str = line[1]
@@ -69,6 +91,10 @@ class PrehledOdberovychMist:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['PrehledOdberovychMist'] :
-        return get_many('prehled-odberovych-mist', PrehledOdberovychMist, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['PrehledOdberovychMist'] :
+        return get_many(PrehledOdberovychMist.file_name,
+                        PrehledOdberovychMist,
+                        PrehledOdberovychMist.api_version,
+                        cache_dir,
+                        **options)
 
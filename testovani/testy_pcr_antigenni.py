@@ -1,4 +1,4 @@
-from ..api import get_many, ApiVersion, int_field, date_field
+from ..api import get_many, ApiVersion, int_field, date_field, str_field
 from datetime import date
 from typing import Iterator, List, Optional
 
@@ -66,6 +66,30 @@ class TestyPcrAntigenni:
 
     """
 
+    file_name = 'testy-pcr-antigenni'
+    api_version = ApiVersion.V2
+
+    fields = (
+        ('datum', date_field),
+        ('pocet_PCR_testy', int_field),
+        ('pocet_AG_testy', int_field),
+        ('typologie_test_indik_diagnosticka', int_field),
+        ('typologie_test_indik_epidemiologicka', int_field),
+        ('typologie_test_indik_preventivni', int_field),
+        ('typologie_test_indik_ostatni', int_field),
+        ('incidence_pozitivni', int_field),
+        ('pozit_typologie_test_indik_diagnosticka', int_field),
+        ('pozit_typologie_test_indik_epidemiologicka', int_field),
+        ('pozit_typologie_test_indik_preventivni', int_field),
+        ('pozit_typologie_test_indik_ostatni', int_field),
+        ('PCR_pozit_sympt', int_field),
+        ('PCR_pozit_asymp', int_field),
+        ('AG_pozit_symp', int_field),
+        ('AG_pozit_asymp_PCR_conf', int_field),
+    )
+
+    categorical = ()
+
     def __init__(self, line: List[str]) :
         self.datum: Optional[date] = date_field(line[0])
         self.pocet_PCR_testy: int = int_field(line[1])
@@ -86,6 +110,10 @@ class TestyPcrAntigenni:
 
 
     @staticmethod
-    def get(cache_dir: Optional[str]) -> Iterator['TestyPcrAntigenni'] :
-        return get_many('testy-pcr-antigenni', TestyPcrAntigenni, ApiVersion.V2, cache_dir)
+    def get(cache_dir: Optional[str], **options) -> Iterator['TestyPcrAntigenni'] :
+        return get_many(TestyPcrAntigenni.file_name,
+                        TestyPcrAntigenni,
+                        TestyPcrAntigenni.api_version,
+                        cache_dir,
+                        **options)
 
@@ -0,0 +1,152 @@
+from .api import ApiVersion, dataset_signature, date_field, get_batches
+from .panel import layouts
+from collections import namedtuple
+from datetime import date
+from heapq import heappush, heapreplace
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+import json
+import os
+
+# columns with names of the entities of the datasets
+name_columns: Dict[str, str] = {
+    'obce': 'obec_nazev',
+    'orp': 'orp_nazev',
+}
+
+_loaded: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+
+
+class ReversedKey :
+    """ Entity code ordered in reverse, the heaps keep `(value, ReversedKey(entity))`, so the
+    smallest item is of the lowest value and, among equal values, of the largest entity, which is
+    replaced first. The heaps then keep the same entities as sorting by value descending and entity
+    ascending.
+    """
+
+    __slots__ = ('entity',)
+
+    def __init__(self, entity: Any) :
+        self.entity = entity
+
+
+    def __lt__(self, other: 'ReversedKey') -> bool :
+        return other.entity < self.entity
+
+
+    def __eq__(self, other: Any) -> bool :
+        return isinstance(other, ReversedKey) and other.entity == self.entity
+
+
+def build_top_index(file_name: str,
+                    record_class: Type,
+                    api_version: ApiVersion,
+                    cache_dir: str,
+                    signature: str,
+                    k: int
+                    ) -> Dict[str, Any] :
+    """ Reads the dataset once and keeps a min-heap of the `k` largest values of each counter (see
+    `panel.layouts`) per day, returns the index: `days` mapping ISO dates to lists of
+    `[entity, value]` pairs per counter (by value descending, ties by entity) and `names` of the
+    entities (as `[entity, name]` pairs).
+    """
+    layout = layouts[file_name]
+    name_column = name_columns.get(file_name)
+    columns = ['datum', layout.entity, *layout.counters] + ([] if name_column is None else [name_column])
+    counters = len(layout.counters)
+    heaps: Dict[date, List[List[Tuple[int, ReversedKey]]]] = {}
+    names: Dict[Any, str] = {}
+    for batch in get_batches(file_name, record_class, api_version, cache_dir, 65536, columns) :
+        for row in batch :
+            if (day := row[0]) is None :
+                continue
+            if (day_heaps := heaps.get(day)) is None :
+                day_heaps = heaps[day] = [[] for _ in range(counters)]
+            entity = row[1]
+            for heap, value in zip(day_heaps, row[2:2 + counters]) :
+                if value < 0 :
+                    continue
+                if len(heap) < k :
+                    heappush(heap, (value, ReversedKey(entity)))
+                elif value > (smallest := heap[0])[0] or (value == smallest[0] and entity < smallest[1].entity) :
+                    heapreplace(heap, (value, ReversedKey(entity)))
+            if name_column is not None :
+                names[entity] = row[-1]
+
+    def descending(item: Tuple[int, ReversedKey]) -> Tuple[int, Any] :
+        return -item[0], item[1].entity
+
+    return {
+        'signature': signature,
+        'k': k,
+        'names': [[entity, name] for entity, name in names.items()],
+        'days': { day.isoformat(): { name: [[key.entity, value] for value, key in sorted(heap, key = descending)]
+                                     for name, heap in zip(layout.counters, day_heaps) }
+                  for day, day_heaps in sorted(heaps.items()) },
+    }
+
+
+def load_top_index(file_name: str, record_class: Type, api_version: ApiVersion, cache_dir: str, k: int = 100) -> Dict[str, Any] :
+    """ Returns the top-k index of the dataset (see `build_top_index`), kept in file
+    `<dataset>.top.json` next to the cached csv file. The index is rebuilt when the dataset changed
+    or it keeps less than `k` entities per day.
+    """
+    if file_name not in layouts :
+        raise ValueError(f"Dataset '{file_name}' has no top index, supported are {', '.join(layouts)}.")
+    if cache_dir is None :
+        raise ValueError('Top indexes require a cache directory.')
+
+    signature = dataset_signature(file_name, api_version, cache_dir)
+    index_file = os.path.join(cache_dir, file_name + '.top.json')
+    if (loaded := _loaded.get(index_file)) is not None and loaded[0] == signature and loaded[1]['k'] >= k :
+        return loaded[1]
+
+    index: Optional[Dict[str, Any]] = None
+    if os.path.isfile(index_file) :
+        with open(index_file, 'r', encoding = 'utf-8') as file :
+            index = json.load(file)
+        if index['signature'] != signature or index['k'] < k :
+            index = None
+
+    if index is None :
+        index = build_top_index(file_name, record_class, api_version, cache_dir, signature, k)
+        with open(index_file + '.tmp', 'w', encoding = 'utf-8') as file :
+            file.write(json.dumps(index, ensure_ascii = False))
+        os.replace(index_file + '.tmp', index_file)
+    # names are stored as pairs, as codes of some entities are numbers
+    index['names'] = { entity: name for entity, name in index['names'] }
+    _loaded[index_file] = (signature, index)
+    return index
+
+
+def get_top(file_name: str,
+            record_class: Type,
+            api_version: ApiVersion,
+            cache_dir: str,
+            metric: str,
+            day: Union[date, str],
+            n: int = 10
+            ) -> List[tuple] :
+    """ Returns `n` entities with the largest values of the counter `metric` on given day, looked up
+    in the top-k index. Returns named tuples of the entity code, its name (if the dataset has names)
+    and the value, by value descending and entity code ascending.
+
+    The index keeps 100 entities per day. A larger `n` rebuilds the index with k = `n`, which scans
+    the whole dataset again, the larger index is then kept and serves smaller `n` as well.
+    """
+    layout = layouts.get(file_name)
+    if layout is not None and metric not in layout.counters :
+        raise ValueError(f"'{metric}' is not a counter of dataset '{file_name}', expected one of "
+                         f"{', '.join(layout.counters)}.")
+
+    index = load_top_index(file_name, record_class, api_version, cache_dir, max(n, 100))
+    name_column = name_columns.get(file_name)
+    if name_column is None :
+        result_type = namedtuple('Top', [layout.entity, metric])
+        make = lambda entity, value : result_type(entity, value)
+    else :
+        names = index['names']
+        result_type = namedtuple('Top', [layout.entity, name_column, metric])
+        make = lambda entity, value : result_type(entity, names.get(entity, ''), value)
+
+    key = str(date_field(day) or day)
+    return [make(entity, value) for entity, value in index['days'].get(key, {}).get(metric, [])[:n]]